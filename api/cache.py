@@ -1,31 +1,276 @@
+from abc import ABC
+from abc import abstractmethod
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from typing import Dict
+from typing import Generic
+from typing import Hashable
 from typing import Optional
+from typing import Set
+from typing import TypeVar
+from typing import Union
 from collections import OrderedDict
 from threading import Lock
 
+import numpy as np
+from pydantic import BaseModel
+
+from climatemaps.cube import MonthCube
 from climatemaps.geogrid import GeoGrid
+from climatemaps.logger import logger
 
+CacheItem = Union[GeoGrid, MonthCube]
+# a month, or the name of a month aggregate
+Month = Union[int, str]
 
-class GeoGridCache:
-    # NOTE: In-memory caching works correctly with a single uvicorn worker.
-    # If using multiple workers (--workers N), each worker has separate memory,
-    # which means each worker has its own cache (data may be loaded once per worker).
-    MAX_SIZE = 128
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    rejections: int
+    entries: int
+    bytes: int
+    max_bytes: int
 
+
+class SingleFlight(Generic[K, T]):
     def __init__(self) -> None:
-        self._cache: OrderedDict[str, GeoGrid] = OrderedDict()
+        self._calls: Dict[K, Future] = {}
         self._lock = Lock()
 
-    def _get_cache_key(self, data_type: str, month: int) -> str:
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def run(self, key: K, function: Callable[[], T], timeout: float) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            is_caller = future is None
+            if is_caller:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_caller:
+            return future.result(timeout=timeout)
+
+        try:
+            result = function()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class BaseGeoGridCache(ABC):
+    MAX_SIZE = 128
+    # background loads that are queued or running, further loads are skipped
+    MAX_BACKGROUND_LOADS = 32
+
+    def __init__(self, background_workers: int = 2) -> None:
+        self._loading: SingleFlight[str, CacheItem] = SingleFlight()
+        self._background_loads: Set[str] = set()
+        self._background_lock = Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=background_workers, thread_name_prefix="geo-grid-load"
+        )
+
+    def _get_cache_key(self, data_type: str, month: Month) -> str:
+        if isinstance(month, str):
+            # an aggregate of one month is named like the month
+            return f"{data_type}_agg:{month}"
         return f"{data_type}_{month}"
 
-    def get(self, data_type: str, month: int) -> Optional[GeoGrid]:
+    def _get_cube_cache_key(self, data_type: str) -> str:
+        return f"{data_type}_cube"
+
+    def get(self, data_type: str, month: Month, record_miss: bool = True) -> Optional[GeoGrid]:
+        return self._get(self._get_cache_key(data_type, month), record_miss)
+
+    def set(self, data_type: str, month: Month, geo_grid: GeoGrid) -> None:
+        self._set(self._get_cache_key(data_type, month), geo_grid)
+
+    def get_or_load(
+        self, data_type: str, month: Month, load: Callable[[], GeoGrid], timeout: float
+    ) -> GeoGrid:
+        return self._get_or_load(self._get_cache_key(data_type, month), load, timeout)
+
+    def contains(self, data_type: str, month: Month) -> bool:
+        return self._contains(self._get_cache_key(data_type, month))
+
+    def load_in_background(self, data_type: str, month: int, load: Callable[[], GeoGrid]) -> None:
         cache_key = self._get_cache_key(data_type, month)
+        with self._background_lock:
+            if (
+                cache_key in self._background_loads
+                or len(self._background_loads) >= self.MAX_BACKGROUND_LOADS
+                or cache_key in self._loading
+                or self._contains(cache_key)
+            ):
+                return
+            self._background_loads.add(cache_key)
+        self._executor.submit(self._load_in_background, cache_key, load)
+
+    def _load_in_background(self, cache_key: str, load: Callable[[], GeoGrid]) -> None:
+        try:
+            self._get_or_load(cache_key, load, timeout=0)
+        except TimeoutError:
+            # loaded by a concurrent request in the meantime
+            pass
+        except Exception as e:
+            logger.warning(f"Background load of {cache_key} failed: {e}")
+        finally:
+            with self._background_lock:
+                self._background_loads.discard(cache_key)
+
+    def get_cube(self, data_type: str, record_miss: bool = True) -> Optional[MonthCube]:
+        return self._get(self._get_cube_cache_key(data_type), record_miss)
+
+    def set_cube(self, data_type: str, cube: MonthCube) -> None:
+        self._set(self._get_cube_cache_key(data_type), cube)
+
+    def get_or_load_cube(
+        self, data_type: str, load: Callable[[], MonthCube], timeout: float
+    ) -> MonthCube:
+        return self._get_or_load(self._get_cube_cache_key(data_type), load, timeout)
+
+    @abstractmethod
+    def stats(self) -> CacheStats: ...
+
+    @abstractmethod
+    def _get(self, cache_key: str, record_miss: bool = True) -> Optional[CacheItem]: ...
+
+    @abstractmethod
+    def _set(self, cache_key: str, item: CacheItem) -> None: ...
+
+    @abstractmethod
+    def _contains(self, cache_key: str) -> bool: ...
+
+    def _get_or_load(
+        self, cache_key: str, load: Callable[[], CacheItem], timeout: float
+    ) -> CacheItem:
+        item = self._get(cache_key)
+        if item is not None:
+            return item
+        return self._loading.run(cache_key, lambda: self._load(cache_key, load, timeout), timeout)
+
+    def _load(self, cache_key: str, load: Callable[[], CacheItem], timeout: float) -> CacheItem:
+        # a concurrent loader may have finished between the miss and registering this load
+        item = self._get(cache_key, record_miss=False)
+        if item is None:
+            item = load()
+            self._set(cache_key, item)
+        return item
+
+
+# entries used once are evicted from the probation segment, before they can push out the grids that
+# are requested again
+class GeoGridCache(BaseGeoGridCache):
+    # NOTE: In-memory caching works correctly with a single uvicorn worker.
+    # If using multiple workers (--workers N), each worker has separate memory,
+    # which means each worker has its own cache (data may be loaded once per worker).
+    # Use SharedMemoryGeoGridCache to share one cache between workers.
+    PROTECTED_FRACTION = 0.8
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_size: int = BaseGeoGridCache.MAX_SIZE,
+        background_workers: int = 2,
+    ) -> None:
+        super().__init__(background_workers)
+        self.max_bytes = max_bytes
+        self.max_size = max_size
+        self._probation: OrderedDict[str, CacheItem] = OrderedDict()
+        self._protected: OrderedDict[str, CacheItem] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._protected_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+        self._lock = Lock()
+
+    def stats(self) -> CacheStats:
         with self._lock:
-            return self._cache.get(cache_key)
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                rejections=self._rejections,
+                entries=len(self._sizes),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+            )
 
-    def set(self, data_type: str, month: int, geo_grid: GeoGrid) -> None:
-        cache_key = self._get_cache_key(data_type, month)
+    @classmethod
+    def get_size(cls, item: CacheItem) -> int:
+        # memory-mapped values live in the shared OS page cache, not in the worker's memory
+        values_bytes = 0 if isinstance(item.values, np.memmap) else item.values.nbytes
+        return values_bytes + item.lon_range.nbytes + item.lat_range.nbytes
+
+    def _contains(self, cache_key: str) -> bool:
+        with self._lock:
+            return cache_key in self._sizes
+
+    def _get(self, cache_key: str, record_miss: bool = True) -> Optional[CacheItem]:
+        with self._lock:
+            if cache_key in self._protected:
+                self._protected.move_to_end(cache_key)
+                self._hits += 1
+                return self._protected[cache_key]
+            if cache_key in self._probation:
+                item = self._probation.pop(cache_key)
+                self._protected[cache_key] = item
+                self._protected_bytes += self._sizes[cache_key]
+                self._demote_protected()
+                self._hits += 1
+                return item
+            if record_miss:
+                self._misses += 1
+            return None
+
+    def _set(self, cache_key: str, item: CacheItem) -> None:
+        size = self.get_size(item)
         with self._lock:
-            if cache_key not in self._cache and len(self._cache) >= self.MAX_SIZE:
-                self._cache.popitem(last=False)
-            self._cache[cache_key] = geo_grid
+            if size > self.max_bytes:
+                self._rejections += 1
+                return
+            if cache_key in self._sizes:
+                self._remove(cache_key)
+            self._probation[cache_key] = item
+            self._sizes[cache_key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._sizes) > self.max_size:
+                self._evict(keep=cache_key)
+
+    def _demote_protected(self) -> None:
+        while self._protected_bytes > self.max_bytes * self.PROTECTED_FRACTION:
+            cache_key, item = self._protected.popitem(last=False)
+            self._protected_bytes -= self._sizes[cache_key]
+            self._probation[cache_key] = item
+
+    def _evict(self, keep: str) -> None:
+        victim = next((key for key in self._probation if key != keep), None)
+        if victim is None:
+            victim = next(iter(self._protected))
+        self._remove(victim)
+        self._evictions += 1
+
+    def _remove(self, cache_key: str) -> None:
+        size = self._sizes.pop(cache_key)
+        self._bytes -= size
+        if cache_key in self._protected:
+            del self._protected[cache_key]
+            self._protected_bytes -= size
+        else:
+            del self._probation[cache_key]
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+from climatemaps.config import ClimateMap
+
+from .responses import StaticPayload
+
+FACETS = (
+    "variable",
+    "climate_scenario",
+    "climate_model",
+    "year_range",
+    "resolution",
+    "is_difference_map",
+)
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    payload: StaticPayload
+    total: int
+
+
+def _get_facet_values(climate_map: ClimateMap) -> Dict[str, List[str]]:
+    values = {
+        "variable": [climate_map.variable.name, climate_map.variable.filename],
+        "year_range": [f"{climate_map.year_range[0]}-{climate_map.year_range[1]}"],
+        "resolution": [climate_map.resolution.value],
+        "is_difference_map": [str(climate_map.is_difference_map)],
+    }
+    if climate_map.climate_scenario is not None:
+        values["climate_scenario"] = [climate_map.climate_scenario.value]
+    if climate_map.climate_model is not None:
+        values["climate_model"] = [climate_map.climate_model.value]
+    return {
+        facet: [value.lower() for value in facet_values] for facet, facet_values in values.items()
+    }
+
+
+class ClimateMapCatalog:
+    def __init__(self, climate_maps: List[ClimateMap], max_cached_pages: int = 256):
+        self.climate_maps = climate_maps
+        self.max_cached_pages = max_cached_pages
+        self._serialized = [climate_map.model_dump_json().encode() for climate_map in climate_maps]
+        self._index: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        for i, climate_map in enumerate(climate_maps):
+            for facet, values in _get_facet_values(climate_map).items():
+                for value in set(values):
+                    self._index[facet].setdefault(value, []).append(i)
+        self._pages: OrderedDict[Tuple, CatalogPage] = OrderedDict()
+        self._lock = Lock()
+        self.query({})
+
+    def query(
+        self, filters: Mapping[str, Optional[str]], offset: int = 0, limit: Optional[int] = None
+    ) -> CatalogPage:
+        filter_values = tuple((facet, filters.get(facet)) for facet in FACETS)
+        cache_key = tuple(
+            (facet, value.lower()) for facet, value in filter_values if value is not None
+        ) + (offset, limit)
+        with self._lock:
+            page = self._pages.get(cache_key)
+            if page is not None:
+                self._pages.move_to_end(cache_key)
+                return page
+
+        indices = self._filter(cache_key[:-2])
+        selected = indices[offset : None if limit is None else offset + limit]
+        body = b"[" + b",".join(self._serialized[i] for i in selected) + b"]"
+        page = CatalogPage(
+            payload=StaticPayload(
+                body=body,
+                media_type="application/json",
+                headers={"X-Total-Count": str(len(indices))},
+                compress=True,
+            ),
+            total=len(indices),
+        )
+        with self._lock:
+            self._pages[cache_key] = page
+            while len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+        return page
+
+    def _filter(self, filters: Tuple[Tuple[str, str], ...]) -> List[int]:
+        if not filters:
+            return list(range(len(self.climate_maps)))
+        matches = [set(self._index[facet].get(value, ())) for facet, value in filters]
+        return sorted(set.intersection(*matches))
@@ -0,0 +1,53 @@
+import math
+from dataclasses import dataclass
+
+from climatemaps.datasets import SpatialResolution
+
+
+# the center of a cell is the canonical coordinate of all points in it
+@dataclass(frozen=True)
+class GridCell:
+    resolution: SpatialResolution
+    subdivisions: int
+    row: int
+    col: int
+
+    @property
+    def size(self) -> float:
+        return get_cell_size(self.resolution) / self.subdivisions
+
+    @property
+    def lat(self) -> float:
+        return round(90.0 - (self.row + 0.5) * self.size, 6)
+
+    @property
+    def lon(self) -> float:
+        return round(-180.0 + (self.col + 0.5) * self.size, 6)
+
+    @property
+    def id(self) -> str:
+        return f"{self.resolution.value}_{self.subdivisions}_{self.row}_{self.col}"
+
+    def contains_center(self, lon: float, lat: float) -> bool:
+        return abs(lon - self.lon) < 1e-6 and abs(lat - self.lat) < 1e-6
+
+
+def get_cell_size(resolution: SpatialResolution) -> float:
+    # resolutions are in arc minutes, for example "2.5m"
+    return float(resolution.value.removesuffix("m")) / 60.0
+
+
+def snap_to_cell(
+    resolution: SpatialResolution, lon: float, lat: float, subdivisions: int = 1
+) -> GridCell:
+    if not -180.0 <= lon <= 180.0:
+        raise ValueError(f"Longitude {lon} is out of range [-180, 180]")
+    if not -90.0 <= lat <= 90.0:
+        raise ValueError(f"Latitude {lat} is out of range [-90, 90]")
+
+    size = get_cell_size(resolution) / subdivisions
+    n_rows = round(180.0 / size)
+    n_cols = round(360.0 / size)
+    row = min(int(math.floor((90.0 - lat) / size)), n_rows - 1)
+    col = min(int(math.floor((lon + 180.0) / size)), n_cols - 1)
+    return GridCell(resolution=resolution, subdivisions=subdivisions, row=row, col=col)
@@ -0,0 +1,93 @@
+import json
+import os
+from threading import Lock
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from climatemaps.aggregate import MonthAggregate
+from climatemaps.aggregate import get_aggregate_contour_config
+from climatemaps.contour_config import ContourPlotConfig
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.logger import logger
+
+from .responses import StaticPayload
+
+ImageKey = Tuple[str, Union[int, str]]
+
+COLORBAR_SUFFIX = "_colorbar.png"
+
+
+class ColorbarAssets:
+
+    def __init__(self, data_configs: Iterable[ClimateDataConfig], tiles_dir: str):
+        self.tiles_dir = tiles_dir
+        self._data_configs = {config.data_type_slug: config for config in data_configs}
+        # data types with equal contour configs share one payload
+        self._payloads_by_body: Dict[bytes, StaticPayload] = {}
+        self._configs = {
+            data_type: self._serialize(data_config.contour_config)
+            for data_type, data_config in self._data_configs.items()
+        }
+        logger.info(
+            f"Serialized {len(self._payloads_by_body)} colorbar configs for {len(self._configs)} data types"
+        )
+        # aggregate configs per data type and number of months
+        self._aggregate_configs: Dict[Tuple[str, int], StaticPayload] = {}
+        self._lock = Lock()
+        self._images = self._load_images()
+
+    def _serialize(self, contour_config: ContourPlotConfig) -> StaticPayload:
+        body = json.dumps(contour_config.get_colorbar_data(), separators=(",", ":")).encode()
+        payload = self._payloads_by_body.get(body)
+        if payload is None:
+            payload = StaticPayload(body=body, media_type="application/json")
+            self._payloads_by_body[body] = payload
+        return payload
+
+    def _load_images(self) -> Dict[ImageKey, StaticPayload]:
+        images: Dict[ImageKey, StaticPayload] = {}
+        for data_type in self._data_configs:
+            directory = os.path.join(self.tiles_dir, data_type)
+            try:
+                filenames = os.listdir(directory)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for filename in filenames:
+                if not filename.endswith(COLORBAR_SUFFIX):
+                    continue
+                name = filename.removesuffix(COLORBAR_SUFFIX)
+                month = int(name) if name.isdigit() else name
+                with open(os.path.join(directory, filename), "rb") as f:
+                    body = f.read()
+                images[(data_type, month)] = StaticPayload(
+                    body=body,
+                    media_type="image/png",
+                    headers={
+                        "Content-Disposition": f'attachment; filename="{data_type}_{filename}"'
+                    },
+                )
+        logger.info(f"Loaded {len(images)} colorbar images from {self.tiles_dir}")
+        return images
+
+    def get_config(self, data_type: str) -> Optional[StaticPayload]:
+        return self._configs.get(data_type)
+
+    def get_aggregate_config(
+        self, data_type: str, aggregate: MonthAggregate
+    ) -> Optional[StaticPayload]:
+        data_config = self._data_configs.get(data_type)
+        if data_config is None:
+            return None
+        key = (data_type, len(aggregate.months))
+        with self._lock:
+            payload = self._aggregate_configs.get(key)
+            if payload is None:
+                payload = self._serialize(get_aggregate_contour_config(data_config, aggregate))
+                self._aggregate_configs[key] = payload
+        return payload
+
+    def get_image(self, data_type: str, month: Union[int, str]) -> Optional[StaticPayload]:
+        return self._images.get((data_type, month))
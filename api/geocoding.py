@@ -0,0 +1,214 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable
+from typing import Generic
+from typing import List
+from typing import Optional
+from typing import Protocol
+from typing import TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from climatemaps.logger import logger
+from climatemaps.timing import timed_phase
+
+ALLOWED_LOCATION_TYPES = [
+    "city",
+    "town",
+    "village",
+    "hamlet",
+    "state",
+    "country",
+]
+
+ADDRESS_PROPERTIES = ["name", "housenumber", "street", "postcode", "city", "state", "country"]
+
+
+class GeocodingLocation(BaseModel):
+    display_name: str
+    latitude: float
+    longitude: float
+    type: str
+    bounding_box: Optional[List[float]] = None
+
+
+class GeocoderError(Exception):
+    pass
+
+
+class GeocoderTimeoutError(GeocoderError):
+    pass
+
+
+class GeocoderServiceError(GeocoderError):
+    pass
+
+
+class Geocoder(Protocol):
+    async def search(self, query: str) -> List[GeocodingLocation]: ...
+
+    async def close(self) -> None: ...
+
+
+class PhotonGeocoder:
+    def __init__(
+        self,
+        url: str = "https://photon.komoot.io/api",
+        user_agent: str = "openclimatemap",
+        timeout: float = 10,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        max_connections: int = 20,
+    ):
+        self.url = url
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": user_agent},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+
+    async def search(self, query: str) -> List[GeocodingLocation]:
+        for attempt in range(self.max_retries):
+            try:
+                with timed_phase("geocode_upstream"):
+                    response = await self._client.get(
+                        self.url, params={"q": query, "limit": 50, "lang": "en"}
+                    )
+                response.raise_for_status()
+                return self._parse_features(response.json().get("features", []))
+            except httpx.TimeoutException:
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                    continue
+                raise GeocoderTimeoutError("Geocoding service timed out after retries")
+            except (httpx.HTTPError, ValueError) as e:
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                    continue
+                raise GeocoderServiceError(str(e))
+        return []
+
+    @classmethod
+    def _parse_features(cls, features: List[dict]) -> List[GeocodingLocation]:
+        locations: List[GeocodingLocation] = []
+
+        for feature in features:
+            properties = feature.get("properties", {})
+            location_type = properties.get("type", "").lower()
+            if location_type not in ALLOWED_LOCATION_TYPES:
+                continue
+
+            longitude, latitude = feature["geometry"]["coordinates"][:2]
+            bounding_box = None
+            if "extent" in properties and len(properties["extent"]) == 4:
+                extent = properties["extent"]
+                bounding_box = [extent[1], extent[3], extent[0], extent[2]]
+
+            locations.append(
+                GeocodingLocation(
+                    display_name=", ".join(
+                        properties[key] for key in ADDRESS_PROPERTIES if properties.get(key)
+                    ),
+                    latitude=latitude,
+                    longitude=longitude,
+                    type=location_type,
+                    bounding_box=bounding_box,
+                )
+            )
+
+        return locations
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class LocalGeocoder:
+    def __init__(self, locations: List[GeocodingLocation], latency: float = 0.0):
+        self.locations = locations
+        self.latency = latency
+        self.n_requests = 0
+
+    async def search(self, query: str) -> List[GeocodingLocation]:
+        self.n_requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        query = query.lower()
+        return [location for location in self.locations if query in location.display_name.lower()]
+
+    async def close(self) -> None:
+        pass
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(
+        self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._cache: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._cache[key] = (self._clock() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+
+# a shared upstream request continues when the request that started it is cancelled
+class CachingGeocoder:
+    def __init__(self, geocoder: Geocoder, max_size: int = 1024, ttl: float = 24 * 3600):
+        self.geocoder = geocoder
+        self._cache: TTLCache[str, List[GeocodingLocation]] = TTLCache(max_size, ttl)
+        self._pending: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def normalize_query(cls, query: str) -> str:
+        return " ".join(query.lower().split())
+
+    async def search(self, query: str) -> List[GeocodingLocation]:
+        query = self.normalize_query(query)
+        locations = self._cache.get(query)
+        if locations is not None:
+            return locations
+
+        task = self._pending.get(query)
+        if task is None:
+            task = asyncio.create_task(self._search_upstream(query))
+            # mark the exception as retrieved when all requests were cancelled
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._pending[query] = task
+        return await asyncio.shield(task)
+
+    async def _search_upstream(self, query: str) -> List[GeocodingLocation]:
+        try:
+            locations = await self.geocoder.search(query)
+            self._cache.set(query, locations)
+            return locations
+        finally:
+            del self._pending[query]
+
+    async def close(self) -> None:
+        logger.info("Closing geocoder")
+        await self.geocoder.close()
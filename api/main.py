@@ -1,58 +1,246 @@
-from typing import List, Optional
-import time
-from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
+import math
+import os
 
-from fastapi import FastAPI, HTTPException, Request
+import numpy as np
+from fastapi import Body, FastAPI, HTTPException, Path, Query, Request, Response
+from fastapi.responses import PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from citipy import citipy
-import pycountry
-from geopy.geocoders import Photon
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
+from climatemaps.aggregate import MonthAggregate, get_aggregate_contour_config
+from climatemaps.aggregate import get_aggregate_unit, is_summed
 from climatemaps.config import ClimateMap
+from climatemaps.contour_config import ContourPlotConfig
 from climatemaps.settings import settings
-from climatemaps.datasets import ClimateDifferenceDataConfig
-from climatemaps.data import load_climate_data, load_climate_data_for_difference
+from climatemaps.datasets import HISTORIC_DATA_SETS
+from climatemaps.datasets import ClimateDifferenceDataConfig, ClimateModel
+from climatemaps.cube import MONTHS
+from climatemaps.cube import DifferenceMonthCube, MonthCube
+from climatemaps.data import load_climate_data_at_point
+from climatemaps.data import load_climate_data_cube, load_climate_data_for_config
+from climatemaps.geogrid import DifferenceGeoGrid, GeoGrid
+from climatemaps.geogrid import GridLayout, get_grid_layout
+from climatemaps.logger import logger
+from climatemaps.region import RegionStats
+from climatemaps.store import MonthCubeStore
+from climatemaps.timing import add_phase_listener, timed_phase
+from climatemaps.zonal import load_natural_earth_countries
 
-from .middleware import RateLimitMiddleware
-from .cache import GeoGridCache
+from .catalog import ClimateMapCatalog
+from .cells import snap_to_cell
+from .colorbar import ColorbarAssets
+from .metrics import MetricsRegistry
+from .middleware import RateLimitMiddleware, RequestLatencyMiddleware, ServerTimingMiddleware
+from .nearest_city import NearestCity, NearestCityIndex
+from .cache import BaseGeoGridCache, CacheStats, GeoGridCache
+from .shared_cache import SharedMemoryGeoGridCache
+from .geocoding import CachingGeocoder, PhotonGeocoder
+from .geocoding import GeocoderServiceError, GeocoderTimeoutError, GeocodingLocation
+from .mbtiles import MBTilesCache, tile_response
+from .region_stats import RegionStatsCache
+from .tiles import RasterTileRenderer
+from .timeseries import PointSeriesIndex, gather_point_values
+from .timeseries import get_future_config
+from .zonal_stats import CountryStatsCache
+from .responses import FastJSONResponse, cached_response, dump_json, payload_response
+from .warmup import AccessStats, CacheWarmer, WarmupStatus, get_warmup_targets
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cache_warmer.start()
+    metrics.start()
+    yield
+    access_stats.save(settings.ACCESS_STATS_PATH)
+    await geocoder.close()
+    mbtiles_cache.close()
+    metrics.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# a month, or an aggregate of months
+Period = Union[int, MonthAggregate]
+
+MONTH_DESCRIPTION = "Month (1-12), or a month aggregate: annual, djf, mam, jja, son or comma separated months like 6,7,8"
 
 api = FastAPI()
 app.mount("/v1", api)
 
 climate_maps = [ClimateMap.create(maps_config) for maps_config in settings.DATA_SETS_API]
 
+climate_map_catalog = ClimateMapCatalog(climate_maps)
+
 data_config_map = {config.data_type_slug: config for config in settings.DATA_SETS_API}
 
-geocoder = Photon(user_agent="openclimatemap", timeout=10)
+source_config_map = {
+    component_config.data_type_slug: component_config
+    for config in settings.DATA_SETS_API
+    if isinstance(config, ClimateDifferenceDataConfig)
+    for component_config in (config.historical_config, config.future_config)
+}
+source_config_map.update(data_config_map)
+
+geocoder = CachingGeocoder(
+    PhotonGeocoder(user_agent="openclimatemap", timeout=10),
+    max_size=settings.GEOCODE_CACHE_SIZE,
+    ttl=settings.GEOCODE_CACHE_TTL,
+)
+
+geo_grid_cache: BaseGeoGridCache
+if settings.GEO_GRID_CACHE_BACKEND == "shared":
+    geo_grid_cache = SharedMemoryGeoGridCache(
+        settings.GEO_GRID_SHARED_CACHE_DIR,
+        max_bytes=settings.GEO_GRID_CACHE_MAX_BYTES,
+        dataset_version=settings.DATASET_VERSION,
+    )
+else:
+    geo_grid_cache = GeoGridCache(max_bytes=settings.GEO_GRID_CACHE_MAX_BYTES)
+
+month_cube_store = MonthCubeStore(settings.MONTH_CUBE_DIR)
+
+nearest_city_index = NearestCityIndex.from_citipy()
+
+point_series_index = PointSeriesIndex(settings.DATA_SETS_API)
+
+colorbar_assets = ColorbarAssets(settings.DATA_SETS_API, settings.TILES_DIR)
+
+mbtiles_cache = MBTilesCache(
+    max_open_files=settings.MBTILES_MAX_OPEN_FILES, pool_size=settings.MBTILES_POOL_SIZE
+)
+
+region_stats_cache = RegionStatsCache(max_bytes=settings.REGION_STATS_CACHE_MAX_BYTES)
+
+country_stats_cache = CountryStatsCache(
+    lambda: load_natural_earth_countries(settings.COUNTRY_BOUNDARIES_RESOLUTION),
+    max_entries=settings.COUNTRY_STATS_CACHE_SIZE,
+)
+
+matching_difference_layouts: Set[Tuple[GridLayout, GridLayout]] = set()
+
+aggregate_contour_configs: Dict[Tuple[int, int], ContourPlotConfig] = {}
 
-geo_grid_cache = GeoGridCache()
+raster_tile_renderer = RasterTileRenderer(
+    max_bytes=settings.TILE_CACHE_MAX_BYTES, max_zoom=settings.TILE_MAX_ZOOM
+)
 
-api.add_middleware(RateLimitMiddleware, calls_per_minute=1000)
+metrics = MetricsRegistry(settings.METRICS_DIR, flush_interval=settings.METRICS_FLUSH_INTERVAL)
+
+request_latency = metrics.histogram(
+    "climatemaps_request_duration_seconds", "Duration of API requests per route", ["route"]
+)
+phase_latency = metrics.histogram(
+    "climatemaps_phase_duration_seconds",
+    "Duration of the phases of climate data loads and of geocoding upstream requests",
+    ["phase"],
+)
+add_phase_listener(lambda phase, duration: phase_latency.observe(duration, phase))
+rate_limit_rejections = metrics.counter(
+    "climatemaps_rate_limit_rejections_total", "Requests rejected by the rate limit"
+)
+
+# the shared cache backend reports the same bytes and entries in every worker
+cache_gauge_mode = "max" if settings.GEO_GRID_CACHE_BACKEND == "shared" else "sum"
+for field, metric_name, metric_type, mode in [
+    ("hits", "hits_total", "counter", "sum"),
+    ("misses", "misses_total", "counter", "sum"),
+    ("evictions", "evictions_total", "counter", "sum"),
+    ("entries", "entries", "gauge", cache_gauge_mode),
+    ("bytes", "bytes", "gauge", cache_gauge_mode),
+]:
+    metrics.collector(
+        f"climatemaps_geo_grid_cache_{metric_name}",
+        f"GeoGrid cache {field}",
+        metric_type,
+        lambda field=field: {(): getattr(geo_grid_cache.stats(), field)},
+        mode=mode,
+    )
+
+api.add_middleware(RequestLatencyMiddleware, histogram=request_latency)
+api.add_middleware(
+    ServerTimingMiddleware, slow_request_threshold=settings.SLOW_REQUEST_LOG_THRESHOLD
+)
+api.add_middleware(RateLimitMiddleware, calls_per_minute=1000, on_reject=rate_limit_rejections.inc)
+
+access_stats = AccessStats()
+
+cache_warmer = CacheWarmer(
+    targets=get_warmup_targets(
+        strategy=settings.WARMUP_STRATEGY,
+        data_configs=settings.DATA_SETS_API,
+        historic_data_configs=HISTORIC_DATA_SETS,
+        months=settings.WARMUP_MONTHS,
+        access_stats_filepath=settings.ACCESS_STATS_PATH,
+        most_requested_n=settings.WARMUP_MOST_REQUESTED_N,
+    ),
+    load=lambda data_type, month: _get_geo_grid(data_type, month),
+)
+
+
+@api.get("/ready", response_model=WarmupStatus)
+def get_ready(response: Response) -> WarmupStatus:
+    status = cache_warmer.status()
+    if not status.ready:
+        response.status_code = 503
+    return status
+
+
+@api.get("/cache-stats", response_model=CacheStats)
+def get_cache_stats() -> CacheStats:
+    return geo_grid_cache.stats()
+
+
+@api.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @api.get("/climatemap", response_model=List[ClimateMap])
-def list_climate_map():
-    return climate_maps
+def list_climate_map(
+    request: Request,
+    variable: Optional[str] = None,
+    climate_scenario: Optional[str] = None,
+    climate_model: Optional[str] = None,
+    year_range: Optional[str] = Query(None, description="For example 2021-2040"),
+    resolution: Optional[str] = None,
+    is_difference_map: Optional[bool] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+):
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Offset must be 0 or larger")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be 1 or larger")
+
+    page = climate_map_catalog.query(
+        {
+            "variable": variable,
+            "climate_scenario": climate_scenario,
+            "climate_model": climate_model,
+            "year_range": year_range,
+            "resolution": resolution,
+            "is_difference_map": None if is_difference_map is None else str(is_difference_map),
+        },
+        offset=offset,
+        limit=limit,
+    )
+    return payload_response(request, page.payload, max_age=settings.CATALOG_CACHE_MAX_AGE)
 
 
 @api.get("/colorbar/{data_type}/{month}")
-def get_colorbar(data_type: str, month: int):
+def get_colorbar(
+    data_type: str, request: Request, month: str = Path(..., description=MONTH_DESCRIPTION)
+):
     """Serve colorbar image for a specific data type and month."""
-    tiles_path = Path("data/tiles")
-    colorbar_path = tiles_path / data_type / f"{month}_colorbar.png"
-
-    if colorbar_path.exists():
-        return FileResponse(
-            colorbar_path, media_type="image/png", filename=f"{data_type}_{month}_colorbar.png"
-        )
-    else:
+    period = _validate_data_type_and_period(data_type, month)
+    payload = colorbar_assets.get_image(data_type, _get_period_key(period))
+    if payload is None:
         raise HTTPException(status_code=404, detail="Colorbar not found")
 
+    return payload_response(request, payload, max_age=settings.COLORBAR_CACHE_MAX_AGE)
+
 
 class ColorbarConfigResponse(BaseModel):
     title: str
@@ -65,30 +253,231 @@ class ColorbarConfigResponse(BaseModel):
 
 
 @api.get("/colorbar-config/{data_type}", response_model=ColorbarConfigResponse)
-def get_colorbar_config(data_type: str):
+def get_colorbar_config(
+    data_type: str,
+    request: Request,
+    month: Optional[str] = Query(
+        None,
+        description="Month aggregate, like annual, to get its scaled colorbar. Monthly values share one colorbar.",
+    ),
+):
     """Get colorbar configuration (colors and levels) as JSON for a specific data type."""
-    if data_type not in data_config_map:
+    period = None if month is None else _validate_data_type_and_period(data_type, month)
+    if isinstance(period, MonthAggregate):
+        payload = colorbar_assets.get_aggregate_config(data_type, period)
+    else:
+        payload = colorbar_assets.get_config(data_type)
+    if payload is None:
         raise HTTPException(status_code=404, detail=f"Data type '{data_type}' not found")
 
-    data_config = data_config_map[data_type]
-    contour_config = data_config.contour_config
-    colorbar_data = contour_config.get_colorbar_data()
+    return payload_response(request, payload, max_age=settings.COLORBAR_CACHE_MAX_AGE)
+
+
+@api.get("/tiles/{data_type}/{month}/{z}/{x}/{y}.png")
+def get_raster_tile(
+    data_type: str,
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    month: str = Path(..., description=MONTH_DESCRIPTION),
+):
+    period = _validate_data_type_and_period(data_type, month)
+    try:
+        raster_tile_renderer.check_tile(z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        payload = raster_tile_renderer.get_tile(
+            data_type,
+            _get_period_key(period),
+            z,
+            x,
+            y,
+            _get_contour_config(data_type, period),
+            lambda: _get_period_geo_grid(data_type, period),
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering tile: {str(e)}")
+
+    return payload_response(request, payload, max_age=settings.TILE_CACHE_MAX_AGE)
+
+
+@api.get("/data/{tileset}/{z}/{x}/{y}.png")
+def get_mbtiles_raster_tile(tileset: str, z: int, x: int, y: int, request: Request):
+    return _get_mbtiles_tile(tileset, "raster", z, x, y, request)
+
+
+@api.get("/data/{tileset}/{z}/{x}/{y}.pbf")
+def get_mbtiles_vector_tile(tileset: str, z: int, x: int, y: int, request: Request):
+    return _get_mbtiles_tile(tileset, "vector", z, x, y, request)
+
 
-    return ColorbarConfigResponse(**colorbar_data)
+def _get_mbtiles_tile(tileset: str, kind: str, z: int, x: int, y: int, request: Request):
+    # tilesets are named {data_type}_{kind}_{month}, as in the tileserver config
+    parts = tileset.rsplit("_", 2)
+    if len(parts) != 3 or parts[1] != kind:
+        raise HTTPException(status_code=404, detail=f"Tileset '{tileset}' not found")
+    data_type = parts[0]
+    month = _get_period_key(_validate_data_type_and_period(data_type, parts[2]))
+
+    path = os.path.join(settings.TILES_DIR, data_type, f"{month}_{kind}.mbtiles")
+    mbtiles = mbtiles_cache.get(path)
+    if mbtiles is None:
+        raise HTTPException(status_code=404, detail=f"Tileset '{tileset}' not found")
+    return tile_response(request, mbtiles, z, x, y, max_age=settings.TILE_CACHE_MAX_AGE)
 
 
 class ClimateValueResponse(BaseModel):
     value: float
     data_type: str
-    month: int
+    month: Union[int, str]
     latitude: float
     longitude: float
     unit: str
     variable_name: str
 
 
-@api.get("/value/{data_type}/{month}", response_model=ClimateValueResponse)
-def get_climate_value(data_type: str, month: int, lat: float, lon: float):
+def _get_geo_grid(data_type: str, month: int) -> Union[GeoGrid, DifferenceGeoGrid]:
+    geo_grid = geo_grid_cache.get(data_type, month, record_miss=False)
+
+    if geo_grid is None:
+        cube = _get_cached_or_stored_month_cube(data_type)
+        if cube is not None:
+            return cube.month(month)
+
+        data_config = source_config_map[data_type]
+        if isinstance(data_config, ClimateDifferenceDataConfig):
+            return _get_difference_geo_grid(data_config, month)
+
+        geo_grid = geo_grid_cache.get_or_load(
+            data_type,
+            month,
+            lambda: load_climate_data_for_config(data_config, month),
+            timeout=settings.GEO_GRID_LOAD_TIMEOUT,
+        )
+
+    return geo_grid
+
+
+def _get_point_geo_grid(
+    data_type: str, month: int, lon: float, lat: float, load_in_background: bool = True
+) -> Union[GeoGrid, DifferenceGeoGrid]:
+    # until the grid is loaded, only the cells around the point are read from the raster
+    with timed_phase("cache_lookup"):
+        is_available = _is_geo_grid_available(data_type, month)
+    if not settings.WINDOWED_COLD_READS or is_available:
+        return _get_geo_grid(data_type, month)
+
+    if load_in_background:
+        _load_geo_grid_in_background(data_type, month)
+    return load_climate_data_at_point(source_config_map[data_type], month, lon, lat)
+
+
+def _is_geo_grid_available(data_type: str, month: int) -> bool:
+    if geo_grid_cache.contains(data_type, month):
+        return True
+    if _get_cached_or_stored_month_cube(data_type) is not None:
+        return True
+    data_config = source_config_map[data_type]
+    if isinstance(data_config, ClimateDifferenceDataConfig):
+        return all(
+            _is_geo_grid_available(component_data_type, month)
+            for component_data_type in _get_component_data_types(data_config)
+        )
+    return False
+
+
+def _load_geo_grid_in_background(data_type: str, month: int) -> None:
+    data_config = source_config_map[data_type]
+    if isinstance(data_config, ClimateDifferenceDataConfig):
+        for component_data_type in _get_component_data_types(data_config):
+            _load_geo_grid_in_background(component_data_type, month)
+        return
+
+    geo_grid_cache.load_in_background(
+        data_type, month, lambda: load_climate_data_for_config(data_config, month)
+    )
+
+
+def _get_component_data_types(data_config: ClimateDifferenceDataConfig) -> List[str]:
+    if data_config.future_config.climate_model == ClimateModel.ENSEMBLE_STD_DEV:
+        return [data_config.future_config.data_type_slug]
+    return [
+        data_config.future_config.data_type_slug,
+        data_config.historical_config.data_type_slug,
+    ]
+
+
+def _get_difference_geo_grid(
+    data_config: ClimateDifferenceDataConfig, month: int
+) -> Union[GeoGrid, DifferenceGeoGrid]:
+    # the components are cached under their own data types and shared by all difference maps
+    future_grid = _get_geo_grid(data_config.future_config.data_type_slug, month)
+    if data_config.future_config.climate_model == ClimateModel.ENSEMBLE_STD_DEV:
+        return future_grid
+    historical_grid = _get_geo_grid(data_config.historical_config.data_type_slug, month)
+    # the axes of the components are compared once per pair of grid layouts
+    layouts = (
+        get_grid_layout(future_grid.lon_range, future_grid.lat_range),
+        get_grid_layout(historical_grid.lon_range, historical_grid.lat_range),
+    )
+    if layouts in matching_difference_layouts:
+        return DifferenceGeoGrid.model_construct(future=future_grid, historical=historical_grid)
+    difference_grid = DifferenceGeoGrid(future=future_grid, historical=historical_grid)
+    matching_difference_layouts.add(layouts)
+    return difference_grid
+
+
+def _get_cached_or_stored_month_cube(data_type: str) -> Optional[MonthCube]:
+    cube = geo_grid_cache.get_cube(data_type, record_miss=False)
+
+    if cube is None:
+        cube = month_cube_store.load(data_type)
+        if cube is not None:
+            geo_grid_cache.set_cube(data_type, cube)
+
+    return cube
+
+
+def _get_month_cube(data_type: str) -> Union[MonthCube, DifferenceMonthCube]:
+    cube = _get_cached_or_stored_month_cube(data_type)
+
+    data_config = source_config_map[data_type]
+    if cube is None and isinstance(data_config, ClimateDifferenceDataConfig):
+        future_cube = _get_month_cube(data_config.future_config.data_type_slug)
+        if data_config.future_config.climate_model == ClimateModel.ENSEMBLE_STD_DEV:
+            return future_cube
+        historical_cube = _get_month_cube(data_config.historical_config.data_type_slug)
+        return DifferenceMonthCube(future=future_cube, historical=historical_cube)
+
+    if cube is None:
+        cube = geo_grid_cache.get_or_load_cube(
+            data_type,
+            lambda: _load_month_cube(data_type),
+            timeout=settings.GEO_GRID_LOAD_TIMEOUT,
+        )
+
+    return cube
+
+
+def _load_month_cube(data_type: str) -> MonthCube:
+    cached_geo_grids = [geo_grid_cache.get(data_type, month, record_miss=False) for month in MONTHS]
+    if all(geo_grid is not None for geo_grid in cached_geo_grids):
+        return MonthCube.from_geo_grids(cached_geo_grids)
+    return load_climate_data_cube(source_config_map[data_type])
+
+
+def _create_json_response(content: Dict[str, Any], response_model: Type[BaseModel]):
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(content)
+    return response_model(**content)
+
+
+def _validate_data_type_and_month(data_type: str, month: int) -> None:
     if data_type not in data_config_map:
         raise HTTPException(status_code=404, detail=f"Data type '{data_type}' not found")
 
@@ -97,150 +486,602 @@ def get_climate_value(data_type: str, month: int, lat: float, lon: float):
             status_code=400, detail=f"Invalid month: {month}. Must be between 1 and 12"
         )
 
-    data_config = data_config_map[data_type]
 
+def _validate_data_type_and_period(data_type: str, month: str) -> Period:
+    if month.isdigit():
+        _validate_data_type_and_month(data_type, int(month))
+        return int(month)
+
+    if data_type not in data_config_map:
+        raise HTTPException(status_code=404, detail=f"Data type '{data_type}' not found")
     try:
-        geo_grid = geo_grid_cache.get(data_type, month)
+        return MonthAggregate.parse(month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        if geo_grid is None:
-            if isinstance(data_config, ClimateDifferenceDataConfig):
-                geo_grid = load_climate_data_for_difference(
-                    data_config.historical_config, data_config.future_config, month
-                )
+
+def _get_period_key(period: Period) -> Union[int, str]:
+    return period if isinstance(period, int) else period.name
+
+
+def _get_period_geo_grid(data_type: str, period: Period) -> Union[GeoGrid, DifferenceGeoGrid]:
+    if isinstance(period, int):
+        return _get_geo_grid(data_type, period)
+    return geo_grid_cache.get_or_load(
+        data_type,
+        period.name,
+        lambda: _load_aggregate_geo_grid(data_type, period),
+        timeout=settings.GEO_GRID_LOAD_TIMEOUT,
+    )
+
+
+def _get_materialized_geo_grid(data_type: str, period: Period) -> GeoGrid:
+    geo_grid = _get_period_geo_grid(data_type, period)
+    if not isinstance(geo_grid, DifferenceGeoGrid):
+        return geo_grid
+    # statistics use all values, the difference is computed once and cached like other grids
+    return geo_grid_cache.get_or_load(
+        data_type,
+        _get_period_key(period),
+        geo_grid.materialize,
+        timeout=settings.GEO_GRID_LOAD_TIMEOUT,
+    )
+
+
+def _load_aggregate_geo_grid(data_type: str, aggregate: MonthAggregate) -> GeoGrid:
+    cube = _get_month_cube(data_type)
+    with timed_phase("aggregate"):
+        return aggregate.reduce_cube(cube, is_summed(data_config_map[data_type]))
+
+
+def _get_unit(data_type: str, period: Period) -> str:
+    data_config = data_config_map[data_type]
+    if isinstance(period, int):
+        return data_config.variable.unit
+    return get_aggregate_unit(data_config)
+
+
+def _get_contour_config(data_type: str, period: Period) -> ContourPlotConfig:
+    data_config = data_config_map[data_type]
+    if isinstance(period, int):
+        return data_config.contour_config
+    # one instance per contour config and number of months, the tile renderer caches by instance
+    key = (id(data_config.contour_config), len(period.months))
+    contour_config = aggregate_contour_configs.get(key)
+    if contour_config is None:
+        contour_config = get_aggregate_contour_config(data_config, period)
+        aggregate_contour_configs[key] = contour_config
+    return contour_config
+
+
+@api.get("/value/{data_type}/{month}", response_model=ClimateValueResponse)
+def get_climate_value(
+    data_type: str,
+    lat: float,
+    lon: float,
+    request: Request,
+    month: str = Path(..., description=MONTH_DESCRIPTION),
+    snap: bool = Query(
+        False,
+        description="Snap the coordinate to the center of its grid cell, redirecting to the canonical URL of the cell",
+    ),
+):
+    period = _validate_data_type_and_period(data_type, month)
+    month_key = _get_period_key(period)
+
+    data_config = data_config_map[data_type]
+
+    cell = None
+    if snap:
+        try:
+            cell = snap_to_cell(data_config.resolution, lon, lat, settings.VALUE_CELL_SUBDIVISIONS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not cell.contains_center(lon, lat):
+            # relative, the API runs behind a proxy that strips its path prefix
+            query = request.url.include_query_params(lat=cell.lat, lon=cell.lon).query
+            return RedirectResponse(
+                f"?{query}",
+                status_code=307,
+                headers={"Cache-Control": f"public, max-age={settings.VALUE_CELL_CACHE_MAX_AGE}"},
+            )
+        lon, lat = cell.lon, cell.lat
+
+    if isinstance(period, int):
+        access_stats.record(data_type, period)
+
+    try:
+        with timed_phase("grid"):
+            if isinstance(period, int):
+                geo_grid = _get_point_geo_grid(data_type, period, lon, lat)
             else:
-                geo_grid = load_climate_data(data_config, month)
-            geo_grid_cache.set(data_type, month, geo_grid)
-
-        value = geo_grid.get_value_at_coordinate(lon, lat)
-
-        return ClimateValueResponse(
-            value=value,
-            data_type=data_type,
-            month=month,
-            latitude=lat,
-            longitude=lon,
-            unit=data_config.variable.unit,
-            variable_name=data_config.variable.display_name,
-        )
+                geo_grid = _get_period_geo_grid(data_type, period)
+        with timed_phase("interpolation"):
+            value = geo_grid.get_value_at_coordinate(lon, lat)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving climate value: {str(e)}")
 
+    content = {
+        "value": float(value),
+        "data_type": data_type,
+        "month": month_key,
+        "latitude": lat,
+        "longitude": lon,
+        "unit": _get_unit(data_type, period),
+        "variable_name": data_config.variable.display_name,
+    }
+    if cell is None:
+        return _create_json_response(content, ClimateValueResponse)
 
-class NearestCityResponse(BaseModel):
-    city_name: str
-    country_name: str
+    # the value of a cell only changes when the dataset does
+    content["cell_id"] = cell.id
+    return cached_response(
+        request,
+        dump_json(content),
+        media_type="application/json",
+        etag=f'"{data_type}-{month_key}-{cell.id}-{settings.DATASET_VERSION}"',
+        max_age=settings.VALUE_CELL_CACHE_MAX_AGE,
+    )
+
+
+class RegionStatsResponse(BaseModel):
+    data_type: str
+    month: Union[int, str]
+    n_cells: int
+    mean: Optional[float]
+    area_weighted_mean: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+    unit: str
+    variable_name: str
+
+
+@api.get("/region-stats/{data_type}/{month}", response_model=RegionStatsResponse)
+def get_region_stats(
+    data_type: str,
+    month: str = Path(..., description=MONTH_DESCRIPTION),
+    bbox: str = Query(
+        ...,
+        description="lon_min,lat_min,lon_max,lat_max of the cell centers to include, a lon_min larger than lon_max crosses the antimeridian",
+    ),
+) -> RegionStatsResponse:
+    period = _validate_data_type_and_period(data_type, month)
+    try:
+        lon_min, lat_min, lon_max, lat_max = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be lon_min,lat_min,lon_max,lat_max")
+    if not (-180 <= lon_min <= 180 and -180 <= lon_max <= 180 and -90 <= lat_min <= lat_max <= 90):
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {bbox}")
+
+    try:
+        tables = region_stats_cache.get_tables(
+            data_type,
+            _get_period_key(period),
+            lambda: _get_materialized_geo_grid(data_type, period),
+            timeout=settings.GEO_GRID_LOAD_TIMEOUT,
+        )
+        stats = tables.bbox_stats(lon_min, lat_min, lon_max, lat_max)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing region stats: {str(e)}")
+
+    return _create_region_stats_response(data_type, period, stats)
+
+
+@api.post("/region-stats/{data_type}/{month}", response_model=RegionStatsResponse)
+def get_polygon_stats(
+    data_type: str,
+    month: str = Path(..., description=MONTH_DESCRIPTION),
+    geojson: Dict[str, Any] = Body(
+        ..., description="GeoJSON Polygon or MultiPolygon geometry, or a Feature with one"
+    ),
+) -> RegionStatsResponse:
+    period = _validate_data_type_and_period(data_type, month)
+    geometry = geojson.get("geometry") if geojson.get("type") == "Feature" else geojson
+    if not isinstance(geometry, dict):
+        raise HTTPException(status_code=400, detail="Feature has no geometry")
+
+    try:
+        geo_grid = _get_materialized_geo_grid(data_type, period)
+        cell_mask = region_stats_cache.get_mask(geometry, geo_grid.lon_range, geo_grid.lat_range)
+        stats = cell_mask.stats(geo_grid.values, geo_grid.lat_range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing region stats: {str(e)}")
+
+    return _create_region_stats_response(data_type, period, stats)
+
+
+def _create_region_stats_response(
+    data_type: str, period: Period, stats: RegionStats
+) -> RegionStatsResponse:
+    variable = data_config_map[data_type].variable
+    return RegionStatsResponse(
+        data_type=data_type,
+        month=_get_period_key(period),
+        n_cells=stats.n_cells,
+        mean=stats.mean,
+        area_weighted_mean=stats.area_weighted_mean,
+        min=stats.min,
+        max=stats.max,
+        unit=_get_unit(data_type, period),
+        variable_name=variable.display_name,
+    )
+
+
+class CountryStatsResponse(BaseModel):
     country_code: str
+    country_name: str
+    n_cells: int
+    mean: Optional[float]
+    area_weighted_mean: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+
+
+class CountriesStatsResponse(BaseModel):
+    data_type: str
+    month: Union[int, str]
+    unit: str
+    variable_name: str
+    countries: List[CountryStatsResponse]
+
+
+@api.get("/country-stats/{data_type}/{month}", response_model=CountriesStatsResponse)
+def get_country_stats(
+    data_type: str,
+    month: str = Path(..., description=MONTH_DESCRIPTION),
+    country: Optional[str] = Query(
+        None, description="Country code (ISO 3166-1 alpha-2), all countries if not given"
+    ),
+) -> CountriesStatsResponse:
+    period = _validate_data_type_and_period(data_type, month)
+    try:
+        stats = country_stats_cache.get_stats(
+            data_type,
+            _get_period_key(period),
+            lambda: _get_materialized_geo_grid(data_type, period),
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing country stats: {str(e)}")
+
+    if country is None:
+        selected = list(stats.values())
+    elif country.upper() in stats:
+        selected = [stats[country.upper()]]
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown country: {country}")
+
+    variable = data_config_map[data_type].variable
+    return CountriesStatsResponse(
+        data_type=data_type,
+        month=_get_period_key(period),
+        unit=_get_unit(data_type, period),
+        variable_name=variable.display_name,
+        countries=[
+            CountryStatsResponse(
+                country_code=country_stats.country.code,
+                country_name=country_stats.country.name,
+                n_cells=country_stats.stats.n_cells,
+                mean=country_stats.stats.mean,
+                area_weighted_mean=country_stats.stats.area_weighted_mean,
+                min=country_stats.stats.min,
+                max=country_stats.stats.max,
+            )
+            for country_stats in selected
+        ],
+    )
+
+
+class Coordinate(BaseModel):
     latitude: float
     longitude: float
 
 
-@api.get("/nearest-city", response_model=NearestCityResponse)
-def get_nearest_city(lat: float, lon: float) -> NearestCityResponse:
+class ClimateValuesRequest(BaseModel):
+    points: List[Coordinate]
+    data_types: List[str]
+    months: List[int]
+
+
+class ClimateValuesLayer(BaseModel):
+    data_type: str
+    month: int
+    unit: str
+    variable_name: str
+    values: List[Optional[float]]
+    errors: List[Optional[str]]
+
+
+class ClimateValuesResponse(BaseModel):
+    points: List[Coordinate]
+    layers: List[ClimateValuesLayer]
+
+
+@api.post("/values", response_model=ClimateValuesResponse)
+def get_climate_values(request: ClimateValuesRequest):
+    if len(request.points) > settings.VALUE_BATCH_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many points: {len(request.points)}. Maximum is {settings.VALUE_BATCH_MAX_POINTS}",
+        )
+    n_layers = len(request.data_types) * len(request.months)
+    if n_layers > settings.VALUE_BATCH_MAX_LAYERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many data type and month combinations: {n_layers}. Maximum is {settings.VALUE_BATCH_MAX_LAYERS}",
+        )
+    for data_type in request.data_types:
+        for month in request.months:
+            _validate_data_type_and_month(data_type, month)
+
+    lons = np.array([point.longitude for point in request.points], dtype=float)
+    lats = np.array([point.latitude for point in request.points], dtype=float)
+
+    layers: List[ClimateValuesLayer] = []
+    for data_type in request.data_types:
+        data_config = data_config_map[data_type]
+        for month in request.months:
+            access_stats.record(data_type, month)
+            values: List[Optional[float]] = [None] * len(request.points)
+            errors: List[Optional[str]] = [None] * len(request.points)
+            try:
+                geo_grid = _get_geo_grid(data_type, month)
+                grid_values = geo_grid.get_values_at_coordinates(lons, lats)
+                for i, value in enumerate(grid_values.tolist()):
+                    if math.isnan(value):
+                        errors[i] = _get_point_error(geo_grid, lons[i], lats[i])
+                    else:
+                        values[i] = value
+            except TimeoutError:
+                errors = ["Timed out waiting for climate data to load"] * len(request.points)
+            except Exception as e:
+                logger.error(f"Error retrieving climate values for {data_type}, month {month}: {e}")
+                errors = [f"Error retrieving climate value: {str(e)}"] * len(request.points)
+
+            layers.append(
+                ClimateValuesLayer(
+                    data_type=data_type,
+                    month=month,
+                    unit=data_config.variable.unit,
+                    variable_name=data_config.variable.display_name,
+                    values=values,
+                    errors=errors,
+                )
+            )
+
+    return ClimateValuesResponse(points=request.points, layers=layers)
+
+
+def _get_point_error(geo_grid: Union[GeoGrid, DifferenceGeoGrid], lon: float, lat: float) -> str:
     try:
-        city = citipy.nearest_city(lat, lon)
-        country_code = city.country_code.upper()
+        geo_grid.get_value_at_coordinate(float(lon), float(lat))
+    except ValueError as e:
+        return str(e)
+    return f"No data available at coordinates (lat={lat}, lon={lon})"
 
-        country_name = country_code
-        try:
-            country = pycountry.countries.get(alpha_2=country_code)
-            if country:
-                country_name = country.name
-        except Exception:
-            pass
-
-        return NearestCityResponse(
-            city_name=city.city_name,
-            country_name=country_name,
-            country_code=country_code,
-            latitude=lat,
-            longitude=lon,
+
+class ClimographSeries(BaseModel):
+    data_type: str
+    unit: str
+    variable_name: str
+    values: List[Optional[float]]
+
+
+class ClimographResponse(BaseModel):
+    latitude: float
+    longitude: float
+    series: List[ClimographSeries]
+
+
+@api.get("/climograph", response_model=ClimographResponse)
+def get_climograph(lat: float, lon: float, data_types: List[str] = Query(...)):
+    if len(data_types) > settings.CLIMOGRAPH_MAX_DATA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many data types: {len(data_types)}. Maximum is {settings.CLIMOGRAPH_MAX_DATA_TYPES}",
         )
+    for data_type in data_types:
+        if data_type not in data_config_map:
+            raise HTTPException(status_code=404, detail=f"Data type '{data_type}' not found")
+        for month in MONTHS:
+            access_stats.record(data_type, month)
+
+    try:
+        series: List[ClimographSeries] = []
+        for data_type in data_types:
+            data_config = data_config_map[data_type]
+            values = _get_month_cube(data_type).get_values_at_coordinate(lon, lat)
+            series.append(
+                ClimographSeries(
+                    data_type=data_type,
+                    unit=data_config.variable.unit,
+                    variable_name=data_config.variable.display_name,
+                    values=[None if math.isnan(value) else value for value in values.tolist()],
+                )
+            )
+        return ClimographResponse(latitude=lat, longitude=lon, series=series)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error finding nearest city: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving climograph: {str(e)}")
 
 
-class GeocodingLocation(BaseModel):
-    display_name: str
+class TimeseriesSeries(BaseModel):
+    data_type: str
+    variable: str
+    variable_name: str
+    unit: str
+    year_range: List[int]
+    climate_scenario: str
+    climate_model: str
+    resolution: str
+    is_difference_map: bool
+    value: Optional[float]
+
+
+class TimeseriesResponse(BaseModel):
     latitude: float
     longitude: float
-    type: str
-    bounding_box: Optional[List[float]] = None
+    month: int
+    series: List[TimeseriesSeries]
 
 
-@api.get("/geocode", response_model=List[GeocodingLocation])
-def search_locations(query: str, limit: int = 50) -> List[GeocodingLocation]:
-    if not query or len(query.strip()) < 2:
-        return []
+@api.get("/timeseries", response_model=TimeseriesResponse)
+def get_timeseries(
+    lat: float,
+    lon: float,
+    month: int,
+    variable: Optional[List[str]] = Query(None, description="Variable, like tmax"),
+    climate_scenario: Optional[List[str]] = Query(None, description="For example ssp370"),
+    climate_model: Optional[List[str]] = Query(None, description="For example ensemble_mean"),
+    resolution: Optional[List[str]] = Query(None, description="For example 10m"),
+    is_difference_map: Optional[bool] = None,
+):
+    if month < 1 or month > 12:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid month: {month}. Must be between 1 and 12"
+        )
+    groups = point_series_index.select(
+        variable, climate_scenario, climate_model, resolution, is_difference_map
+    )
+    n_data_types = sum(len(data_configs) for data_configs in groups.values())
+    if n_data_types > settings.TIMESERIES_MAX_DATA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many matching data types: {n_data_types}. Maximum is {settings.TIMESERIES_MAX_DATA_TYPES}",
+        )
+    for data_configs in groups.values():
+        for data_config in data_configs:
+            access_stats.record(data_config.data_type_slug, month)
 
-    if limit < 1 or limit > 50:
-        raise HTTPException(status_code=400, detail="Limit must be between 1 and 50")
+    try:
+        series: List[TimeseriesSeries] = []
+        for data_configs in groups.values():
+            # grids that aren't loaded are read around the point only, without loading them in
+            # the background, so that a request for many data sets doesn't fill the cache
+            with timed_phase("grid"):
+                geo_grids = [
+                    _get_point_geo_grid(
+                        config.data_type_slug, month, lon, lat, load_in_background=False
+                    )
+                    for config in data_configs
+                ]
+            with timed_phase("interpolation"):
+                values = gather_point_values(geo_grids, lon, lat)
+            for data_config, value in zip(data_configs, values.tolist()):
+                future_config = get_future_config(data_config)
+                series.append(
+                    TimeseriesSeries(
+                        data_type=data_config.data_type_slug,
+                        variable=data_config.variable.name,
+                        variable_name=data_config.variable.display_name,
+                        unit=data_config.variable.unit,
+                        year_range=list(data_config.year_range),
+                        climate_scenario=future_config.climate_scenario.value,
+                        climate_model=future_config.climate_model.value,
+                        resolution=data_config.resolution.value,
+                        is_difference_map=isinstance(data_config, ClimateDifferenceDataConfig),
+                        value=None if math.isnan(value) else value,
+                    )
+                )
+        return TimeseriesResponse(latitude=lat, longitude=lon, month=month, series=series)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Timed out waiting for climate data to load")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving time series: {str(e)}")
 
-    max_retries = 3
-    retry_delay = 0.5
 
-    for attempt in range(max_retries):
-        try:
-            results = geocoder.geocode(query, exactly_one=False, limit=50, language="en")
+class NearestCityResponse(BaseModel):
+    city_name: str
+    country_name: str
+    country_code: str
+    latitude: float
+    longitude: float
 
-            if not results:
-                return []
 
-            locations: List[GeocodingLocation] = []
+@api.get("/nearest-city", response_model=NearestCityResponse)
+def get_nearest_city(lat: float, lon: float):
+    try:
+        with timed_phase("nearest_city"):
+            city = nearest_city_index.nearest(lat, lon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding nearest city: {str(e)}")
+
+    return _create_json_response(_get_nearest_city_content(city, lat, lon), NearestCityResponse)
 
-            for result in results:
-                if not hasattr(result, "raw"):
-                    continue
 
-                raw = result.raw
-                properties = raw.get("properties", {})
+class NearestCitiesRequest(BaseModel):
+    points: List[Coordinate]
 
-                if not _is_city_country_or_town_photon(properties):
-                    continue
 
-                location_type = properties.get("type", "").lower()
-                bounding_box = None
-                if "extent" in properties and len(properties["extent"]) == 4:
-                    extent = properties["extent"]
-                    bounding_box = [extent[1], extent[3], extent[0], extent[2]]
+@api.post("/nearest-cities", response_model=List[NearestCityResponse])
+def get_nearest_cities(request: NearestCitiesRequest):
+    if len(request.points) > settings.VALUE_BATCH_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many points: {len(request.points)}. Maximum is {settings.VALUE_BATCH_MAX_POINTS}",
+        )
 
-                locations.append(
-                    GeocodingLocation(
-                        display_name=result.address,
-                        latitude=result.latitude,
-                        longitude=result.longitude,
-                        type=location_type,
-                        bounding_box=bounding_box,
-                    )
-                )
+    lats = [point.latitude for point in request.points]
+    lons = [point.longitude for point in request.points]
+    try:
+        cities = nearest_city_index.nearest_many(lats, lons)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding nearest cities: {str(e)}")
 
-            return locations[:limit]
-
-        except GeocoderTimedOut:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay * (2**attempt))
-                continue
-            raise HTTPException(status_code=504, detail="Geocoding service timed out after retries")
-        except GeocoderServiceError as e:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay * (2**attempt))
-                continue
-            raise HTTPException(status_code=503, detail=f"Geocoding service error: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error searching locations: {str(e)}")
-
-
-def _is_city_country_or_town_photon(properties: dict) -> bool:
-    location_type = properties.get("type", "").lower()
-
-    allowed_types = [
-        "city",
-        "town",
-        "village",
-        "hamlet",
-        "state",
-        "country",
+    contents = [
+        _get_nearest_city_content(city, lat, lon) for city, lat, lon in zip(cities, lats, lons)
     ]
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(contents)
+    return [NearestCityResponse(**content) for content in contents]
+
+
+def _get_nearest_city_content(city: NearestCity, lat: float, lon: float) -> Dict[str, Any]:
+    return {
+        "city_name": city.city_name,
+        "country_name": city.country_name,
+        "country_code": city.country_code,
+        "latitude": lat,
+        "longitude": lon,
+    }
+
+
+@api.get("/geocode", response_model=List[GeocodingLocation])
+async def search_locations(query: str, limit: int = 50) -> List[GeocodingLocation]:
+    if not query or len(query.strip()) < 2:
+        return []
+
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 50")
+
+    try:
+        with timed_phase("geocode"):
+            locations = await geocoder.search(query)
+    except GeocoderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except GeocoderServiceError as e:
+        raise HTTPException(status_code=503, detail=f"Geocoding service error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching locations: {str(e)}")
 
-    return location_type in allowed_types
+    return locations[:limit]
@@ -0,0 +1,205 @@
+import gzip
+import os
+import queue
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+from typing import Tuple
+
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi import Response
+
+from climatemaps.logger import logger
+
+from .responses import accepts_encoding
+from .responses import cached_response
+from .responses import etag_matches
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "pbf": "application/x-protobuf",
+}
+# zoom levels beyond this have tile coordinates that don't fit the SQLite integers
+MAX_ZOOM = 30
+
+
+@dataclass(frozen=True)
+class Tile:
+    data: bytes
+    media_type: str
+
+    @property
+    def is_gzipped(self) -> bool:
+        return self.data[:2] == b"\x1f\x8b"
+
+    def decompressed(self) -> bytes:
+        return gzip.decompress(self.data) if self.is_gzipped else self.data
+
+
+# the file identity (inode and mtime) is part of the ETag of its tiles
+class MBTilesFile:
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self.pool_size = pool_size
+        stat = os.stat(path)
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+        self._connections: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._n_connections = 0
+        self._lock = Lock()
+        self._closed = False
+        self.format = self._read_format()
+
+    def _connect(self) -> sqlite3.Connection:
+        # immutable: the tile builder replaces files instead of writing to them
+        return sqlite3.connect(
+            f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False
+        )
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._connections.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_connect = self._n_connections < self.pool_size
+            if can_connect:
+                self._n_connections += 1
+        if can_connect:
+            return self._connect()
+        while True:
+            try:
+                return self._connections.get(timeout=0.1)
+            except queue.Empty:
+                # connections in use are closed instead of released after the file is closed
+                if self._closed:
+                    return self._connect()
+
+    def _release(self, connection: sqlite3.Connection) -> None:
+        if self._closed:
+            connection.close()
+            return
+        self._connections.put(connection)
+
+    def _query(self, sql: str, parameters: Tuple = ()) -> Optional[tuple]:
+        connection = self._acquire()
+        try:
+            return connection.execute(sql, parameters).fetchone()
+        finally:
+            self._release(connection)
+
+    def _read_format(self) -> str:
+        row = self._query("SELECT value FROM metadata WHERE name = 'format'")
+        return row[0] if row is not None else "png"
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES.get(self.format, "application/octet-stream")
+
+    def get_etag(self, z: int, x: int, y: int) -> str:
+        inode, mtime_ns = self.identity
+        return f'"{inode:x}-{mtime_ns:x}-{z}-{x}-{y}"'
+
+    def get_tile(self, z: int, x: int, y: int) -> Optional[Tile]:
+        # MBTiles rows follow the TMS scheme, with y counted from the south
+        tms_y = 2**z - 1 - y
+        row = self._query(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, tms_y),
+        )
+        if row is None:
+            return None
+        return Tile(data=bytes(row[0]), media_type=self.media_type)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# a file that was replaced since it was opened is reopened
+class MBTilesCache:
+    def __init__(self, max_open_files: int = 256, pool_size: int = 4):
+        self.max_open_files = max_open_files
+        self.pool_size = pool_size
+        self._files: OrderedDict[str, MBTilesFile] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, path: str) -> Optional[MBTilesFile]:
+        try:
+            stat = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns)
+
+        with self._lock:
+            mbtiles = self._files.get(path)
+            if mbtiles is not None and mbtiles.identity == identity:
+                self._files.move_to_end(path)
+                return mbtiles
+
+        opened = MBTilesFile(path, self.pool_size)
+        evicted = []
+        with self._lock:
+            replaced = self._files.pop(path, None)
+            if replaced is not None:
+                evicted.append(replaced)
+            self._files[path] = opened
+            while len(self._files) > self.max_open_files:
+                evicted.append(self._files.popitem(last=False)[1])
+        for mbtiles in evicted:
+            if mbtiles is not opened:
+                mbtiles.close()
+        if replaced is not None and replaced.identity != identity:
+            logger.info(f"Reopened replaced MBTiles file {path}")
+        return opened
+
+    @property
+    def n_open_files(self) -> int:
+        return len(self._files)
+
+    def close(self) -> None:
+        with self._lock:
+            files = list(self._files.values())
+            self._files.clear()
+        for mbtiles in files:
+            mbtiles.close()
+
+
+def tile_response(request: Request, mbtiles: MBTilesFile, z: int, x: int, y: int, max_age: int):
+    if not 0 <= z <= MAX_ZOOM:
+        raise HTTPException(
+            status_code=400, detail=f"Zoom level {z} is out of range [0, {MAX_ZOOM}]"
+        )
+    if not (0 <= x < 2**z and 0 <= y < 2**z):
+        raise HTTPException(status_code=400, detail=f"Tile {z}/{x}/{y} does not exist")
+
+    is_vector = mbtiles.format == "pbf"
+    accepts_gzip = accepts_encoding(request, "gzip")
+    etag = mbtiles.get_etag(z, x, y)
+    headers = {}
+    if is_vector:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip:
+            etag = f'{etag[:-1]}-gzip"'
+    if etag_matches(request, etag):
+        return cached_response(request, b"", mbtiles.media_type, etag, max_age, headers)
+
+    tile = mbtiles.get_tile(z, x, y)
+    if tile is None:
+        return Response(status_code=204 if is_vector else 404, headers=headers)
+
+    body = tile.data
+    if tile.is_gzipped:
+        if accepts_gzip:
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = tile.decompressed()
+    return cached_response(request, body, tile.media_type, etag, max_age, headers)
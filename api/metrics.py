@@ -0,0 +1,315 @@
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from climatemaps.logger import logger
+
+from .processes import is_process_alive
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# only the owning thread writes to its dict, so updates need no lock
+class _PerThreadValues:
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._all: List[dict] = []
+        self._lock = Lock()
+
+    def get(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: dict = {}
+            self._local.values = values
+            with self._lock:
+                self._all.append(values)
+            return values
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return [dict(values) for values in self._all]
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = _PerThreadValues()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        values = self._values.get()
+        values[label_values] = values.get(label_values, 0.0) + amount
+
+    def collect(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for values in self._values.all():
+            for label_values, value in values.items():
+                totals[label_values] = totals.get(label_values, 0.0) + value
+        if not self.labelnames and not totals:
+            totals[()] = 0.0
+        return totals
+
+
+# per label values, the non-cumulative count of each bucket, the last one +Inf, then the sum
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = _PerThreadValues()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        values = self._values.get()
+        state = values.get(label_values)
+        if state is None:
+            state = [0.0] * (len(self.buckets) + 2)
+            values[label_values] = state
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        totals: Dict[LabelValues, List[float]] = {}
+        for values in self._values.all():
+            for label_values, state in values.items():
+                total = totals.setdefault(label_values, [0.0] * len(state))
+                for i, value in enumerate(list(state)):
+                    total[i] += value
+        return totals
+
+
+# the values of the workers are summed, or with mode max, for values they share, the largest is used
+class Collector:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        function: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        mode: str = "sum",
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.function = function
+        self.labelnames = tuple(labelnames)
+        self.mode = mode
+
+    def collect(self) -> Dict[LabelValues, float]:
+        return self.function()
+
+
+Metric = Union[Counter, Histogram, Collector]
+
+
+class MetricsRegistry:
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metrics: Dict[str, Metric] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        function: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        mode: str = "sum",
+    ) -> Collector:
+        return self._register(
+            Collector(name, documentation, metric_type, function, labelnames, mode)
+        )
+
+    def _register(self, metric: Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {}
+        for name, metric in self._metrics.items():
+            try:
+                samples = metric.collect()
+            except Exception as e:
+                logger.warning(f"Failed to collect metric {name}: {e}")
+                continue
+            snapshot[name] = [
+                [list(label_values), value] for label_values, value in samples.items()
+            ]
+        return snapshot
+
+    def start(self) -> None:
+        if self.directory is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            os.unlink(self._snapshot_path(os.getpid()))
+        except FileNotFoundError:
+            pass
+
+    def flush(self) -> None:
+        if self.directory is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self._snapshot_path(os.getpid()))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def _read_snapshots(self) -> List[Dict[str, Any]]:
+        snapshots = [self.snapshot()]
+        if self.directory is None:
+            return snapshots
+
+        for filename in os.listdir(self.directory):
+            pid_str, extension = os.path.splitext(filename)
+            if extension != ".json" or not pid_str.isdigit() or int(pid_str) == os.getpid():
+                continue
+            path = os.path.join(self.directory, filename)
+            if not is_process_alive(int(pid_str)):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to read metrics snapshot {path}: {e}")
+        return snapshots
+
+    def collect(self) -> Dict[str, Dict[LabelValues, Any]]:
+        aggregated: Dict[str, Dict[LabelValues, Any]] = {name: {} for name in self._metrics}
+        for snapshot in self._read_snapshots():
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                totals = aggregated[name]
+                for label_values, value in samples:
+                    key = tuple(label_values)
+                    total = totals.get(key)
+                    if total is None:
+                        totals[key] = value
+                    elif isinstance(metric, Histogram):
+                        totals[key] = [a + b for a, b in zip(total, value)]
+                    elif isinstance(metric, Collector) and metric.mode == "max":
+                        totals[key] = max(total, value)
+                    else:
+                        totals[key] = total + value
+        return aggregated
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, samples in self.collect().items():
+            metric = self._metrics[name]
+            metric_type = (
+                metric.metric_type if isinstance(metric, Collector) else type(metric).__name__
+            ).lower()
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for label_values, value in sorted(samples.items()):
+                labels = list(zip(metric.labelnames, label_values))
+                if isinstance(metric, Histogram):
+                    lines.extend(_render_histogram(metric, labels, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(
+    histogram: Histogram, labels: List[Tuple[str, str]], state: List[float]
+) -> List[str]:
+    lines = []
+    cumulative = 0.0
+    for bound, count in zip(list(histogram.buckets) + [math.inf], state[:-1]):
+        cumulative += count
+        bucket_labels = labels + [("le", _format_value(bound))]
+        lines.append(
+            f"{histogram.name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}"
+        )
+    lines.append(f"{histogram.name}_sum{_format_labels(labels)} {_format_value(state[-1])}")
+    lines.append(f"{histogram.name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+    return lines
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -1,39 +1,186 @@
+import json
 import time
-from collections import defaultdict
 from threading import Lock
+from typing import Callable
+from typing import Optional
 
-from fastapi import Request, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
 
+from climatemaps.logger import logger
+from climatemaps.timing import Phases
+from climatemaps.timing import record_phases
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+from .metrics import Histogram
+
+
+class _Shard:
+    def __init__(self) -> None:
+        # client -> [tokens, time of last update]
+        self.buckets: dict[str, list[float]] = {}
+        self.lock = Lock()
+        self.last_eviction = 0.0
+
+
+# idle clients, whose bucket is full again, are evicted
+class RateLimitMiddleware:
     # NOTE: This implementation uses per-worker in-memory storage.
     # With multiple uvicorn workers, rate limits are per-worker, not global.
-    def __init__(self, app, calls_per_minute: int = 60):
-        super().__init__(app)
+    N_SHARDS = 16
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls_per_minute: int = 60,
+        clock: Callable[[], float] = time.monotonic,
+        on_reject: Optional[Callable[[], None]] = None,
+    ):
+        self.app = app
         self.calls_per_minute = calls_per_minute
-        self.client_calls: dict[str, list[float]] = defaultdict(list)
-        self.lock = Lock()
+        self.on_reject = on_reject
+        self.refill_rate = calls_per_minute / 60.0
+        # seconds after which an idle client's bucket is full and its state can be dropped
+        self.idle_timeout = 60.0
+        self._clock = clock
+        self._shards = [_Shard() for _ in range(self.N_SHARDS)]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        if not self.acquire(client_ip):
+            if self.on_reject is not None:
+                self.on_reject()
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Please try again later."},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def acquire(self, client_ip: str) -> bool:
+        now = self._clock()
+        shard = self._shards[hash(client_ip) % self.N_SHARDS]
+        with shard.lock:
+            if now - shard.last_eviction >= self.idle_timeout:
+                self._evict_idle(shard, now)
+
+            bucket = shard.buckets.get(client_ip)
+            if bucket is None:
+                shard.buckets[client_ip] = [self.calls_per_minute - 1.0, now]
+                return True
+
+            tokens = min(self.calls_per_minute, bucket[0] + (now - bucket[1]) * self.refill_rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                return False
+            bucket[0] = tokens - 1
+            return True
+
+    @property
+    def n_clients(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def _evict_idle(self, shard: _Shard, now: float) -> None:
+        shard.buckets = {
+            client_ip: bucket
+            for client_ip, bucket in shard.buckets.items()
+            if now - bucket[1] < self.idle_timeout
+        }
+        shard.last_eviction = now
+
+
+# requests that match no route are observed as unmatched, so the label values are bounded
+class RequestLatencyMiddleware:
+    def __init__(self, app: ASGIApp, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # the router adds the matched route to the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.histogram.observe(time.perf_counter() - start, route_path)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp, slow_request_threshold: Optional[float] = None):
+        self.app = app
+        self.slow_request_threshold = slow_request_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        with record_phases() as phases:
+
+            async def send_with_server_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    durations = _sum_phases(phases)
+                    durations["total"] = time.perf_counter() - start
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", _format_server_timing(durations))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_server_timing)
+            finally:
+                duration = time.perf_counter() - start
+                if (
+                    self.slow_request_threshold is not None
+                    and duration >= self.slow_request_threshold
+                ):
+                    self._log_slow_request(scope, status_code, duration, phases)
 
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+    @staticmethod
+    def _log_slow_request(scope: Scope, status_code: int, duration: float, phases: Phases) -> None:
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        record = {
+            "event": "slow_request",
+            "method": scope["method"],
+            "path": scope["path"] + (f"?{query_string}" if query_string else ""),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "phases_ms": {
+                name: round(phase_duration * 1000, 1)
+                for name, phase_duration in _sum_phases(phases).items()
+            },
+        }
+        logger.warning(json.dumps(record))
 
-        with self.lock:
-            self.client_calls[client_ip] = [
-                timestamp
-                for timestamp in self.client_calls[client_ip]
-                if current_time - timestamp < 60
-            ]
 
-            if len(self.client_calls[client_ip]) >= self.calls_per_minute:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={"detail": "Rate limit exceeded. Please try again later."},
-                )
+def _sum_phases(phases: Phases) -> dict[str, float]:
+    durations: dict[str, float] = {}
+    for name, duration in list(phases):
+        durations[name] = durations.get(name, 0.0) + duration
+    return durations
 
-            self.client_calls[client_ip].append(current_time)
 
-        response = await call_next(request)
-        return response
+def _format_server_timing(durations: dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration * 1000:.3f}" for name, duration in durations.items())
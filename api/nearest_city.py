@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+import pycountry
+from citipy import citipy
+from scipy.spatial import cKDTree
+
+
+@dataclass(frozen=True)
+class NearestCity:
+    city_name: str
+    country_code: str
+    country_name: str
+
+
+# like citipy, distances are euclidean in (latitude, longitude) degrees
+class NearestCityIndex:
+    def __init__(self, cities: List[citipy.City]):
+        self._tree = cKDTree([(float(city.lat), float(city.lng)) for city in cities])
+        country_codes = {city.country_code.upper() for city in cities}
+        country_names = {
+            country.alpha_2: country.name
+            for country in pycountry.countries
+            if country.alpha_2 in country_codes
+        }
+        self._cities = [
+            NearestCity(
+                city_name=city.city_name,
+                country_code=city.country_code.upper(),
+                country_name=country_names.get(
+                    city.country_code.upper(), city.country_code.upper()
+                ),
+            )
+            for city in cities
+        ]
+
+    @classmethod
+    def from_citipy(cls) -> "NearestCityIndex":
+        return cls(list(citipy.WORLD_CITIES_DICT.values()))
+
+    def nearest(self, lat: float, lon: float) -> NearestCity:
+        return self.nearest_many([lat], [lon])[0]
+
+    def nearest_many(self, lats: npt.ArrayLike, lons: npt.ArrayLike) -> List[NearestCity]:
+        points = np.column_stack([np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)])
+        if not np.all(np.isfinite(points)):
+            raise ValueError("Coordinates must be finite numbers")
+        _, indices = self._tree.query(points)
+        return [self._cities[i] for i in indices.tolist()]
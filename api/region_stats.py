@@ -0,0 +1,108 @@
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+from climatemaps.geogrid import get_grid_layout
+from climatemaps.logger import logger
+from climatemaps.region import CellMask
+from climatemaps.region import SummedAreaTables
+from climatemaps.region import rasterize_polygon
+
+from .cache import SingleFlight
+
+TablesKey = Tuple[str, Union[int, str]]
+
+CacheEntry = Union[SummedAreaTables, CellMask]
+
+
+class RegionStatsCache:
+    def __init__(self, max_bytes: int = 1024**3):
+        self.max_bytes = max_bytes
+        # tables are keyed by data type and month, masks by a hash of the grid layout and polygon
+        self._entries: OrderedDict[Union[TablesKey, str], CacheEntry] = OrderedDict()
+        self._creating: SingleFlight[TablesKey, SummedAreaTables] = SingleFlight()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get_tables(
+        self,
+        data_type: str,
+        month: Union[int, str],
+        get_geo_grid: Callable[[], Union[GeoGrid, DifferenceGeoGrid]],
+        timeout: float,
+    ) -> SummedAreaTables:
+        key = (data_type, month)
+        tables = self._get_cached_tables(key)
+        if tables is not None:
+            return tables
+        return self._creating.run(key, lambda: self._create_tables(key, get_geo_grid), timeout)
+
+    def _get_cached_tables(self, key: TablesKey) -> Optional[SummedAreaTables]:
+        return self._get_entry(key)
+
+    def _get_entry(self, key: Union[TablesKey, str]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _add_entry(self, key: Union[TablesKey, str], entry: CacheEntry) -> None:
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _create_tables(
+        self, key: TablesKey, get_geo_grid: Callable[[], Union[GeoGrid, DifferenceGeoGrid]]
+    ) -> SummedAreaTables:
+        # a concurrent request may have created them between the miss and registering this one
+        tables = self._get_cached_tables(key)
+        if tables is not None:
+            return tables
+
+        geo_grid = get_geo_grid()
+        tables = SummedAreaTables(geo_grid.lon_range, geo_grid.lat_range, geo_grid.values)
+        data_type, month = key
+        logger.info(
+            f"Created summed-area tables for {data_type} month {month} ({tables.nbytes / 1024**2:.0f} MB)"
+        )
+        self._add_entry(key, tables)
+        return tables
+
+    def get_mask(
+        self,
+        geometry: Mapping[str, Any],
+        lon_range: npt.NDArray[np.floating],
+        lat_range: npt.NDArray[np.floating],
+    ) -> CellMask:
+        grid_layout = get_grid_layout(lon_range, lat_range)
+        geometry_json = json.dumps(geometry, sort_keys=True, separators=(",", ":"))
+        key = hashlib.sha256(f"{grid_layout}{geometry_json}".encode()).hexdigest()
+        mask = self._get_entry(key)
+        if mask is not None:
+            return mask
+
+        mask = rasterize_polygon(geometry, lon_range, lat_range)
+        self._add_entry(key, mask)
+        return mask
+
+    @property
+    def n_bytes(self) -> int:
+        return self._bytes
@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Mapping
+from typing import Optional
+
+import orjson
+from fastapi import Request
+from fastapi import Response
+
+
+@dataclass(frozen=True)
+class StaticPayload:
+    body: bytes
+    media_type: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+    compress: bool = False
+    etag: str = field(init=False)
+    gzip_body: Optional[bytes] = field(init=False, default=None)
+    gzip_etag: Optional[str] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        object.__setattr__(self, "etag", f'"{digest}"')
+        if self.compress:
+            object.__setattr__(self, "gzip_body", gzip.compress(self.body, mtime=0))
+            object.__setattr__(self, "gzip_etag", f'"{digest}-gzip"')
+
+
+def dump_json(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# returning it from an endpoint skips the response_model validation and encoding
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    qualities = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def cached_response(
+    request: Request, body: bytes, media_type: str, etag: str, max_age: int, headers=None
+) -> Response:
+    response_headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    headers = headers or {}
+    if "Vary" in headers:
+        response_headers["Vary"] = headers["Vary"]
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=response_headers)
+    response_headers.update(headers)
+    return Response(content=body, media_type=media_type, headers=response_headers)
+
+
+def payload_response(request: Request, payload: StaticPayload, max_age: int) -> Response:
+    if payload.gzip_body is None:
+        return cached_response(
+            request, payload.body, payload.media_type, payload.etag, max_age, dict(payload.headers)
+        )
+
+    headers = {**payload.headers, "Vary": "Accept-Encoding"}
+    if accepts_encoding(request, "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        return cached_response(
+            request, payload.gzip_body, payload.media_type, payload.gzip_etag, max_age, headers
+        )
+    return cached_response(
+        request, payload.body, payload.media_type, payload.etag, max_age, headers
+    )
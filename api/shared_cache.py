@@ -0,0 +1,312 @@
+import fcntl
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from threading import Lock
+
+import numpy as np
+
+from climatemaps.cube import MonthCube
+from climatemaps.geogrid import GeoGrid
+from climatemaps.logger import logger
+
+from .cache import BaseGeoGridCache
+from .cache import CacheItem
+from .cache import CacheStats
+from .processes import is_process_alive
+
+
+# evicted segments stay valid for the workers that still map them, until they drop their views
+class SharedMemoryGeoGridCache(BaseGeoGridCache):
+    FORMAT_VERSION = 1
+    SEGMENT_SUFFIX = ".seg"
+    TEMP_SUFFIX = ".tmp"
+    # {cache key}.{dataset version}.seg.{pid}.{thread id}.tmp
+    TEMP_NAME_PATTERN = re.compile(r"\.seg\.(\d+)\.\d+\.tmp$")
+    # version, value itemsize, n_lon, n_lat, ndim, shape (up to 3 dimensions)
+    HEADER_SIZE = 8
+    HEADER_BYTES = HEADER_SIZE * np.dtype(np.int64).itemsize
+    # minimum seconds between access time updates of a segment by one worker
+    TOUCH_INTERVAL = 1.0
+    # seconds between attempts to take the lock of a key that another worker is loading
+    LOCK_POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        max_size: int = BaseGeoGridCache.MAX_SIZE,
+        background_workers: int = 2,
+        dataset_version: str = "1",
+    ) -> None:
+        super().__init__(background_workers)
+        self.directory = directory
+        self._segment_suffix = f".{dataset_version}{self.SEGMENT_SUFFIX}"
+        self.max_bytes = max_bytes
+        self.max_size = max_size
+        self._lock_directory = os.path.join(directory, "locks")
+        os.makedirs(self._lock_directory, exist_ok=True)
+        # cache key -> (segment inode, attached item)
+        self._attached: dict[str, Tuple[int, CacheItem]] = {}
+        # items that are memory-mapped already are shared through the page cache and not copied
+        self._mapped: dict[str, CacheItem] = {}
+        self._touched: dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+        self._lock = Lock()
+        self._remove_stale_files()
+
+    def stats(self) -> CacheStats:
+        segments = self._list_segments()
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                rejections=self._rejections,
+                entries=len(segments) + len(self._mapped),
+                bytes=sum(size for _, size, _ in segments),
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self) -> None:
+        with self._exclusive_lock(), self._lock:
+            for _, _, path in self._list_segments():
+                self._unlink_segment(path)
+            self._attached.clear()
+            self._mapped.clear()
+
+    def _segment_path(self, cache_key: str) -> str:
+        return os.path.join(self.directory, f"{cache_key}{self._segment_suffix}")
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self._lock_directory, f"{name}.lock")
+
+    def _contains(self, cache_key: str) -> bool:
+        with self._lock:
+            if cache_key in self._mapped:
+                return True
+        return os.path.exists(self._segment_path(cache_key))
+
+    def _get(self, cache_key: str, record_miss: bool = True) -> Optional[CacheItem]:
+        item = self._get_item(cache_key)
+        with self._lock:
+            if item is not None:
+                self._hits += 1
+            elif record_miss:
+                self._misses += 1
+        return item
+
+    def _get_item(self, cache_key: str) -> Optional[CacheItem]:
+        with self._lock:
+            item = self._mapped.get(cache_key)
+            if item is not None:
+                return item
+            attached = self._attached.get(cache_key)
+
+        path = self._segment_path(cache_key)
+        try:
+            inode = os.stat(path).st_ino
+            if attached is not None and attached[0] == inode:
+                item = attached[1]
+            else:
+                item = self._attach(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._attached.pop(cache_key, None)
+            return None
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable cache segment {path}: {e}")
+            return None
+
+        with self._lock:
+            self._attached[cache_key] = (inode, item)
+        self._touch(cache_key, path)
+        return item
+
+    def _set(self, cache_key: str, item: CacheItem) -> None:
+        if isinstance(item.values, np.memmap):
+            with self._lock:
+                self._mapped[cache_key] = item
+            return
+
+        values = item.values
+        if values.dtype not in (np.float32, np.float64):
+            values = values.astype(float)
+        axes = np.concatenate([item.lon_range, item.lat_range]).astype(np.float64)
+        size = self.HEADER_BYTES + axes.nbytes + values.nbytes
+        if size > self.max_bytes:
+            with self._lock:
+                self._rejections += 1
+            return
+
+        header = np.zeros(self.HEADER_SIZE, dtype=np.int64)
+        header[:5] = [
+            self.FORMAT_VERSION,
+            values.dtype.itemsize,
+            item.lon_range.size,
+            item.lat_range.size,
+            values.ndim,
+        ]
+        header[5 : 5 + values.ndim] = values.shape
+
+        path = self._segment_path(cache_key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}{self.TEMP_SUFFIX}"
+        with self._exclusive_lock():
+            # room is made before writing, so the segments never exceed the budget
+            self._evict(path, size)
+            try:
+                with open(temp_path, "wb") as f:
+                    header.tofile(f)
+                    axes.tofile(f)
+                    np.ascontiguousarray(values).tofile(f)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        self._release_evicted()
+
+    def _load(self, cache_key: str, load: Callable[[], CacheItem], timeout: float) -> CacheItem:
+        # only one worker process loads a key, the others find it in the cache afterwards
+        with self._exclusive_lock(cache_key, timeout=timeout):
+            return super()._load(cache_key, load, timeout)
+
+    def _attach(self, path: str) -> CacheItem:
+        header = np.fromfile(path, dtype=np.int64, count=self.HEADER_SIZE)
+        if header.size != self.HEADER_SIZE or header[0] != self.FORMAT_VERSION:
+            raise ValueError("unknown segment format")
+        itemsize, n_lon, n_lat, ndim = (int(value) for value in header[1:5])
+        shape = tuple(int(value) for value in header[5 : 5 + ndim])
+
+        axes = np.memmap(
+            path, dtype=np.float64, mode="r", offset=self.HEADER_BYTES, shape=(n_lon + n_lat,)
+        )
+        values = np.memmap(
+            path,
+            dtype=np.dtype(f"f{itemsize}"),
+            mode="r",
+            offset=self.HEADER_BYTES + axes.nbytes,
+            shape=shape,
+        )
+        lon_range, lat_range = axes[:n_lon], axes[n_lon:]
+        if ndim == 3:
+            return MonthCube(lon_range=lon_range, lat_range=lat_range, values=values)
+        return GeoGrid(lon_range=lon_range, lat_range=lat_range, values=values)
+
+    def _touch(self, cache_key: str, path: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._touched.get(cache_key, -self.TOUCH_INTERVAL) < self.TOUCH_INTERVAL:
+                return
+            self._touched[cache_key] = now
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _list_segments(self) -> list[Tuple[int, int, str]]:
+        segments = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self._segment_suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                segments.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return segments
+
+    def _evict(self, new_path: str, new_size: int) -> None:
+        # a segment that is replaced by the new one doesn't count
+        segments = sorted(segment for segment in self._list_segments() if segment[2] != new_path)
+        n_bytes = sum(size for _, size, _ in segments) + new_size
+        n_entries = len(segments) + 1
+        for _, size, path in segments:
+            if n_bytes <= self.max_bytes and n_entries <= self.max_size:
+                break
+            self._unlink_segment(path)
+            n_bytes -= size
+            n_entries -= 1
+            with self._lock:
+                self._evictions += 1
+
+    def _release_evicted(self) -> None:
+        with self._lock:
+            attached = list(self._attached)
+        evicted = [key for key in attached if not os.path.exists(self._segment_path(key))]
+        with self._lock:
+            for cache_key in evicted:
+                self._attached.pop(cache_key, None)
+
+    def _remove_stale_files(self) -> None:
+        with self._exclusive_lock():
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.TEMP_SUFFIX):
+                        match = self.TEMP_NAME_PATTERN.search(entry.name)
+                        if match is None:
+                            continue
+                        pid = int(match.group(1))
+                        if pid != os.getpid() and not is_process_alive(pid):
+                            logger.info(f"Removing temp file of stopped worker: {entry.path}")
+                            self._unlink(entry.path)
+                    elif entry.name.endswith(self.SEGMENT_SUFFIX):
+                        if not entry.name.endswith(self._segment_suffix):
+                            logger.info(f"Removing cache segment of other dataset: {entry.path}")
+                            self._unlink(entry.path)
+                            continue
+                        try:
+                            self._attach(entry.path)
+                        except (ValueError, OSError):
+                            logger.info(f"Removing unreadable cache segment: {entry.path}")
+                            self._unlink(entry.path)
+
+    def _unlink_segment(self, path: str) -> None:
+        self._unlink(path)
+        # a worker that still holds the lock of the key may load it again concurrently, which
+        # only duplicates the load
+        cache_key = os.path.basename(path).removesuffix(self._segment_suffix)
+        self._unlink(self._lock_path(cache_key))
+
+    @classmethod
+    def _unlink(cls, path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _exclusive_lock(
+        self, name: str = "cache", timeout: Optional[float] = None
+    ) -> Iterator[None]:
+        with open(self._lock_path(name), "a") as f:
+            if timeout is None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                self._lock_with_timeout(f, name, timeout)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @classmethod
+    def _lock_with_timeout(cls, f: IO, name: str, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {name}")
+                time.sleep(cls.LOCK_POLL_INTERVAL)
@@ -0,0 +1,22 @@
+from typing import Callable
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from climatemaps.geogrid import GeoGrid
+
+
+@pytest.fixture
+def create_geo_grid() -> Callable[..., GeoGrid]:
+    # global grids with a constant value, or random values if a seed is given
+    def create(
+        value: float = 0.0, width: int = 4, height: int = 2, seed: Optional[int] = None
+    ) -> GeoGrid:
+        if seed is None:
+            values = np.full((height, width), value, dtype=float)
+        else:
+            values = np.random.default_rng(seed).normal(size=(height, width))
+        return GeoGrid.from_global_values(values)
+
+    return create
@@ -0,0 +1,127 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.cache import GeoGridCache
+
+
+class TestGeoGridCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, create_geo_grid):
+        self.create_geo_grid = create_geo_grid
+        self.geo_grid = create_geo_grid()
+        self.size = GeoGridCache.get_size(self.geo_grid)
+        self.cache = GeoGridCache(max_bytes=4 * self.size)
+
+    def test_get_miss_and_hit(self):
+        assert self.cache.get("a", 1) is None
+        self.cache.set("a", 1, self.geo_grid)
+        assert self.cache.get("a", 1) is self.geo_grid
+        stats = self.cache.stats()
+        assert (stats.hits, stats.misses, stats.entries, stats.bytes) == (1, 1, 1, self.size)
+
+    def test_aggregate_and_month_keys(self):
+        aggregate = self.create_geo_grid(1.0)
+        self.cache.set("a", "6", aggregate)
+        assert self.cache.get("a", 6) is None
+        self.cache.set("a", 6, self.geo_grid)
+        assert self.cache.get("a", "6") is aggregate
+        assert self.cache.get("a", 6) is self.geo_grid
+
+    def test_evicts_when_over_byte_budget(self):
+        for month in range(1, 6):
+            self.cache.set("a", month, self.create_geo_grid())
+        stats = self.cache.stats()
+        assert stats.entries == 4
+        assert stats.evictions == 1
+        assert stats.bytes <= stats.max_bytes
+        assert self.cache.get("a", 1) is None
+
+    def test_rejects_items_larger_than_budget(self):
+        cache = GeoGridCache(max_bytes=self.size - 1)
+        cache.set("a", 1, self.geo_grid)
+        assert cache.get("a", 1) is None
+        assert cache.stats().rejections == 1
+
+    def test_scan_does_not_evict_frequently_used(self):
+        self.cache.set("hot", 1, self.geo_grid)
+        self.cache.get("hot", 1)
+        for month in range(1, 13):
+            self.cache.set("scan", month, self.create_geo_grid())
+        assert self.cache.get("hot", 1) is self.geo_grid
+
+    def test_max_size(self):
+        cache = GeoGridCache(max_bytes=100 * self.size, max_size=2)
+        for month in range(1, 4):
+            cache.set("a", month, self.create_geo_grid())
+        assert cache.stats().entries == 2
+
+
+class TestGeoGridCacheGetOrLoad:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, create_geo_grid):
+        self.create_geo_grid = create_geo_grid
+        self.cache = GeoGridCache(max_bytes=1024**2)
+
+    def _run_concurrently(self, load, n_threads: int = 8, timeout: float = 5):
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            futures = [
+                executor.submit(self.cache.get_or_load, "a", 1, load, timeout)
+                for _ in range(n_threads)
+            ]
+            return [future.exception() or future.result() for future in futures]
+
+    def test_single_load_for_concurrent_misses(self):
+        calls = []
+        geo_grid = self.create_geo_grid()
+
+        def load():
+            calls.append(1)
+            time.sleep(0.2)
+            return geo_grid
+
+        results = self._run_concurrently(load)
+        assert len(calls) == 1
+        assert all(result is geo_grid for result in results)
+        assert self.cache.get("a", 1) is geo_grid
+
+    def test_error_propagates_to_all_waiters(self):
+        def load():
+            time.sleep(0.2)
+            raise FileNotFoundError("missing")
+
+        results = self._run_concurrently(load)
+        assert all(isinstance(result, FileNotFoundError) for result in results)
+        assert self.cache.get("a", 1) is None
+
+    def test_waiters_time_out(self):
+        def load():
+            time.sleep(0.5)
+            return self.create_geo_grid()
+
+        results = self._run_concurrently(load, n_threads=2, timeout=0.05)
+        assert sum(isinstance(result, TimeoutError) for result in results) == 1
+
+    def test_background_loads(self, monkeypatch):
+        monkeypatch.setattr(self.cache, "MAX_BACKGROUND_LOADS", 2)
+        release = threading.Event()
+        calls = []
+        geo_grid = self.create_geo_grid()
+
+        def load():
+            calls.append(1)
+            release.wait(timeout=5)
+            return geo_grid
+
+        for month in [1, 1, 2, 3]:
+            for _ in range(4):
+                self.cache.load_in_background("a", month, load)
+        release.set()
+        self.cache._executor.shutdown(wait=True)
+        assert len(calls) == 2
+        assert self.cache.get("a", 1) is geo_grid
+        assert self.cache.get("a", 3) is None
@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import pytest
+
+from api.catalog import ClimateMapCatalog
+from climatemaps.config import ClimateMap
+from climatemaps.datasets import DIFFERENCE_DATA_SETS
+from climatemaps.datasets import FUTURE_DATA_SETS
+from climatemaps.datasets import HISTORIC_DATA_SETS
+
+
+@pytest.fixture(scope="module")
+def catalog() -> ClimateMapCatalog:
+    data_configs = HISTORIC_DATA_SETS + FUTURE_DATA_SETS[:50] + DIFFERENCE_DATA_SETS[:50]
+    return ClimateMapCatalog([ClimateMap.create(data_config) for data_config in data_configs])
+
+
+class TestClimateMapCatalog:
+
+    def test_all(self, catalog):
+        page = catalog.query({})
+        assert page.total == len(catalog.climate_maps)
+        expected = [climate_map.model_dump(mode="json") for climate_map in catalog.climate_maps]
+        assert json.loads(page.payload.body) == expected
+        assert gzip.decompress(page.payload.gzip_body) == page.payload.body
+
+    def test_filter(self, catalog):
+        filters = {
+            "variable": "TMAX",
+            "climate_model": "ensemble_mean",
+            "is_difference_map": "False",
+        }
+        page = catalog.query(filters)
+        expected = [
+            climate_map.data_type
+            for climate_map in catalog.climate_maps
+            if climate_map.variable.name == "Tmax"
+            and climate_map.climate_model is not None
+            and climate_map.climate_model.value == "ENSEMBLE_MEAN"
+            and not climate_map.is_difference_map
+        ]
+        assert expected
+        assert [item["data_type"] for item in json.loads(page.payload.body)] == expected
+        assert page.total == len(expected)
+
+    def test_filter_year_range_and_resolution(self, catalog):
+        page = catalog.query({"year_range": "1970-2000", "resolution": "10m"})
+        items = json.loads(page.payload.body)
+        assert items
+        assert all(item["year_range"] == [1970, 2000] for item in items)
+        assert all(item["resolution"] == "10m" for item in items)
+
+    def test_unknown_value(self, catalog):
+        page = catalog.query({"climate_scenario": "SSP999"})
+        assert page.total == 0
+        assert page.payload.body == b"[]"
+
+    def test_pagination(self, catalog):
+        all_items = json.loads(catalog.query({}).payload.body)
+        page = catalog.query({}, offset=10, limit=5)
+        assert json.loads(page.payload.body) == all_items[10:15]
+        assert page.total == len(all_items)
+        assert page.payload.headers["X-Total-Count"] == str(len(all_items))
+
+    def test_pages_are_cached(self, catalog):
+        assert catalog.query({"variable": "prec"}) is catalog.query({"variable": "PREC"})
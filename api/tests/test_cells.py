@@ -0,0 +1,53 @@
+import pytest
+
+from api.cells import get_cell_size
+from api.cells import snap_to_cell
+from climatemaps.datasets import SpatialResolution
+
+
+class TestSnapToCell:
+
+    def test_cell_size(self):
+        assert get_cell_size(SpatialResolution.MIN30) == pytest.approx(0.5)
+        assert get_cell_size(SpatialResolution.MIN2_5) == pytest.approx(2.5 / 60)
+
+    def test_snap_to_center(self):
+        cell = snap_to_cell(SpatialResolution.MIN30, lon=4.9, lat=52.37)
+        assert (cell.row, cell.col) == (75, 369)
+        assert cell.lon == pytest.approx(4.75)
+        assert cell.lat == pytest.approx(52.25)
+        assert cell.id == "30m_1_75_369"
+        assert not cell.contains_center(4.9, 52.37)
+        assert cell.contains_center(cell.lon, cell.lat)
+
+    def test_points_in_cell_share_center(self):
+        cell = snap_to_cell(SpatialResolution.MIN30, lon=4.51, lat=52.49)
+        assert snap_to_cell(SpatialResolution.MIN30, lon=4.99, lat=52.01) == cell
+
+    @pytest.mark.parametrize("resolution", list(SpatialResolution))
+    @pytest.mark.parametrize("subdivisions", [1, 3])
+    def test_snapping_center_is_stable(self, resolution, subdivisions):
+        for lon, lat in [(4.9, 52.37), (-122.41, 37.77), (151.2, -33.86), (0.0, 0.0)]:
+            cell = snap_to_cell(resolution, lon, lat, subdivisions)
+            assert snap_to_cell(resolution, cell.lon, cell.lat, subdivisions) == cell
+            assert abs(cell.lon - lon) <= cell.size / 2 + 1e-6
+            assert abs(cell.lat - lat) <= cell.size / 2 + 1e-6
+
+    def test_subdivisions(self):
+        cell = snap_to_cell(SpatialResolution.MIN30, lon=4.9, lat=52.37, subdivisions=5)
+        assert cell.size == pytest.approx(0.1)
+        assert cell.lon == pytest.approx(4.95)
+        assert cell.lat == pytest.approx(52.35)
+        assert cell.id == "30m_5_376_1849"
+
+    def test_edges(self):
+        cell = snap_to_cell(SpatialResolution.MIN30, lon=180.0, lat=-90.0)
+        assert (cell.row, cell.col) == (359, 719)
+        cell = snap_to_cell(SpatialResolution.MIN30, lon=-180.0, lat=90.0)
+        assert (cell.row, cell.col) == (0, 0)
+
+    def test_out_of_range(self):
+        with pytest.raises(ValueError):
+            snap_to_cell(SpatialResolution.MIN30, lon=180.5, lat=0.0)
+        with pytest.raises(ValueError):
+            snap_to_cell(SpatialResolution.MIN30, lon=0.0, lat=-91.0)
@@ -0,0 +1,101 @@
+import json
+
+from fastapi import FastAPI
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from api.colorbar import ColorbarAssets
+from api.responses import payload_response
+from climatemaps.aggregate import AGGREGATES
+from climatemaps.aggregate import get_aggregate_contour_config
+from climatemaps.aggregate import is_summed
+from climatemaps.datasets import HISTORIC_DATA_SETS
+
+
+class TestColorbarAssets:
+
+    def setup_method(self):
+        self.data_configs = HISTORIC_DATA_SETS[:3]
+        self.data_type = self.data_configs[0].data_type_slug
+
+    def _create_client(self, assets: ColorbarAssets) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/colorbar/{data_type}/{month}")
+        def get_colorbar(data_type: str, month: int, request: Request):
+            payload = assets.get_image(data_type, month)
+            if payload is None:
+                raise HTTPException(status_code=404)
+            return payload_response(request, payload, max_age=60)
+
+        @app.get("/colorbar-config/{data_type}")
+        def get_colorbar_config(data_type: str, request: Request):
+            return payload_response(request, assets.get_config(data_type), max_age=60)
+
+        return TestClient(app)
+
+    def test_config_matches_contour_config(self, tmp_path):
+        assets = ColorbarAssets(self.data_configs, str(tmp_path))
+        payload = assets.get_config(self.data_type)
+        expected = self.data_configs[0].contour_config.get_colorbar_data()
+        assert json.loads(payload.body) == expected
+        assert assets.get_config("unknown") is None
+
+    def test_aggregate_config(self, tmp_path):
+        precipitation = next(config for config in HISTORIC_DATA_SETS if is_summed(config))
+        assets = ColorbarAssets(self.data_configs + [precipitation], str(tmp_path))
+        annual = AGGREGATES["annual"]
+        monthly = assets.get_config(self.data_type)
+        assert assets.get_aggregate_config(self.data_type, annual) is monthly
+
+        data_type = precipitation.data_type_slug
+        payload = assets.get_aggregate_config(data_type, annual)
+        scaled = get_aggregate_contour_config(precipitation, annual)
+        assert json.loads(payload.body) == scaled.get_colorbar_data()
+        assert (
+            json.loads(payload.body)["level_upper"] == precipitation.contour_config.level_upper * 12
+        )
+        assert assets.get_aggregate_config(data_type, annual) is payload
+        assert assets.get_aggregate_config("unknown", annual) is None
+
+    def test_config_not_modified(self, tmp_path):
+        client = self._create_client(ColorbarAssets(self.data_configs, str(tmp_path)))
+        response = client.get(f"/colorbar-config/{self.data_type}")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=60"
+        etag = response.headers["etag"]
+
+        response = client.get(
+            f"/colorbar-config/{self.data_type}", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        response = client.get(
+            f"/colorbar-config/{self.data_type}", headers={"If-None-Match": '"x"'}
+        )
+        assert response.status_code == 200
+
+    def test_image(self, tmp_path):
+        (tmp_path / self.data_type).mkdir()
+        (tmp_path / self.data_type / "1_colorbar.png").write_bytes(b"png")
+        (tmp_path / self.data_type / "djf_colorbar.png").write_bytes(b"djf")
+        (tmp_path / self.data_type / "1_raster.mbtiles").write_bytes(b"")
+        assets = ColorbarAssets(self.data_configs, str(tmp_path))
+        assert assets.get_image(self.data_type, "djf").body == b"djf"
+        client = self._create_client(assets)
+        assert client.get(f"/colorbar/{self.data_type}/2").status_code == 404
+        assert client.get(f"/colorbar/{self.data_type}_other/1").status_code == 404
+
+        response = client.get(f"/colorbar/{self.data_type}/1")
+        assert response.status_code == 200
+        assert response.content == b"png"
+        assert response.headers["content-type"] == "image/png"
+        assert f"{self.data_type}_1_colorbar.png" in response.headers["content-disposition"]
+
+        response = client.get(
+            f"/colorbar/{self.data_type}/1", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == 304
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from api.geocoding import CachingGeocoder
+from api.geocoding import GeocoderServiceError
+from api.geocoding import GeocodingLocation
+from api.geocoding import LocalGeocoder
+from api.geocoding import PhotonGeocoder
+from api.geocoding import TTLCache
+
+LOCATIONS = [
+    GeocodingLocation(
+        display_name="London, England, United Kingdom", latitude=51.5, longitude=-0.1, type="city"
+    ),
+    GeocodingLocation(
+        display_name="Utrecht, Netherlands", latitude=52.1, longitude=5.1, type="city"
+    ),
+]
+
+
+class FailingGeocoder(LocalGeocoder):
+    async def search(self, query: str):
+        self.n_requests += 1
+        await asyncio.sleep(0.01)
+        raise GeocoderServiceError("unavailable")
+
+
+class TestTTLCache:
+    def test_expiry(self):
+        now = [0.0]
+        cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 9.9
+        assert cache.get("a") == 1
+        now[0] = 10.0
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self):
+        cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestCachingGeocoder:
+    def test_normalized_queries_share_entry(self):
+        local = LocalGeocoder(LOCATIONS)
+        geocoder = CachingGeocoder(local)
+
+        async def run():
+            first = await geocoder.search("London")
+            second = await geocoder.search("  LONDON ")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert [location.display_name for location in first] == [LOCATIONS[0].display_name]
+        assert second == first
+        assert local.n_requests == 1
+
+    def test_concurrent_queries_coalesced(self):
+        local = LocalGeocoder(LOCATIONS, latency=0.05)
+        geocoder = CachingGeocoder(local)
+
+        async def run():
+            return await asyncio.gather(*[geocoder.search("utrecht") for _ in range(10)])
+
+        results = asyncio.run(run())
+        assert all(len(result) == 1 for result in results)
+        assert local.n_requests == 1
+
+    def test_cancelled_request_does_not_cancel_others(self):
+        local = LocalGeocoder(LOCATIONS, latency=0.05)
+        geocoder = CachingGeocoder(local)
+
+        async def run():
+            first = asyncio.create_task(geocoder.search("utrecht"))
+            second = asyncio.create_task(geocoder.search("utrecht"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        result = asyncio.run(run())
+        assert [location.display_name for location in result] == [LOCATIONS[1].display_name]
+        assert local.n_requests == 1
+        assert asyncio.run(geocoder.search("utrecht")) == result
+        assert local.n_requests == 1
+
+    def test_errors_not_cached(self):
+        local = FailingGeocoder([])
+        geocoder = CachingGeocoder(local)
+
+        async def run():
+            return await asyncio.gather(
+                *[geocoder.search("london") for _ in range(3)], return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(result, GeocoderServiceError) for result in results)
+        assert local.n_requests == 1
+        with pytest.raises(GeocoderServiceError):
+            asyncio.run(geocoder.search("london"))
+        assert local.n_requests == 2
+
+
+def test_photon_parse_features():
+    features = [
+        {
+            "geometry": {"coordinates": [5.12, 52.09]},
+            "properties": {
+                "name": "Utrecht",
+                "state": "Utrecht",
+                "country": "Netherlands",
+                "type": "city",
+                "extent": [4.97, 52.14, 5.19, 52.03],
+            },
+        },
+        {
+            "geometry": {"coordinates": [5.1, 52.1]},
+            "properties": {"name": "Utrecht Centraal", "type": "house"},
+        },
+    ]
+    locations = PhotonGeocoder._parse_features(features)
+    assert len(locations) == 1
+    assert locations[0].display_name == "Utrecht, Utrecht, Netherlands"
+    assert locations[0].latitude == 52.09
+    assert locations[0].longitude == 5.12
+    assert locations[0].bounding_box == [52.14, 52.03, 4.97, 5.19]
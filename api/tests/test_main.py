@@ -0,0 +1,317 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.cache import GeoGridCache
+from api.tests.test_mbtiles import create_mbtiles
+from climatemaps.geogrid import GeoGrid
+from climatemaps.tests.test_zonal import COUNTRIES
+
+DATA_TYPE = "tmax_1970_2000_10m"
+OTHER_DATA_TYPE = "tmin_1970_2000_10m"
+
+
+@pytest.fixture
+def create_land_geo_grid(create_geo_grid):
+    def create(value: float) -> GeoGrid:
+        geo_grid = create_geo_grid(value, width=36, height=18)
+        # no data west of the prime meridian, like an ocean
+        geo_grid.values[:, :18] = np.nan
+        return geo_grid
+
+    return create
+
+
+@pytest.fixture
+def geo_grid_cache(monkeypatch, create_land_geo_grid) -> GeoGridCache:
+    geo_grid_cache = GeoGridCache(max_bytes=1024**2)
+    for month in [1, 7]:
+        geo_grid_cache.set(DATA_TYPE, month, create_land_geo_grid(month))
+        geo_grid_cache.set(OTHER_DATA_TYPE, month, create_land_geo_grid(-month))
+    monkeypatch.setattr(main, "geo_grid_cache", geo_grid_cache)
+    monkeypatch.setattr(main, "access_stats", main.AccessStats())
+    return geo_grid_cache
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(main.app)
+
+
+class TestSnappedValue:
+
+    def test_redirect_location_is_relative(self, client):
+        response = client.get(
+            f"/v1/value/{DATA_TYPE}/1",
+            params={"lat": 52.37, "lon": 4.89, "snap": "true"},
+            follow_redirects=False,
+        )
+        assert response.status_code == 307
+        location = response.headers["location"]
+        assert location.startswith("?")
+        params = dict(param.split("=") for param in location[1:].split("&"))
+        assert params["snap"] == "true"
+        assert float(params["lat"]) == pytest.approx(52.41666, abs=1e-4)
+        assert float(params["lon"]) == pytest.approx(4.91666, abs=1e-4)
+
+
+class TestColorbar:
+
+    def test_aggregate_colorbar_config(self, client):
+        data_type = "precipitation_1970_2000_10m"
+        monthly = client.get(f"/v1/colorbar-config/{data_type}").json()
+        annual = client.get(f"/v1/colorbar-config/{data_type}", params={"month": "annual"}).json()
+        assert annual["level_upper"] == pytest.approx(monthly["level_upper"] * 12)
+        assert annual["unit"] == "mm"
+        assert client.get(f"/v1/colorbar-config/{data_type}", params={"month": 3}).json() == monthly
+        response = client.get(f"/v1/colorbar-config/{data_type}", params={"month": "winter"})
+        assert response.status_code == 400
+
+    def test_aggregate_colorbar_image(self, client, monkeypatch, tmp_path):
+        (tmp_path / DATA_TYPE).mkdir()
+        (tmp_path / DATA_TYPE / "djf_colorbar.png").write_bytes(b"png")
+        colorbar_assets = main.ColorbarAssets([main.data_config_map[DATA_TYPE]], str(tmp_path))
+        monkeypatch.setattr(main, "colorbar_assets", colorbar_assets)
+        response = client.get(f"/v1/colorbar/{DATA_TYPE}/12,1,2")
+        assert response.status_code == 200
+        assert response.content == b"png"
+        assert client.get(f"/v1/colorbar/{DATA_TYPE}/annual").status_code == 404
+        assert client.get(f"/v1/colorbar/{DATA_TYPE}/13").status_code == 400
+
+
+class TestClimateValues:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, geo_grid_cache):
+        pass
+
+    def test_batch(self, client):
+        points = [
+            {"latitude": 10.0, "longitude": 20.0},
+            {"latitude": 10.0, "longitude": -100.0},
+            {"latitude": 89.9, "longitude": 20.0},
+        ]
+        response = client.post(
+            "/v1/values",
+            json={"points": points, "data_types": [DATA_TYPE, OTHER_DATA_TYPE], "months": [1, 7]},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["points"] == points
+        layers = [(layer["data_type"], layer["month"]) for layer in body["layers"]]
+        assert layers == [
+            (DATA_TYPE, 1),
+            (DATA_TYPE, 7),
+            (OTHER_DATA_TYPE, 1),
+            (OTHER_DATA_TYPE, 7),
+        ]
+        for layer, expected in zip(body["layers"], [1.0, 7.0, -1.0, -7.0]):
+            assert layer["values"][0] == pytest.approx(expected)
+            assert layer["values"][1:] == [None, None]
+            assert layer["errors"][0] is None
+            assert layer["errors"][1].startswith("No data available")
+            assert layer["errors"][2] is not None
+            assert layer["unit"] == "°C"
+
+    def test_invalid_requests(self, client, monkeypatch):
+        point = {"latitude": 10.0, "longitude": 20.0}
+
+        def post(data_types, months, points=(point,)):
+            return client.post(
+                "/v1/values",
+                json={"points": list(points), "data_types": data_types, "months": months},
+            )
+
+        assert post([DATA_TYPE], [13]).status_code == 400
+        assert post(["unknown"], [1]).status_code == 404
+        monkeypatch.setattr(main.settings, "VALUE_BATCH_MAX_POINTS", 2)
+        assert post([DATA_TYPE], [1], points=[point] * 3).status_code == 400
+        monkeypatch.setattr(main.settings, "VALUE_BATCH_MAX_LAYERS", 3)
+        response = post([DATA_TYPE, OTHER_DATA_TYPE], [1, 7])
+        assert response.status_code == 400
+        assert "Maximum is 3" in response.json()["detail"]
+
+
+class TestTiles:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch, geo_grid_cache, tmp_path):
+        monkeypatch.setattr(main, "raster_tile_renderer", main.RasterTileRenderer(max_zoom=4))
+        monkeypatch.setattr(main, "mbtiles_cache", main.MBTilesCache())
+        monkeypatch.setattr(main.settings, "TILES_DIR", str(tmp_path))
+        (tmp_path / DATA_TYPE).mkdir()
+        create_mbtiles(str(tmp_path / DATA_TYPE / "1_raster.mbtiles"), "png", {(0, 0, 0): b"png"})
+
+    def test_raster_tile(self, client):
+        response = client.get(f"/v1/tiles/{DATA_TYPE}/1/0/0/0.png")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content.startswith(b"\x89PNG")
+        response = client.get(
+            f"/v1/tiles/{DATA_TYPE}/1/0/0/0.png",
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304
+
+        assert client.get(f"/v1/tiles/{DATA_TYPE}/13/0/0/0.png").status_code == 400
+        assert client.get(f"/v1/tiles/{DATA_TYPE}/1/5/0/0.png").status_code == 404
+        assert client.get(f"/v1/tiles/{DATA_TYPE}/1/1/2/0.png").status_code == 404
+        assert client.get("/v1/tiles/unknown/1/0/0/0.png").status_code == 404
+
+    def test_mbtiles_tile(self, client):
+        response = client.get(f"/v1/data/{DATA_TYPE}_raster_1/0/0/0.png")
+        assert response.status_code == 200
+        assert response.content == b"png"
+        assert client.get(f"/v1/data/{DATA_TYPE}_raster_1/1/0/0.png").status_code == 404
+        assert client.get(f"/v1/data/{DATA_TYPE}_raster_1/0/1/0.png").status_code == 400
+        assert client.get(f"/v1/data/{DATA_TYPE}_raster_13/0/0/0.png").status_code == 400
+        assert client.get(f"/v1/data/{DATA_TYPE}_raster_7/0/0/0.png").status_code == 404
+        assert client.get(f"/v1/data/{DATA_TYPE}_vector_1/0/0/0.pbf").status_code == 404
+        assert client.get(f"/v1/data/{DATA_TYPE}_raster_1/0/0/0.pbf").status_code == 404
+        assert client.get("/v1/data/unknown_raster_1/0/0/0.png").status_code == 404
+
+
+class TestRegionStats:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch, geo_grid_cache):
+        region_stats_cache = main.RegionStatsCache(max_bytes=1024**2)
+        monkeypatch.setattr(main, "region_stats_cache", region_stats_cache)
+
+    def test_bbox(self, client):
+        response = client.get(f"/v1/region-stats/{DATA_TYPE}/7", params={"bbox": "0,-10,40,10"})
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["month"], body["n_cells"], body["unit"]) == (7, 8, "°C")
+        assert body["mean"] == pytest.approx(7)
+        assert body["area_weighted_mean"] == pytest.approx(7)
+
+        response = client.get(f"/v1/region-stats/{DATA_TYPE}/7", params={"bbox": "-40,-10,-10,10"})
+        assert response.status_code == 200
+        assert response.json()["n_cells"] == 0
+        assert response.json()["mean"] is None
+
+    def test_invalid_bbox(self, client):
+        for bbox in ["0,-10,40", "a,b,c,d", "0,10,40,-10", "0,-10,190,10"]:
+            response = client.get(f"/v1/region-stats/{DATA_TYPE}/1", params={"bbox": bbox})
+            assert response.status_code == 400
+        response = client.get("/v1/region-stats/unknown/1", params={"bbox": "0,-10,40,10"})
+        assert response.status_code == 404
+        response = client.get(f"/v1/region-stats/{DATA_TYPE}/13", params={"bbox": "0,-10,40,10"})
+        assert response.status_code == 400
+
+    def test_polygon(self, client):
+        ring = [[0, -10], [40, -10], [40, 10], [0, 10], [0, -10]]
+        polygon = {"type": "Polygon", "coordinates": [ring]}
+        response = client.post(f"/v1/region-stats/{DATA_TYPE}/1", json=polygon)
+        assert response.status_code == 200
+        assert response.json()["n_cells"] == 8
+        assert response.json()["mean"] == pytest.approx(1)
+        feature = {"type": "Feature", "properties": {}, "geometry": polygon}
+        response = client.post(f"/v1/region-stats/{OTHER_DATA_TYPE}/1", json=feature)
+        assert response.json()["mean"] == pytest.approx(-1)
+
+        point = {"type": "Point", "coordinates": [10, 0]}
+        assert client.post(f"/v1/region-stats/{DATA_TYPE}/1", json=point).status_code == 400
+        response = client.post(f"/v1/region-stats/{DATA_TYPE}/1", json={"type": "Feature"})
+        assert response.status_code == 400
+        assert client.post("/v1/region-stats/unknown/1", json=polygon).status_code == 404
+
+
+class TestCountryStats:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch, geo_grid_cache):
+        monkeypatch.setattr(main, "country_stats_cache", main.CountryStatsCache(lambda: COUNTRIES))
+
+    def test_stats(self, client):
+        response = client.get(f"/v1/country-stats/{DATA_TYPE}/1")
+        assert response.status_code == 200
+        countries = {country["country_code"]: country for country in response.json()["countries"]}
+        # Gamma contains no cell center, Delta is west of the prime meridian without data
+        assert set(countries) == {"AA", "BB", "DD"}
+        assert countries["BB"]["mean"] == pytest.approx(1)
+        assert countries["DD"]["n_cells"] == 0
+
+        response = client.get(f"/v1/country-stats/{DATA_TYPE}/1", params={"country": "bb"})
+        assert response.status_code == 200
+        assert [country["country_name"] for country in response.json()["countries"]] == ["Beta"]
+
+        response = client.get(f"/v1/country-stats/{DATA_TYPE}/1", params={"country": "ZZ"})
+        assert response.status_code == 404
+        assert client.get("/v1/country-stats/unknown/1").status_code == 404
+        assert client.get(f"/v1/country-stats/{DATA_TYPE}/0").status_code == 400
+
+
+class TestTimeseries:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, geo_grid_cache, create_land_geo_grid):
+        self.client = client
+        self.filters = {
+            "variable": "tmax",
+            "climate_scenario": "ssp370",
+            "climate_model": "ensemble_mean",
+            "resolution": "10m",
+        }
+        groups = main.point_series_index.select(["tmax"], ["ssp370"], ["ensemble_mean"], ["10m"])
+        # the difference maps are relative to the historical DATA_TYPE, 1 in month 1
+        self.expected = {}
+        for configs in groups.values():
+            for config in configs:
+                future_data_type = main.get_future_config(config).data_type_slug
+                value = float(config.year_range[0])
+                geo_grid_cache.set(future_data_type, 1, create_land_geo_grid(value))
+                is_difference = isinstance(config, main.ClimateDifferenceDataConfig)
+                self.expected[config.data_type_slug] = value - 1 if is_difference else value
+
+    def _get(self, **params):
+        params = {"lat": 0, "lon": 20, "month": 1, **self.filters, **params}
+        return self.client.get("/v1/timeseries", params=params)
+
+    def test_series(self):
+        response = self._get()
+        assert response.status_code == 200
+        series = response.json()["series"]
+        assert {item["data_type"] for item in series} == set(self.expected)
+        assert any(item["is_difference_map"] for item in series)
+        for item in series:
+            assert item["value"] == pytest.approx(self.expected[item["data_type"]])
+            assert item["unit"] == "°C"
+        year_ranges = [item["year_range"] for item in series if not item["is_difference_map"]]
+        assert year_ranges == sorted(year_ranges)
+
+        response = self._get(is_difference_map=True)
+        assert all(item["is_difference_map"] for item in response.json()["series"])
+        response = self._get(lon=-20)
+        assert all(item["value"] is None for item in response.json()["series"])
+
+    def test_invalid_requests(self, monkeypatch):
+        assert self._get(month=13).status_code == 400
+        assert self._get(lat=95).status_code == 400
+        monkeypatch.setattr(main.settings, "TIMESERIES_MAX_DATA_TYPES", 1)
+        response = self._get()
+        assert response.status_code == 400
+        assert "Maximum is 1" in response.json()["detail"]
+
+
+class TestDifferenceGrids:
+
+    def test_materialized_once(self, monkeypatch, create_land_geo_grid):
+        geo_grid_cache = GeoGridCache(max_bytes=1024**2)
+        monkeypatch.setattr(main, "geo_grid_cache", geo_grid_cache)
+        data_config = next(
+            config
+            for config in main.settings.DATA_SETS_API
+            if isinstance(config, main.ClimateDifferenceDataConfig)
+            and config.future_config.climate_model != main.ClimateModel.ENSEMBLE_STD_DEV
+        )
+        geo_grid_cache.set(data_config.future_config.data_type_slug, 1, create_land_geo_grid(3))
+        geo_grid_cache.set(data_config.historical_config.data_type_slug, 1, create_land_geo_grid(1))
+
+        geo_grid = main._get_materialized_geo_grid(data_config.data_type_slug, 1)
+        assert isinstance(geo_grid, GeoGrid)
+        assert np.nanmax(geo_grid.values) == 2
+        assert main._get_materialized_geo_grid(data_config.data_type_slug, 1) is geo_grid
+        assert main._get_geo_grid(data_config.data_type_slug, 1) is geo_grid
@@ -0,0 +1,151 @@
+import gzip
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from api.mbtiles import MBTilesCache
+from api.mbtiles import MBTilesFile
+from api.mbtiles import tile_response
+
+
+def create_mbtiles(path: str, tile_format: str, tiles: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    connection = sqlite3.connect(tmp_path)
+    connection.execute("CREATE TABLE metadata (name text, value text)")
+    connection.execute(
+        "CREATE TABLE tiles (zoom_level integer, tile_column integer, tile_row integer, tile_data blob)"
+    )
+    connection.execute("INSERT INTO metadata VALUES ('format', ?)", (tile_format,))
+    for (z, x, tms_y), data in tiles.items():
+        connection.execute("INSERT INTO tiles VALUES (?, ?, ?, ?)", (z, x, tms_y, data))
+    connection.commit()
+    connection.close()
+    os.replace(tmp_path, path)
+
+
+class TestMBTiles:
+
+    def setup_method(self):
+        self.pbf = b"\x1a\x05layer"
+
+    def _create_files(self, tmp_path):
+        raster_path = str(tmp_path / "1_raster.mbtiles")
+        vector_path = str(tmp_path / "1_vector.mbtiles")
+        # tile 1/0/0 in XYZ is row 1 in TMS
+        create_mbtiles(raster_path, "png", {(1, 0, 1): b"png-north", (1, 0, 0): b"png-south"})
+        create_mbtiles(vector_path, "pbf", {(1, 0, 1): gzip.compress(self.pbf)})
+        return raster_path, vector_path
+
+    def _create_client(self, cache: MBTilesCache) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/{path}/{z}/{x}/{y}")
+        def get_tile(path: str, z: int, x: int, y: int, request: Request):
+            mbtiles = cache.get(os.path.join(self.directory, path))
+            if mbtiles is None:
+                raise HTTPException(status_code=404)
+            return tile_response(request, mbtiles, z, x, y, max_age=60)
+
+        return TestClient(app)
+
+    def test_get_tile(self, tmp_path):
+        raster_path, vector_path = self._create_files(tmp_path)
+        raster = MBTilesFile(raster_path)
+        assert raster.media_type == "image/png"
+        assert raster.get_tile(1, 0, 0).data == b"png-north"
+        assert raster.get_tile(1, 0, 1).data == b"png-south"
+        assert raster.get_tile(1, 1, 0) is None
+
+        vector = MBTilesFile(vector_path)
+        assert vector.media_type == "application/x-protobuf"
+        tile = vector.get_tile(1, 0, 0)
+        assert tile.is_gzipped
+        assert tile.decompressed() == self.pbf
+
+    def test_pool_shared_by_threads(self, tmp_path):
+        raster_path, _ = self._create_files(tmp_path)
+        raster = MBTilesFile(raster_path, pool_size=2)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tiles = list(executor.map(lambda _: raster.get_tile(1, 0, 0), range(200)))
+        assert all(tile.data == b"png-north" for tile in tiles)
+        assert raster._n_connections <= 2
+
+    def test_responses(self, tmp_path):
+        self._create_files(tmp_path)
+        self.directory = str(tmp_path)
+        client = self._create_client(MBTilesCache())
+
+        response = client.get("/1_raster.mbtiles/1/0/0")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content == b"png-north"
+        response = client.get(
+            "/1_raster.mbtiles/1/0/0", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == 304
+        assert client.get("/1_raster.mbtiles/1/1/1").status_code == 404
+        assert client.get("/missing.mbtiles/1/0/0").status_code == 404
+
+        response = client.get("/1_vector.mbtiles/1/0/0", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"] == "application/x-protobuf"
+        assert response.content == self.pbf
+        gzip_etag = response.headers["etag"]
+
+        response = client.get("/1_vector.mbtiles/1/0/0", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == self.pbf
+        assert response.headers["etag"] != gzip_etag
+        response = client.get("/1_vector.mbtiles/1/0/0", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "content-encoding" not in response.headers
+        assert response.content == self.pbf
+        assert client.get("/1_vector.mbtiles/1/1/1").status_code == 204
+
+        response = client.get(
+            "/1_vector.mbtiles/1/0/0",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag},
+        )
+        assert response.status_code == 304
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_invalid_tile_coordinates(self, tmp_path):
+        self._create_files(tmp_path)
+        self.directory = str(tmp_path)
+        client = self._create_client(MBTilesCache())
+        for z, x, y in [(1, 2, 0), (1, 0, -1), (-1, 0, 0), (31, 0, 0), (64, 0, 0), (0, 2**63, 0)]:
+            assert client.get(f"/1_raster.mbtiles/{z}/{x}/{y}").status_code == 400
+
+    def test_reopens_replaced_file(self, tmp_path):
+        raster_path, _ = self._create_files(tmp_path)
+        cache = MBTilesCache()
+        mbtiles = cache.get(raster_path)
+        etag = mbtiles.get_etag(1, 0, 0)
+        assert cache.get(raster_path) is mbtiles
+
+        create_mbtiles(raster_path, "png", {(1, 0, 1): b"png-new"})
+        reopened = cache.get(raster_path)
+        assert reopened is not mbtiles
+        assert reopened.get_tile(1, 0, 0).data == b"png-new"
+        assert reopened.get_etag(1, 0, 0) != etag
+        assert cache.n_open_files == 1
+
+    def test_lru_of_open_files(self, tmp_path):
+        paths = []
+        for month in range(1, 4):
+            path = str(tmp_path / f"{month}_raster.mbtiles")
+            create_mbtiles(path, "png", {(0, 0, 0): f"png-{month}".encode()})
+            paths.append(path)
+
+        cache = MBTilesCache(max_open_files=2)
+        first = cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[2])
+        assert cache.n_open_files == 2
+        assert cache.get(paths[0]) is not first
+        assert cache.get(paths[0]).get_tile(0, 0, 0).data == b"png-1"
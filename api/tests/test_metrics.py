@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from api.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+
+    def test_counter_over_threads(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ["route"])
+
+        def increment():
+            for _ in range(1000):
+                counter.inc("/a")
+            counter.inc("/b", amount=2)
+
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.collect() == {("/a",): 4000, ("/b",): 8}
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.counter("rejections_total", "Rejections")
+        histogram = registry.histogram("duration_seconds", "Duration", ["phase"], buckets=[0.1, 1])
+        histogram.observe(0.05, "decode")
+        histogram.observe(0.5, "decode")
+        histogram.observe(5, "decode")
+        registry.collector("cache_bytes", "Cache bytes", "gauge", lambda: {(): 1024})
+
+        lines = registry.render().splitlines()
+        assert "# TYPE rejections_total counter" in lines
+        assert "rejections_total 0" in lines
+        assert "# TYPE duration_seconds histogram" in lines
+        assert 'duration_seconds_bucket{phase="decode",le="0.1"} 1' in lines
+        assert 'duration_seconds_bucket{phase="decode",le="1"} 2' in lines
+        assert 'duration_seconds_bucket{phase="decode",le="+Inf"} 3' in lines
+        assert 'duration_seconds_sum{phase="decode"} 5.55' in lines
+        assert 'duration_seconds_count{phase="decode"} 3' in lines
+        assert "# TYPE cache_bytes gauge" in lines
+        assert "cache_bytes 1024" in lines
+
+    def test_escapes_label_values(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests", ["route"]).inc('a"b\\c')
+        assert 'requests_total{route="a\\"b\\\\c"} 1' in registry.render().splitlines()
+
+    def test_aggregates_worker_snapshots(self, tmp_path):
+        def create_registry():
+            registry = MetricsRegistry(str(tmp_path))
+            counter = registry.counter("requests_total", "Requests", ["route"])
+            histogram = registry.histogram("duration_seconds", "Duration", buckets=[1])
+            registry.collector("shared_bytes", "Shared", "gauge", lambda: {(): 10}, mode="max")
+            registry.collector("worker_bytes", "Worker", "gauge", lambda: {(): 10})
+            return registry, counter, histogram
+
+        other, other_counter, other_histogram = create_registry()
+        other_counter.inc("/a", amount=3)
+        other_histogram.observe(2)
+        # a live process, and a process that no longer exists
+        worker = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        dead_worker = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead_worker.wait()
+        try:
+            for pid in (worker.pid, dead_worker.pid):
+                (tmp_path / f"{pid}.json").write_text(json.dumps(other.snapshot()))
+
+            registry, counter, histogram = create_registry()
+            counter.inc("/a")
+            histogram.observe(0.5)
+            samples = registry.collect()
+        finally:
+            worker.kill()
+            worker.wait()
+
+        assert samples["requests_total"] == {("/a",): 4}
+        assert samples["duration_seconds"] == {(): [1, 1, 2.5]}
+        assert samples["shared_bytes"] == {(): 10}
+        assert samples["worker_bytes"] == {(): 20}
+        assert not (tmp_path / f"{dead_worker.pid}.json").exists()
+
+    def test_flush(self, tmp_path):
+        registry = MetricsRegistry(str(tmp_path), flush_interval=0.01)
+        registry.counter("requests_total", "Requests").inc()
+        registry.start()
+        registry.flush()
+        path = tmp_path / f"{os.getpid()}.json"
+        assert json.loads(path.read_text()) == {"requests_total": [[[], 1]]}
+        registry.stop()
+        assert not path.exists()
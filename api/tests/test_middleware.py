@@ -0,0 +1,140 @@
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics import Histogram
+from api.middleware import RateLimitMiddleware
+from api.middleware import RequestLatencyMiddleware
+from api.middleware import ServerTimingMiddleware
+from climatemaps.timing import timed_phase
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimitMiddleware:
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimitMiddleware(app=None, calls_per_minute=60, clock=self.clock)
+
+    def test_limits_calls_per_client(self):
+        assert all(self.limiter.acquire("a") for _ in range(60))
+        assert not self.limiter.acquire("a")
+        assert self.limiter.acquire("b")
+
+    def test_refills_over_time(self):
+        for _ in range(60):
+            self.limiter.acquire("a")
+        self.clock.now += 1.0
+        assert self.limiter.acquire("a")
+        assert not self.limiter.acquire("a")
+        self.clock.now += 30.0
+        assert sum(self.limiter.acquire("a") for _ in range(40)) == 30
+
+    def test_evicts_idle_clients(self):
+        for i in range(100):
+            self.limiter.acquire(f"client-{i}")
+        assert self.limiter.n_clients == 100
+        self.clock.now += 60.0
+        for i in range(1000):
+            self.limiter.acquire(f"new-client-{i}")
+        assert self.limiter.n_clients == 1000
+
+    def test_asgi_returns_429(self):
+        app = FastAPI()
+
+        @app.get("/")
+        def index():
+            return {"ok": True}
+
+        rejections = []
+        app.add_middleware(
+            RateLimitMiddleware, calls_per_minute=2, on_reject=lambda: rejections.append(1)
+        )
+        client = TestClient(app)
+        assert [client.get("/").status_code for _ in range(3)] == [200, 200, 429]
+        assert len(rejections) == 1
+
+
+class TestRequestLatencyMiddleware:
+
+    def test_observes_per_route(self):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            return {"item_id": item_id}
+
+        histogram = Histogram("request_duration_seconds", "", ["route"])
+        app.add_middleware(RequestLatencyMiddleware, histogram=histogram)
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/other")
+
+        samples = histogram.collect()
+        assert set(samples) == {("/items/{item_id}",), ("unmatched",)}
+        assert sum(samples[("/items/{item_id}",)][:-1]) == 2
+        assert sum(samples[("unmatched",)][:-1]) == 1
+
+
+class TestServerTimingMiddleware:
+
+    def _create_client(self, slow_request_threshold=None) -> TestClient:
+        app = FastAPI()
+
+        @app.get("/sync")
+        def get_sync():
+            with timed_phase("decode"):
+                pass
+            with timed_phase("decode"):
+                pass
+            with timed_phase("interpolation"):
+                pass
+            return {}
+
+        @app.get("/async")
+        async def get_async():
+            with timed_phase("geocode"):
+                pass
+            return {}
+
+        app.add_middleware(ServerTimingMiddleware, slow_request_threshold=slow_request_threshold)
+        return TestClient(app)
+
+    @staticmethod
+    def _get_phase_names(server_timing: str):
+        return [entry.split(";")[0] for entry in server_timing.split(", ")]
+
+    def test_header(self):
+        client = self._create_client()
+        response = client.get("/sync")
+        names = self._get_phase_names(response.headers["server-timing"])
+        assert names == ["decode", "interpolation", "total"]
+
+        response = client.get("/async")
+        assert self._get_phase_names(response.headers["server-timing"]) == ["geocode", "total"]
+
+        response = client.get("/other")
+        assert response.status_code == 404
+        assert self._get_phase_names(response.headers["server-timing"]) == ["total"]
+
+    def test_logs_slow_requests(self, caplog):
+        with caplog.at_level(logging.WARNING, logger="climatemaps"):
+            self._create_client(slow_request_threshold=60).get("/sync?a=1")
+            assert not caplog.records
+            self._create_client(slow_request_threshold=0).get("/sync?a=1")
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["event"] == "slow_request"
+        assert record["path"] == "/sync?a=1"
+        assert record["status"] == 200
+        assert set(record["phases_ms"]) == {"decode", "interpolation"}
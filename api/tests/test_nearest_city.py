@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from citipy import citipy
+
+from api.nearest_city import NearestCityIndex
+
+
+@pytest.fixture(scope="module")
+def index() -> NearestCityIndex:
+    return NearestCityIndex.from_citipy()
+
+
+class TestNearestCityIndex:
+
+    def test_matches_citipy(self, index):
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(-60, 70, 200)
+        lons = rng.uniform(-180, 180, 200)
+        cities = index.nearest_many(lats, lons)
+        for lat, lon, city in zip(lats, lons, cities):
+            expected = citipy.nearest_city(lat, lon)
+            assert city.city_name == expected.city_name
+            assert city.country_code == expected.country_code.upper()
+
+    def test_country_name(self, index):
+        city = index.nearest(52.09, 5.12)
+        assert city.city_name == "utrecht"
+        assert city.country_code == "NL"
+        assert city.country_name == "Netherlands"
+
+    def test_non_finite_coordinates(self, index):
+        with pytest.raises(ValueError):
+            index.nearest_many([np.nan], [0.0])
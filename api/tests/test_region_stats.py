@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.region_stats import RegionStatsCache
+from climatemaps.geogrid import GeoGrid
+
+
+class TestRegionStatsCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, create_geo_grid):
+        def create(value: float, width: int = 72, height: int = 36) -> GeoGrid:
+            return create_geo_grid(value, width, height)
+
+        self.create_geo_grid = create
+
+    def test_tables_lru(self):
+        loads = []
+
+        def get_geo_grid(value: float):
+            def load() -> GeoGrid:
+                loads.append(value)
+                return self.create_geo_grid(value)
+
+            return load
+
+        table_bytes = RegionStatsCache().get_tables("a", 1, get_geo_grid(0), timeout=10).nbytes
+        cache = RegionStatsCache(max_bytes=2 * table_bytes)
+        tables = cache.get_tables("a", 1, get_geo_grid(1), timeout=10)
+        assert cache.get_tables("a", 1, get_geo_grid(1), timeout=10) is tables
+        assert tables.bbox_stats(-180, -90, 180, 90).mean == 1
+        cache.get_tables("a", 2, get_geo_grid(2), timeout=10)
+        cache.get_tables("a", 3, get_geo_grid(3), timeout=10)
+        assert cache.n_bytes <= cache.max_bytes
+        cache.get_tables("a", 1, get_geo_grid(1), timeout=10)
+        assert loads == [0, 1, 2, 3, 1]
+
+    def test_concurrent_tables(self):
+        loads = []
+
+        def load() -> GeoGrid:
+            loads.append(1)
+            time.sleep(0.1)
+            return self.create_geo_grid(1)
+
+        cache = RegionStatsCache()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(cache.get_tables, "a", 1, load, 10) for _ in range(8)]
+            results = [future.result() for future in futures]
+        assert loads == [1]
+        assert all(tables is results[0] for tables in results)
+        assert cache.n_bytes == results[0].nbytes
+
+    def test_masks(self):
+        cache = RegionStatsCache()
+        geo_grid = self.create_geo_grid(1)
+        geometry = {
+            "type": "Polygon",
+            "coordinates": [[[-10, 40], [10, 40], [10, 60], [-10, 60], [-10, 40]]],
+        }
+        mask = cache.get_mask(geometry, geo_grid.lon_range, geo_grid.lat_range)
+        assert cache.get_mask(dict(geometry), geo_grid.lon_range, geo_grid.lat_range) is mask
+        assert mask.stats(geo_grid.values, geo_grid.lat_range).n_cells == 16
+
+        finer_grid = self.create_geo_grid(1, width=144, height=72)
+        finer_mask = cache.get_mask(geometry, finer_grid.lon_range, finer_grid.lat_range)
+        assert finer_mask.stats(finer_grid.values, finer_grid.lat_range).n_cells == 64
+
+    def test_masks_and_tables_share_byte_limit(self):
+        geo_grid = self.create_geo_grid(1)
+        geometries = [
+            {
+                "type": "Polygon",
+                "coordinates": [
+                    [[lon, -60], [lon + 100, -60], [lon + 100, 60], [lon, 60], [lon, -60]]
+                ],
+            }
+            for lon in [-170, -120, -70]
+        ]
+        mask_bytes = [
+            RegionStatsCache().get_mask(geometry, geo_grid.lon_range, geo_grid.lat_range).nbytes
+            for geometry in geometries
+        ]
+        table_bytes = RegionStatsCache().get_tables("a", 1, lambda: geo_grid, timeout=10).nbytes
+
+        cache = RegionStatsCache(max_bytes=table_bytes + sum(mask_bytes[:2]))
+        cache.get_tables("a", 1, lambda: geo_grid, timeout=10)
+        masks = [
+            cache.get_mask(geometry, geo_grid.lon_range, geo_grid.lat_range)
+            for geometry in geometries[:2]
+        ]
+        assert cache.n_bytes == cache.max_bytes
+
+        cache.get_mask(geometries[2], geo_grid.lon_range, geo_grid.lat_range)
+        assert cache.n_bytes <= cache.max_bytes
+        # the tables were used least recently
+        assert cache.get_mask(geometries[0], geo_grid.lon_range, geo_grid.lat_range) is masks[0]
+        loads = []
+        cache.get_tables("a", 1, lambda: loads.append(1) or geo_grid, timeout=10)
+        assert loads == [1]
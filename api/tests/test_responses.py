@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi import Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from api.responses import FastJSONResponse
+from api.responses import StaticPayload
+from api.responses import dump_json
+from api.responses import payload_response
+
+
+class ValueResponse(BaseModel):
+    value: float
+    name: str
+
+
+class TestFastJSONResponse:
+
+    def test_dump_json(self):
+        content = {"value": np.float64(1.5), "values": np.array([1, 2]), "name": "tmax"}
+        assert json.loads(dump_json(content)) == {"value": 1.5, "values": [1, 2], "name": "tmax"}
+
+    def test_same_body_as_response_model(self):
+        app = FastAPI()
+        content = {"value": 12.25, "name": "tmax"}
+
+        @app.get("/model", response_model=ValueResponse)
+        def get_model():
+            return ValueResponse(**content)
+
+        @app.get("/fast", response_model=ValueResponse)
+        def get_fast():
+            return FastJSONResponse(content)
+
+        client = TestClient(app)
+        response_model = client.get("/model")
+        response_fast = client.get("/fast")
+        assert response_fast.status_code == 200
+        assert response_fast.headers["content-type"] == "application/json"
+        assert response_fast.json() == response_model.json()
+
+
+class TestPayloadResponse:
+
+    def setup_method(self):
+        app = FastAPI()
+        self.payload = StaticPayload(body=b"x" * 1000, media_type="text/plain", compress=True)
+
+        @app.get("/payload")
+        def get_payload(request: Request):
+            return payload_response(request, self.payload, max_age=60)
+
+        self.client = TestClient(app)
+
+    def _get(self, accept_encoding: str, **headers):
+        return self.client.get("/payload", headers={"Accept-Encoding": accept_encoding, **headers})
+
+    def test_accept_encoding(self):
+        for accept_encoding in ["gzip", "deflate, gzip;q=0.5", "*", "br;q=1.0, *;q=0.1"]:
+            assert self._get(accept_encoding).headers["etag"] == self.payload.gzip_etag
+        for accept_encoding in ["", "identity", "gzip;q=0", "gzip; q=0.0, br", "*;q=0", "xgzip"]:
+            response = self._get(accept_encoding)
+            assert response.headers["etag"] == self.payload.etag
+            assert "content-encoding" not in response.headers
+            assert response.content == self.payload.body
+
+    def test_not_modified_varies_by_encoding(self):
+        response = self._get("gzip", **{"If-None-Match": self.payload.gzip_etag})
+        assert response.status_code == 304
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert "content-encoding" not in response.headers
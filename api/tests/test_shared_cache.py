@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from api.shared_cache import SharedMemoryGeoGridCache
+from climatemaps.cube import MonthCube
+from climatemaps.geogrid import GeoGrid
+
+
+def _set_in_other_process(directory: str, geo_grid: GeoGrid) -> None:
+    cache = SharedMemoryGeoGridCache(directory, max_bytes=1024**2)
+    cache.set("a", 1, geo_grid)
+
+
+class TestSharedMemoryGeoGridCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, create_geo_grid):
+        self.create_geo_grid = create_geo_grid
+        self.directory = str(tmp_path)
+        self.cache = SharedMemoryGeoGridCache(self.directory, max_bytes=1024**2)
+
+    def test_get_miss_and_hit(self):
+        assert self.cache.get("a", 1) is None
+        geo_grid = self.create_geo_grid(3.0)
+        self.cache.set("a", 1, geo_grid)
+        cached = self.cache.get("a", 1)
+        np.testing.assert_array_equal(cached.values, geo_grid.values)
+        np.testing.assert_array_equal(cached.lon_range, geo_grid.lon_range)
+        np.testing.assert_array_equal(cached.lat_range, geo_grid.lat_range)
+        assert isinstance(cached.values, np.memmap)
+        stats = self.cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+    def test_month_cube(self):
+        cube = MonthCube.from_geo_grids(self.create_geo_grid(month) for month in range(12))
+        self.cache.set_cube("a", cube)
+        cached = self.cache.get_cube("a")
+        assert isinstance(cached, MonthCube)
+        np.testing.assert_array_equal(cached.values, cube.values)
+
+    def test_shared_between_processes(self):
+        process = multiprocessing.get_context("fork").Process(
+            target=_set_in_other_process, args=(self.directory, self.create_geo_grid(7.0))
+        )
+        process.start()
+        process.join()
+        assert self.cache.get("a", 1).values[0, 0] == 7.0
+
+    def test_replaced_entry_is_reattached(self):
+        other = SharedMemoryGeoGridCache(self.directory, max_bytes=1024**2)
+        self.cache.set("a", 1, self.create_geo_grid(1.0))
+        assert self.cache.get("a", 1).values[0, 0] == 1.0
+        other.set("a", 1, self.create_geo_grid(2.0))
+        assert self.cache.get("a", 1).values[0, 0] == 2.0
+
+    def test_evicts_least_recently_used(self):
+        size = os.path.getsize(self._set_and_get_path("a", 1))
+        cache = SharedMemoryGeoGridCache(self.directory, max_bytes=3 * size)
+        cache.TOUCH_INTERVAL = 0
+        for month in range(2, 4):
+            cache.set("a", month, self.create_geo_grid())
+            time.sleep(0.01)
+        cache.get("a", 1)
+        with cache._exclusive_lock("a_2"):
+            pass
+        assert os.path.exists(cache._lock_path("a_2"))
+
+        replace = os.replace
+        n_bytes_written = []
+
+        def replace_and_record(source, destination):
+            n_bytes = cache.stats().bytes + os.path.getsize(source)
+            n_bytes_written.append(n_bytes)
+            replace(source, destination)
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(os, "replace", replace_and_record)
+            cache.set("a", 4, self.create_geo_grid())
+        assert n_bytes_written == [3 * size]
+        assert cache.get("a", 1) is not None
+        assert cache.get("a", 2) is None
+        assert not os.path.exists(cache._lock_path("a_2"))
+        stats = cache.stats()
+        assert (stats.entries, stats.evictions) == (3, 1)
+        assert stats.bytes <= stats.max_bytes
+
+    def test_rejects_items_larger_than_budget(self):
+        cache = SharedMemoryGeoGridCache(self.directory, max_bytes=16)
+        cache.set("a", 1, self.create_geo_grid())
+        assert cache.get("a", 1) is None
+        assert cache.stats().rejections == 1
+
+    def test_removes_temp_files_of_stopped_workers(self):
+        process = multiprocessing.get_context("fork").Process(target=lambda: None)
+        process.start()
+        process.join()
+        temp_path = os.path.join(self.directory, f"a_1.seg.{process.pid}.1.tmp")
+        with open(temp_path, "w") as f:
+            f.write("incomplete")
+        other_path = os.path.join(self.directory, "notes.tmp")
+        with open(other_path, "w") as f:
+            f.write("not a segment")
+        SharedMemoryGeoGridCache(self.directory, max_bytes=1024**2)
+        assert not os.path.exists(temp_path)
+        assert os.path.exists(other_path)
+
+    def test_removes_segments_of_other_dataset_versions(self):
+        path = self._set_and_get_path("a", 1)
+        cache = SharedMemoryGeoGridCache(self.directory, max_bytes=1024**2, dataset_version="2")
+        assert not os.path.exists(path)
+        assert cache.get("a", 1) is None
+        cache.set("a", 1, self.create_geo_grid(2.0))
+        assert os.path.exists(os.path.join(self.directory, "a_1.2.seg"))
+
+    def test_load_lock_timeout(self):
+        other = SharedMemoryGeoGridCache(self.directory, max_bytes=1024**2)
+        calls = []
+
+        def load():
+            calls.append(1)
+            return self.create_geo_grid()
+
+        # another worker is loading the key
+        with other._exclusive_lock("a_1"):
+            with pytest.raises(TimeoutError):
+                self.cache.get_or_load("a", 1, load, 0.2)
+        assert calls == []
+        assert self.cache.get_or_load("a", 1, load, 0.2) is not None
+        assert calls == [1]
+
+    def test_single_load_across_caches(self):
+        caches = [SharedMemoryGeoGridCache(self.directory, max_bytes=1024**2) for _ in range(4)]
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.2)
+            return self.create_geo_grid(5.0)
+
+        with ThreadPoolExecutor(max_workers=len(caches)) as executor:
+            futures = [executor.submit(cache.get_or_load, "a", 1, load, 5) for cache in caches]
+            results = [future.result() for future in futures]
+        assert len(calls) == 1
+        assert all(result.values[0, 0] == 5.0 for result in results)
+
+    def _set_and_get_path(self, data_type: str, month: int) -> str:
+        self.cache.set(data_type, month, self.create_geo_grid())
+        time.sleep(0.01)
+        return os.path.join(self.directory, f"{data_type}_{month}.1.seg")
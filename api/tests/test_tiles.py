@@ -0,0 +1,109 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from api.tiles import RasterTileRenderer
+from api.tiles import get_tile_pixel_coordinates
+from climatemaps.contour_config import ContourPlotConfig
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+
+
+class TestTilePixelCoordinates:
+
+    def test_world_tile(self):
+        lons, lats = get_tile_pixel_coordinates(0, 0, 0)
+        assert lons.shape == lats.shape == (256,)
+        assert lons[0] == pytest.approx(-180 + 360 / 512)
+        assert lons[-1] == pytest.approx(180 - 360 / 512)
+        assert lats[0] == pytest.approx(85.05, abs=0.3)
+        npt.assert_array_almost_equal(lats, -lats[::-1])
+
+    def test_tile(self):
+        lons, lats = get_tile_pixel_coordinates(1, 1, 0)
+        assert 0 < lons.min() < lons.max() < 180
+        assert 0 < lats.min() < lats.max() < 85.1
+
+
+class TestRasterTileRenderer:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, create_geo_grid):
+        self.config = ContourPlotConfig(level_lower=-50, level_upper=50, n_contours=11)
+        lat_range = create_geo_grid(width=360, height=180).lat_range
+        # values increase from -90 at the south pole to 90 at the north pole
+        values = np.repeat(lat_range[:, np.newaxis], 360, axis=1)
+        self.geo_grid = GeoGrid.from_global_values(values)
+
+    def test_colors_match_contour_bands(self):
+        renderer = RasterTileRenderer()
+        rgba = renderer.render_rgba(self.geo_grid, self.config, 1, 0, 0)
+        assert rgba.shape == (256, 256, 4)
+        assert rgba.dtype == np.uint8
+        assert (rgba[:, :, 3] == 255).all()
+
+        levels, colors = self.config.get_rgba_lut()
+        assert len(colors) == len(levels) - 1
+        # values north of 50N are above level_upper and get the color of the last band
+        npt.assert_array_equal(rgba[0, 0], colors[-1])
+        _, lats = get_tile_pixel_coordinates(1, 0, 0)
+        band = np.searchsorted(levels, lats[-1], side="right") - 1
+        npt.assert_array_equal(rgba[-1, 0], colors[band])
+
+        expected = self.config.colormap(self.config.norm(0.5 * (levels[0] + levels[1])), bytes=True)
+        npt.assert_array_equal(colors[0], expected)
+
+    def test_no_data_is_transparent(self):
+        values = self.geo_grid.values.copy()
+        values[:, :180] = np.nan
+        geo_grid = GeoGrid(
+            lon_range=self.geo_grid.lon_range, lat_range=self.geo_grid.lat_range, values=values
+        )
+        rgba = RasterTileRenderer().render_rgba(geo_grid, self.config, 0, 0, 0)
+        assert (rgba[:, :100, 3] == 0).all()
+        assert (rgba[:, 150:, 3] == 255).all()
+
+    def test_difference_grid(self):
+        historical = GeoGrid(
+            lon_range=self.geo_grid.lon_range,
+            lat_range=self.geo_grid.lat_range,
+            values=self.geo_grid.values / 2,
+        )
+        difference_grid = DifferenceGeoGrid(future=self.geo_grid, historical=historical)
+        renderer = RasterTileRenderer()
+        rgba = renderer.render_rgba(difference_grid, self.config, 1, 1, 0)
+        assert "values" not in difference_grid.__dict__
+        npt.assert_array_equal(
+            rgba, renderer.render_rgba(difference_grid.materialize(), self.config, 1, 1, 0)
+        )
+
+    def test_png(self):
+        body = RasterTileRenderer().render(self.geo_grid, self.config, 0, 0, 0)
+        assert body.startswith(b"\x89PNG")
+
+    def test_check_tile(self):
+        renderer = RasterTileRenderer(max_zoom=4)
+        renderer.check_tile(4, 15, 15)
+        for z, x, y in [(5, 0, 0), (-1, 0, 0), (2, 4, 0), (2, 0, -1)]:
+            with pytest.raises(ValueError):
+                renderer.check_tile(z, x, y)
+
+    def test_cache(self):
+        loads = []
+
+        def get_geo_grid():
+            loads.append(1)
+            return self.geo_grid
+
+        tile_bytes = len(RasterTileRenderer().render(self.geo_grid, self.config, 2, 0, 0))
+        renderer = RasterTileRenderer(max_bytes=int(2.5 * tile_bytes))
+        payload = renderer.get_tile("tmax", 1, 2, 0, 0, self.config, get_geo_grid)
+        assert renderer.get_tile("tmax", 1, 2, 0, 0, self.config, get_geo_grid) is payload
+        assert len(loads) == 1
+
+        renderer.get_tile("tmax", 1, 2, 0, 1, self.config, get_geo_grid)
+        renderer.get_tile("tmax", 1, 2, 0, 2, self.config, get_geo_grid)
+        assert renderer.n_tiles <= 2
+        assert renderer.n_bytes <= renderer.max_bytes
+        renderer.get_tile("tmax", 1, 2, 0, 0, self.config, get_geo_grid)
+        assert len(loads) == 4
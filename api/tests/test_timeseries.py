@@ -0,0 +1,66 @@
+import pytest
+
+from api.timeseries import PointSeriesIndex
+from api.timeseries import gather_point_values
+from climatemaps.datasets import DIFFERENCE_DATA_SETS
+from climatemaps.datasets import FUTURE_DATA_SETS
+from climatemaps.datasets import HISTORIC_DATA_SETS
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+
+
+class TestPointSeriesIndex:
+
+    def test_groups(self):
+        index = PointSeriesIndex(HISTORIC_DATA_SETS + FUTURE_DATA_SETS + DIFFERENCE_DATA_SETS)
+        n_configs = sum(len(data_configs) for data_configs in index.groups.values())
+        assert n_configs == len(FUTURE_DATA_SETS) + len(DIFFERENCE_DATA_SETS)
+        for (_, resolution), data_configs in index.groups.items():
+            assert {config.resolution.value for config in data_configs} == {resolution}
+
+    def test_select(self):
+        index = PointSeriesIndex(FUTURE_DATA_SETS + DIFFERENCE_DATA_SETS)
+        groups = index.select(
+            variables=["tmax", "Precipitation", "prec"],
+            climate_scenarios=["ssp370"],
+            climate_models=["ENSEMBLE_MEAN"],
+            resolutions=["10m"],
+            is_difference_map=True,
+        )
+        assert len(groups) == 1
+        data_configs = next(iter(groups.values()))
+        assert len(data_configs) == 2 * 4
+        assert [config.year_range for config in data_configs] == sorted(
+            config.year_range for config in data_configs
+        )
+        assert all(config.data_type_slug.startswith("difference_") for config in data_configs)
+        assert index.select(climate_models=["unknown"]) == {}
+
+
+class TestGatherPointValues:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, create_geo_grid):
+        def create(seed: int, width: int = 8, height: int = 4) -> GeoGrid:
+            return create_geo_grid(width=width, height=height, seed=seed)
+
+        self.create_geo_grid = create
+
+    def test_values(self):
+        window = self.create_geo_grid(5, width=2, height=2)
+        lon = float(window.lon_range.mean())
+        lat = float(window.lat_range.mean())
+        geo_grids = [
+            self.create_geo_grid(1),
+            self.create_geo_grid(2),
+            DifferenceGeoGrid(future=self.create_geo_grid(3), historical=self.create_geo_grid(4)),
+            window,
+        ]
+        values = gather_point_values(geo_grids, lon, lat)
+        assert values.shape == (4,)
+        for geo_grid, value in zip(geo_grids, values):
+            assert value == pytest.approx(geo_grid.get_value_at_coordinate(lon, lat))
+
+    def test_outside_grid(self):
+        with pytest.raises(ValueError):
+            gather_point_values([self.create_geo_grid(1)], 12.3, 89.9)
@@ -0,0 +1,151 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.warmup import AccessStats
+from api.warmup import CacheWarmer
+from api.warmup import get_warmup_targets
+from climatemaps.datasets import FUTURE_DATA_SETS
+from climatemaps.datasets import HISTORIC_DATA_SETS
+
+
+class TestAccessStats:
+
+    def test_save_merges_counts(self, tmp_path):
+        filepath = str(tmp_path / "stats" / "access_stats.json")
+        access_stats = AccessStats()
+        access_stats.record("tmax_1970_2000_10m", 1)
+        access_stats.record("tmax_1970_2000_10m", 1)
+        access_stats.record("tmin_1970_2000_10m", 7)
+        access_stats.save(filepath)
+
+        access_stats.record("tmin_1970_2000_10m", 7)
+        access_stats.save(filepath)
+        other = AccessStats()
+        other.record("tmin_1970_2000_10m", 7)
+        other.save(filepath)
+
+        counts = AccessStats.load_counts(filepath)
+        assert counts == {("tmax_1970_2000_10m", 1): 2, ("tmin_1970_2000_10m", 7): 3}
+        with open(filepath) as f:
+            entries = json.load(f)
+        assert entries[0] == {"data_type": "tmin_1970_2000_10m", "month": 7, "count": 3}
+
+    def test_concurrent_saves(self, tmp_path):
+        filepath = str(tmp_path / "access_stats.json")
+        workers = [AccessStats() for _ in range(8)]
+        for access_stats in workers:
+            for _ in range(10):
+                access_stats.record("tmax_1970_2000_10m", 1)
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            list(executor.map(lambda access_stats: access_stats.save(filepath), workers))
+        assert AccessStats.load_counts(filepath)[("tmax_1970_2000_10m", 1)] == 80
+
+    def test_load_counts_of_missing_or_invalid_file(self, tmp_path):
+        filepath = tmp_path / "access_stats.json"
+        assert AccessStats.load_counts(str(filepath)) == {}
+        filepath.write_text("[{")
+        assert AccessStats.load_counts(str(filepath)) == {}
+
+
+class TestWarmupTargets:
+
+    def get_targets(self, strategy: str, access_stats_filepath: str = "", n: int = 100):
+        return get_warmup_targets(
+            strategy,
+            data_configs=HISTORIC_DATA_SETS[:2] + FUTURE_DATA_SETS[:2],
+            historic_data_configs=HISTORIC_DATA_SETS,
+            months=[1, 7],
+            access_stats_filepath=access_stats_filepath,
+            most_requested_n=n,
+        )
+
+    def test_none(self):
+        assert self.get_targets("none") == []
+
+    def test_all(self):
+        data_types = sorted(
+            config.data_type_slug for config in HISTORIC_DATA_SETS[:2] + FUTURE_DATA_SETS[:2]
+        )
+        targets = self.get_targets("all")
+        assert targets == [(data_type, month) for data_type in data_types for month in [1, 7]]
+
+    def test_historic(self):
+        data_types = [config.data_type_slug for config in HISTORIC_DATA_SETS[:2]]
+        assert self.get_targets("historic") == [
+            (data_types[0], 1),
+            (data_types[0], 7),
+            (data_types[1], 1),
+            (data_types[1], 7),
+        ]
+
+    def test_most_requested(self, tmp_path):
+        filepath = str(tmp_path / "access_stats.json")
+        historic = HISTORIC_DATA_SETS[0].data_type_slug
+        future = FUTURE_DATA_SETS[0].data_type_slug
+        access_stats = AccessStats()
+        for target, count in [((historic, 3), 1), ((future, 5), 3), (("unknown", 1), 5)]:
+            for _ in range(count):
+                access_stats.record(*target)
+        access_stats.record(historic, 4)
+        access_stats.record(historic, 4)
+        access_stats.save(filepath)
+
+        assert self.get_targets("most_requested", filepath) == [
+            (future, 5),
+            (historic, 4),
+            (historic, 3),
+        ]
+        assert self.get_targets("most_requested", filepath, n=1) == [(future, 5)]
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            self.get_targets("popular")
+
+
+class TestCacheWarmer:
+
+    def test_run(self):
+        loaded = []
+
+        def load(data_type: str, month: int) -> None:
+            if data_type == "broken":
+                raise ValueError("no data")
+            loaded.append((data_type, month))
+
+        warmer = CacheWarmer([("a", 1), ("broken", 1), ("b", 2)], load)
+        assert warmer.status().elapsed_seconds == 0.0
+        warmer.start()
+        warmer._thread.join()
+        assert loaded == [("a", 1), ("b", 2)]
+        status = warmer.status()
+        assert status.ready
+        assert (status.total, status.loaded, status.failed) == (3, 2, 1)
+
+    def test_ready_without_targets(self):
+        assert CacheWarmer([], lambda data_type, month: None).is_ready
+
+
+class TestReadyEndpoint:
+
+    def test_ready_after_warmup(self, monkeypatch):
+        release = threading.Event()
+        warmer = CacheWarmer([("a", 1)], lambda data_type, month: release.wait(timeout=10))
+        monkeypatch.setattr(main, "cache_warmer", warmer)
+        client = TestClient(main.app)
+
+        warmer.start()
+        response = client.get("/v1/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+        release.set()
+        warmer._thread.join()
+        response = client.get("/v1/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+        assert response.json()["loaded"] == 1
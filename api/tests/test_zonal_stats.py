@@ -0,0 +1,48 @@
+import pytest
+
+from api.zonal_stats import CountryStatsCache
+from climatemaps.geogrid import GeoGrid
+from climatemaps.tests.test_zonal import COUNTRIES
+
+
+class TestCountryStatsCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, create_geo_grid):
+        def create(value: float, width: int = 72, height: int = 36) -> GeoGrid:
+            return create_geo_grid(value, width, height)
+
+        self.create_geo_grid = create
+
+    def test_stats(self):
+        country_loads = []
+        grid_loads = []
+
+        def load_countries():
+            country_loads.append(1)
+            return COUNTRIES
+
+        def get_geo_grid(value: float, width: int = 72, height: int = 36):
+            def load() -> GeoGrid:
+                grid_loads.append(value)
+                return self.create_geo_grid(value, width, height)
+
+            return load
+
+        cache = CountryStatsCache(load_countries, max_entries=2)
+        stats = cache.get_stats("a", 1, get_geo_grid(1))
+        assert cache.get_stats("a", 1, get_geo_grid(1)) is stats
+        assert set(stats) == {"AA", "BB", "DD"}
+        assert stats["AA"].stats.n_cells == 16
+        assert stats["AA"].stats.mean == 1
+
+        cache.get_stats("a", 2, get_geo_grid(2))
+        cache.get_stats("a", 3, get_geo_grid(3))
+        cache.get_stats("a", 1, get_geo_grid(1))
+        assert grid_loads == [1, 2, 3, 1]
+        assert cache.n_rasters == 1
+
+        finer_stats = cache.get_stats("b", 1, get_geo_grid(4, width=144, height=72))
+        assert finer_stats["AA"].stats.n_cells == 64
+        assert cache.n_rasters == 2
+        assert country_loads == [1]
@@ -0,0 +1,134 @@
+import io
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
+from typing import Dict
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+from PIL import Image
+
+from climatemaps.contour_config import ContourPlotConfig
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+
+from .responses import StaticPayload
+
+TILE_SIZE = 256
+
+TileKey = Tuple[str, Union[int, str], int, int, int]
+
+
+def get_tile_pixel_coordinates(
+    z: int, x: int, y: int, tile_size: int = TILE_SIZE
+) -> Tuple[npt.NDArray[np.floating], npt.NDArray[np.floating]]:
+    n_tiles = 2**z
+    offsets = (np.arange(tile_size) + 0.5) / tile_size
+    lons = (x + offsets) / n_tiles * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * (y + offsets) / n_tiles))))
+    return lons, lats
+
+
+class RasterTileRenderer:
+    def __init__(self, max_bytes: int = 64 * 1024**2, max_zoom: int = 12):
+        self.max_bytes = max_bytes
+        self.max_zoom = max_zoom
+        self._tiles: OrderedDict[TileKey, StaticPayload] = OrderedDict()
+        self._bytes = 0
+        self._luts: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = Lock()
+
+    def check_tile(self, z: int, x: int, y: int) -> None:
+        if not 0 <= z <= self.max_zoom:
+            raise ValueError(f"Zoom level {z} is out of range [0, {self.max_zoom}]")
+        if not (0 <= x < 2**z and 0 <= y < 2**z):
+            raise ValueError(f"Tile {z}/{x}/{y} does not exist")
+
+    def get_tile(
+        self,
+        data_type: str,
+        month: Union[int, str],
+        z: int,
+        x: int,
+        y: int,
+        contour_config: ContourPlotConfig,
+        get_geo_grid: Callable[[], Union[GeoGrid, DifferenceGeoGrid]],
+    ) -> StaticPayload:
+        self.check_tile(z, x, y)
+        key = (data_type, month, z, x, y)
+        with self._lock:
+            payload = self._tiles.get(key)
+            if payload is not None:
+                self._tiles.move_to_end(key)
+                return payload
+
+        payload = StaticPayload(
+            body=self.render(get_geo_grid(), contour_config, z, x, y), media_type="image/png"
+        )
+        with self._lock:
+            if key not in self._tiles:
+                self._tiles[key] = payload
+                self._bytes += len(payload.body)
+            while self._bytes > self.max_bytes and self._tiles:
+                _, evicted = self._tiles.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return payload
+
+    def render(
+        self,
+        geo_grid: Union[GeoGrid, DifferenceGeoGrid],
+        contour_config: ContourPlotConfig,
+        z: int,
+        x: int,
+        y: int,
+    ) -> bytes:
+        rgba = self.render_rgba(geo_grid, contour_config, z, x, y)
+        buffer = io.BytesIO()
+        Image.fromarray(rgba, mode="RGBA").save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+    def render_rgba(
+        self,
+        geo_grid: Union[GeoGrid, DifferenceGeoGrid],
+        contour_config: ContourPlotConfig,
+        z: int,
+        x: int,
+        y: int,
+    ) -> npt.NDArray[np.uint8]:
+        lons, lats = get_tile_pixel_coordinates(z, x, y)
+        lon_range, lat_range = geo_grid.lon_range, geo_grid.lat_range
+        # pixels beyond the outer cell centers take the value of the nearest edge
+        lons = np.clip(lons, lon_range[0], lon_range[-1])
+        lats = np.clip(lats, lat_range[-1], lat_range[0])
+        lookup = geo_grid.lookup
+        if isinstance(geo_grid, DifferenceGeoGrid):
+            # interpolate the components at the pixels instead of computing the full difference
+            values = lookup.interpolate_grid(
+                geo_grid.future.values, lons, lats
+            ) - lookup.interpolate_grid(geo_grid.historical.values, lons, lats)
+        else:
+            values = lookup.interpolate_grid(geo_grid.values, lons, lats)
+
+        levels, colors = self._get_lut(contour_config)
+        bands = np.searchsorted(levels, values, side="right") - 1
+        np.clip(bands, 0, len(colors) - 1, out=bands)
+        rgba = colors[bands]
+        rgba[np.isnan(values)] = 0
+        return rgba
+
+    def _get_lut(self, contour_config: ContourPlotConfig) -> Tuple[np.ndarray, np.ndarray]:
+        lut = self._luts.get(id(contour_config))
+        if lut is None:
+            lut = contour_config.get_rgba_lut()
+            self._luts[id(contour_config)] = lut
+        return lut
+
+    @property
+    def n_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def n_tiles(self) -> int:
+        return len(self._tiles)
@@ -0,0 +1,96 @@
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.datasets import ClimateDifferenceDataConfig
+from climatemaps.datasets import FutureClimateDataConfig
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+from climatemaps.geogrid import GridLayout
+from climatemaps.geogrid import get_grid_layout
+from climatemaps.lookup import CellWeights
+
+GridKey = Tuple[str, str]
+
+SeriesConfig = Union[FutureClimateDataConfig, ClimateDifferenceDataConfig]
+
+
+def get_future_config(data_config: SeriesConfig) -> FutureClimateDataConfig:
+    if isinstance(data_config, ClimateDifferenceDataConfig):
+        return data_config.future_config
+    return data_config
+
+
+def _matches(values: Iterable[str], selected: Optional[Iterable[str]]) -> bool:
+    if selected is None:
+        return True
+    return not {value.lower() for value in values}.isdisjoint(item.lower() for item in selected)
+
+
+class PointSeriesIndex:
+    def __init__(self, data_configs: Iterable[ClimateDataConfig]):
+        self.groups: Dict[GridKey, List[SeriesConfig]] = {}
+        for data_config in data_configs:
+            if isinstance(data_config, (FutureClimateDataConfig, ClimateDifferenceDataConfig)):
+                key = (data_config.format.value, data_config.resolution.value)
+                self.groups.setdefault(key, []).append(data_config)
+
+    def select(
+        self,
+        variables: Optional[Sequence[str]] = None,
+        climate_scenarios: Optional[Sequence[str]] = None,
+        climate_models: Optional[Sequence[str]] = None,
+        resolutions: Optional[Sequence[str]] = None,
+        is_difference_map: Optional[bool] = None,
+    ) -> Dict[GridKey, List[SeriesConfig]]:
+        selection = {}
+        for key, data_configs in self.groups.items():
+            if not _matches([key[1]], resolutions):
+                continue
+            selected = []
+            for data_config in data_configs:
+                future_config = get_future_config(data_config)
+                variable = data_config.variable
+                is_difference = isinstance(data_config, ClimateDifferenceDataConfig)
+                if (
+                    _matches([variable.name, variable.filename], variables)
+                    and _matches([future_config.climate_scenario.value], climate_scenarios)
+                    and _matches([future_config.climate_model.value], climate_models)
+                    and (is_difference_map is None or is_difference == is_difference_map)
+                ):
+                    selected.append(data_config)
+            if selected:
+                selection[key] = sorted(selected, key=lambda config: config.year_range)
+        return selection
+
+
+def gather_point_values(
+    geo_grids: Sequence[Union[GeoGrid, DifferenceGeoGrid]], lon: float, lat: float
+) -> npt.NDArray[np.floating]:
+    # grids with the same axes share the cells around the point and their weights
+    cell_weights: Dict[GridLayout, CellWeights] = {}
+
+    def interpolate(geo_grid: GeoGrid) -> float:
+        layout = get_grid_layout(geo_grid.lon_range, geo_grid.lat_range)
+        weights = cell_weights.get(layout)
+        if weights is None:
+            weights = geo_grid.lookup.cell_weights([lon], [lat])
+            cell_weights[layout] = weights
+        return float(weights.interpolate(geo_grid.values)[0])
+
+    values = np.empty(len(geo_grids))
+    for i, geo_grid in enumerate(geo_grids):
+        geo_grid.check_coordinate(lon, lat)
+        if isinstance(geo_grid, DifferenceGeoGrid):
+            values[i] = interpolate(geo_grid.future) - interpolate(geo_grid.historical)
+        else:
+            values[i] = interpolate(geo_grid)
+    return values
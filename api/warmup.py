@@ -0,0 +1,147 @@
+import fcntl
+import json
+import os
+import time
+from collections import Counter
+from threading import Lock
+from threading import Thread
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pydantic import BaseModel
+
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.logger import logger
+
+WarmupTarget = Tuple[str, int]
+
+
+class AccessStats:
+    def __init__(self) -> None:
+        self._counts: Counter[WarmupTarget] = Counter()
+        self._lock = Lock()
+
+    def record(self, data_type: str, month: int) -> None:
+        with self._lock:
+            self._counts[(data_type, month)] += 1
+
+    @classmethod
+    def load_counts(cls, filepath: str) -> Counter[WarmupTarget]:
+        if not os.path.isfile(filepath):
+            return Counter()
+        try:
+            with open(filepath) as f:
+                entries = json.load(f)
+            return Counter(
+                {(entry["data_type"], entry["month"]): entry["count"] for entry in entries}
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable access statistics {filepath}: {e}")
+            return Counter()
+
+    def save(self, filepath: str) -> None:
+        # the workers save on shutdown at the same time, the lock file keeps them from losing counts
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(f"{filepath}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with self._lock:
+                    counts = self.load_counts(filepath) + self._counts
+                    self._counts.clear()
+                entries = [
+                    {"data_type": data_type, "month": month, "count": count}
+                    for (data_type, month), count in counts.most_common()
+                ]
+                temp_filepath = f"{filepath}.{os.getpid()}.tmp"
+                with open(temp_filepath, "w") as f:
+                    json.dump(entries, f)
+                os.replace(temp_filepath, filepath)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        logger.info(f"Saved access statistics for {len(entries)} data types/months to {filepath}")
+
+
+def get_warmup_targets(
+    strategy: str,
+    data_configs: Iterable[ClimateDataConfig],
+    historic_data_configs: Iterable[ClimateDataConfig],
+    months: Iterable[int],
+    access_stats_filepath: str,
+    most_requested_n: int,
+) -> List[WarmupTarget]:
+    data_types = {data_config.data_type_slug for data_config in data_configs}
+    if strategy == "none":
+        return []
+    if strategy == "all":
+        return [(data_type, month) for data_type in sorted(data_types) for month in months]
+    if strategy == "historic":
+        return [
+            (data_config.data_type_slug, month)
+            for data_config in historic_data_configs
+            if data_config.data_type_slug in data_types
+            for month in months
+        ]
+    if strategy == "most_requested":
+        counts = AccessStats.load_counts(access_stats_filepath)
+        return [target for target, _ in counts.most_common() if target[0] in data_types][
+            :most_requested_n
+        ]
+    raise ValueError(f"Unknown warm-up strategy: {strategy}")
+
+
+class WarmupStatus(BaseModel):
+    ready: bool
+    total: int
+    loaded: int
+    failed: int
+    elapsed_seconds: float
+
+
+class CacheWarmer:
+    def __init__(self, targets: List[WarmupTarget], load: Callable[[str, int], object]):
+        self.targets = targets
+        self._load = load
+        self._loaded = 0
+        self._failed = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self._started_at = time.monotonic()
+        logger.info(f"BEGIN: cache warm-up of {len(self.targets)} data types/months")
+        self._thread = Thread(target=self._run, name="cache-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        for data_type, month in self.targets:
+            try:
+                self._load(data_type, month)
+                self._loaded += 1
+            except Exception as e:
+                logger.warning(f"Cache warm-up failed for {data_type}, month {month}: {e}")
+                self._failed += 1
+        self._finished_at = time.monotonic()
+        logger.info(
+            f"END: cache warm-up ({self._loaded} loaded, {self._failed} failed) in {self._finished_at - self._started_at:.1f}s"
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        return not self.targets or self._finished_at is not None
+
+    def status(self) -> WarmupStatus:
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.monotonic()) - self._started_at
+        return WarmupStatus(
+            ready=self.is_ready,
+            total=len(self.targets),
+            loaded=self._loaded,
+            failed=self._failed,
+            elapsed_seconds=elapsed,
+        )
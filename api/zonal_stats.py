@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+from climatemaps.geogrid import GridLayout
+from climatemaps.geogrid import get_grid_layout
+from climatemaps.logger import logger
+from climatemaps.zonal import Country
+from climatemaps.zonal import CountryRaster
+from climatemaps.zonal import CountryStats
+
+
+class CountryStatsCache:
+    def __init__(
+        self,
+        load_countries: Callable[[], Sequence[Tuple[Country, Mapping[str, Any]]]],
+        max_entries: int = 512,
+    ):
+        self.max_entries = max_entries
+        self._load_countries = load_countries
+        self._countries: Optional[Sequence[Tuple[Country, Mapping[str, Any]]]] = None
+        self._rasters: Dict[GridLayout, CountryRaster] = {}
+        self._stats: OrderedDict[Tuple[str, Union[int, str]], Dict[str, CountryStats]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+        self._raster_lock = Lock()
+
+    def get_raster(
+        self, lon_range: npt.NDArray[np.floating], lat_range: npt.NDArray[np.floating]
+    ) -> CountryRaster:
+        grid_layout = get_grid_layout(lon_range, lat_range)
+        # rasterizing all countries takes seconds, concurrent requests wait for the first one
+        with self._raster_lock:
+            raster = self._rasters.get(grid_layout)
+            if raster is None:
+                if self._countries is None:
+                    self._countries = self._load_countries()
+                raster = CountryRaster.rasterize(self._countries, lon_range, lat_range)
+                self._rasters[grid_layout] = raster
+        return raster
+
+    def get_stats(
+        self,
+        data_type: str,
+        month: Union[int, str],
+        get_geo_grid: Callable[[], Union[GeoGrid, DifferenceGeoGrid]],
+    ) -> Dict[str, CountryStats]:
+        key = (data_type, month)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                self._stats.move_to_end(key)
+                return stats
+
+        geo_grid = get_geo_grid()
+        raster = self.get_raster(geo_grid.lon_range, geo_grid.lat_range)
+        stats = {
+            country_stats.country.code: country_stats
+            for country_stats in raster.stats(geo_grid.values)
+        }
+        logger.info(f"Computed statistics of {len(stats)} countries for {data_type} month {month}")
+        with self._lock:
+            self._stats[key] = stats
+            while len(self._stats) > self.max_entries:
+                self._stats.popitem(last=False)
+        return stats
+
+    @property
+    def n_rasters(self) -> int:
+        return len(self._rasters)
@@ -16,6 +16,39 @@ export interface ClimateValueResponse {
   variable_name: string;
 }
 
+export interface ClimographSeries {
+  data_type: string;
+  unit: string;
+  variable_name: string;
+  values: (number | null)[];
+}
+
+export interface ClimographResponse {
+  latitude: number;
+  longitude: number;
+  series: ClimographSeries[];
+}
+
+export interface TimeseriesSeries {
+  data_type: string;
+  variable: string;
+  variable_name: string;
+  unit: string;
+  year_range: [number, number];
+  climate_scenario: string;
+  climate_model: string;
+  resolution: string;
+  is_difference_map: boolean;
+  value: number | null;
+}
+
+export interface TimeseriesResponse {
+  latitude: number;
+  longitude: number;
+  month: number;
+  series: TimeseriesSeries[];
+}
+
 export interface NearestCityResponse {
   city_name: string;
   country_name: string;
@@ -67,6 +100,38 @@ export class ClimateMapService {
     });
   }
 
+  public getClimograph(
+    dataTypes: string[],
+    lat: number,
+    lon: number,
+  ): Observable<ClimographResponse> {
+    const url = `${environment.apiBaseUrl}/climograph`;
+    return this.httpClient.get<ClimographResponse>(url, {
+      params: {
+        lat: lat.toString(),
+        lon: lon.toString(),
+        data_types: dataTypes,
+      },
+    });
+  }
+
+  public getTimeseries(
+    lat: number,
+    lon: number,
+    month: number,
+    filters: Record<string, string | string[]>,
+  ): Observable<TimeseriesResponse> {
+    const url = `${environment.apiBaseUrl}/timeseries`;
+    return this.httpClient.get<TimeseriesResponse>(url, {
+      params: {
+        lat: lat.toString(),
+        lon: lon.toString(),
+        month: month.toString(),
+        ...filters,
+      },
+    });
+  }
+
   public getNearestCity(
     lat: number,
     lon: number,
@@ -45,9 +45,9 @@ interface PlotData {
 }
 
 interface MonthlyData {
-  tmax: number[];
-  tmin: number[];
-  precipitation: number[];
+  tmax: (number | null)[];
+  tmin: (number | null)[];
+  precipitation: (number | null)[];
 }
 
 @Component({
@@ -130,51 +130,23 @@ export class ClimateMonthlyPlotComponent
     const dataTypeTmin = this.getDataType(ClimateVarKey.T_MIN);
     const dataTypePrecipitation = this.getDataType(ClimateVarKey.PRECIPITATION);
 
-    const tmaxRequests = [];
-    const tminRequests = [];
-    const precipRequests = [];
-
-    for (let month = 1; month <= 12; month++) {
-      tmaxRequests.push(
-        this.climateMapService.getClimateValue(
-          dataTypeTmax,
-          month,
-          this.plotData.lat,
-          this.plotData.lon,
-        ),
-      );
-      tminRequests.push(
-        this.climateMapService.getClimateValue(
-          dataTypeTmin,
-          month,
-          this.plotData.lat,
-          this.plotData.lon,
-        ),
-      );
-      precipRequests.push(
-        this.climateMapService.getClimateValue(
-          dataTypePrecipitation,
-          month,
-          this.plotData.lat,
-          this.plotData.lon,
-        ),
-      );
-    }
-
     forkJoin({
-      tmax: forkJoin(tmaxRequests),
-      tmin: forkJoin(tminRequests),
-      precipitation: forkJoin(precipRequests),
+      climograph: this.climateMapService.getClimograph(
+        [dataTypeTmax, dataTypeTmin, dataTypePrecipitation],
+        this.plotData.lat,
+        this.plotData.lon,
+      ),
       city: this.climateMapService.getNearestCity(
         this.plotData.lat,
         this.plotData.lon,
       ),
     }).subscribe({
       next: (results) => {
+        const [tmax, tmin, precipitation] = results.climograph.series;
         this.monthlyData = {
-          tmax: results.tmax.map((r) => r.value),
-          tmin: results.tmin.map((r) => r.value),
-          precipitation: results.precipitation.map((r) => r.value),
+          tmax: tmax.values,
+          tmin: tmin.values,
+          precipitation: precipitation.values,
         };
         this.cityInfo = results.city;
         this.isLoading = false;
@@ -230,12 +202,12 @@ export class ClimateMonthlyPlotComponent
     ];
 
     const convertedTmax = this.monthlyData.tmax.map((temp) =>
-      this.currentUnit === TemperatureUnit.FAHRENHEIT
+      temp !== null && this.currentUnit === TemperatureUnit.FAHRENHEIT
         ? TemperatureUtils.celsiusToFahrenheit(temp)
         : temp,
     );
     const convertedTmin = this.monthlyData.tmin.map((temp) =>
-      this.currentUnit === TemperatureUnit.FAHRENHEIT
+      temp !== null && this.currentUnit === TemperatureUnit.FAHRENHEIT
         ? TemperatureUtils.celsiusToFahrenheit(temp)
         : temp,
     );
@@ -276,7 +248,7 @@ export class ClimateMonthlyPlotComponent
             label: precipLabel,
             data: this.monthlyData.precipitation.map((value) => {
               const currentUnit = this.precipitationUnitService.getUnit();
-              return currentUnit === 'in'
+              return value !== null && currentUnit === 'in'
                 ? PrecipitationUtils.mmToInches(value)
                 : value;
             }),
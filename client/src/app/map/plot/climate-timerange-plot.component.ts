@@ -19,7 +19,6 @@ import { forkJoin } from 'rxjs';
 import {
   ClimateMapService,
   NearestCityResponse,
-  ClimateValueResponse,
 } from '../../core/climatemap.service';
 import {
   ClimateVarKey,
@@ -86,6 +85,7 @@ export class ClimateTimerangePlotComponent
   ];
   private readonly DEFAULT_SCENARIO = ClimateScenario.SSP370;
   private readonly DEFAULT_MODEL = ClimateModel.ENSEMBLE_MEAN;
+  private readonly RESOLUTION = '10m';
 
   constructor(
     private climateMapService: ClimateMapService,
@@ -136,91 +136,63 @@ export class ClimateTimerangePlotComponent
     this.isLoading = true;
     this.error = null;
 
-    const allRanges = [this.HISTORICAL_RANGE, ...this.FUTURE_RANGES];
-    const requests: Record<
-      string,
-      | ReturnType<typeof this.climateMapService.getClimateValue>
-      | ReturnType<typeof this.climateMapService.getNearestCity>
-    > = {};
-
-    allRanges.forEach((yearRange) => {
-      const key = `${yearRange[0]}_${yearRange[1]}`;
-      const isFuture = yearRange[0] >= 2000;
-
-      const tmaxDataType = this.getDataType(
-        ClimateVarKey.T_MAX,
-        yearRange,
-        isFuture,
-      );
-      const tminDataType = this.getDataType(
-        ClimateVarKey.T_MIN,
-        yearRange,
-        isFuture,
-      );
-      const precipDataType = this.getDataType(
-        ClimateVarKey.PRECIPITATION,
-        yearRange,
-        isFuture,
-      );
-
-      requests[`${key}_tmax`] = this.climateMapService.getClimateValue(
-        tmaxDataType,
-        this.plotData!.month,
-        this.plotData!.lat,
-        this.plotData!.lon,
-      );
-      requests[`${key}_tmin`] = this.climateMapService.getClimateValue(
-        tminDataType,
-        this.plotData!.month,
-        this.plotData!.lat,
-        this.plotData!.lon,
-      );
-      requests[`${key}_precip`] = this.climateMapService.getClimateValue(
-        precipDataType,
-        this.plotData!.month,
-        this.plotData!.lat,
-        this.plotData!.lon,
-      );
-    });
-
-    requests['city'] = this.climateMapService.getNearestCity(
-      this.plotData.lat,
-      this.plotData.lon,
-    );
+    const variables = [
+      ClimateVarKey.T_MAX,
+      ClimateVarKey.T_MIN,
+      ClimateVarKey.PRECIPITATION,
+    ];
 
-    forkJoin(requests).subscribe({
-      next: (
-        results: Record<string, ClimateValueResponse | NearestCityResponse>,
-      ) => {
-        const historicalKey = `${this.HISTORICAL_RANGE[0]}_${this.HISTORICAL_RANGE[1]}`;
-        const historicalTmax = (
-          results[`${historicalKey}_tmax`] as ClimateValueResponse
-        ).value;
-        const historicalTmin = (
-          results[`${historicalKey}_tmin`] as ClimateValueResponse
-        ).value;
-        const historicalPrecip = (
-          results[`${historicalKey}_precip`] as ClimateValueResponse
-        ).value;
-
-        this.timeRangeData = allRanges.map((yearRange) => {
-          const key = `${yearRange[0]}_${yearRange[1]}`;
-          const tmax = (results[`${key}_tmax`] as ClimateValueResponse).value;
-          const tmin = (results[`${key}_tmin`] as ClimateValueResponse).value;
-          const precipitation = (
-            results[`${key}_precip`] as ClimateValueResponse
-          ).value;
-
-          return {
+    forkJoin({
+      timeseries: this.climateMapService.getTimeseries(
+        this.plotData.lat,
+        this.plotData.lon,
+        this.plotData.month,
+        {
+          variable: variables.map((v) => CLIMATE_VAR_KEY_TO_NAME[v]),
+          climate_scenario: this.climateScenario || this.DEFAULT_SCENARIO,
+          climate_model: this.climateModel || this.DEFAULT_MODEL,
+          resolution: this.RESOLUTION,
+          is_difference_map: 'true',
+        },
+      ),
+      city: this.climateMapService.getNearestCity(
+        this.plotData.lat,
+        this.plotData.lon,
+      ),
+    }).subscribe({
+      next: ({ timeseries, city }) => {
+        // difference data sets hold the change relative to the historical period
+        const getChange = (
+          variable: ClimateVarKey,
+          yearRange: [number, number],
+        ): number => {
+          const series = timeseries.series.find(
+            (s) =>
+              s.variable.toLowerCase() === CLIMATE_VAR_KEY_TO_NAME[variable] &&
+              s.year_range[0] === yearRange[0] &&
+              s.year_range[1] === yearRange[1],
+          );
+          return series?.value ?? NaN;
+        };
+
+        this.timeRangeData = [
+          {
+            yearRange: this.HISTORICAL_RANGE,
+            label: `${this.HISTORICAL_RANGE[0]}-${this.HISTORICAL_RANGE[1]}`,
+            tmax: 0,
+            tmin: 0,
+            precipitation: 0,
+          },
+          ...this.FUTURE_RANGES.map((yearRange) => ({
             yearRange,
             label: `${yearRange[0]}-${yearRange[1]}`,
-            tmax: tmax - historicalTmax,
-            tmin: tmin - historicalTmin,
-            precipitation: precipitation - historicalPrecip,
-          };
-        });
+            tmax: getChange(ClimateVarKey.T_MAX, yearRange),
+            tmin: getChange(ClimateVarKey.T_MIN, yearRange),
+            precipitation: getChange(ClimateVarKey.PRECIPITATION, yearRange),
+          })),
+        ];
 
-        this.cityInfo = results['city'] as NearestCityResponse;
+        this.cityInfo = city;
         this.isLoading = false;
         this.cdr.detectChanges();
         setTimeout(() => this.renderChart(), 0);
@@ -233,25 +205,6 @@ export class ClimateTimerangePlotComponent
     });
   }
 
-  private getDataType(
-    variable: ClimateVarKey,
-    yearRange: [number, number],
-    isFuture: boolean,
-  ): string {
-    const variableName = CLIMATE_VAR_KEY_TO_NAME[variable];
-    const resolution = '10m';
-
-    if (isFuture) {
-      const scenario = (
-        this.climateScenario || this.DEFAULT_SCENARIO
-      ).toLowerCase();
-      const model = (this.climateModel || this.DEFAULT_MODEL).toLowerCase();
-      return `${variableName}_${yearRange[0]}_${yearRange[1]}_${resolution}_${scenario}_${model}`;
-    } else {
-      return `${variableName}_${yearRange[0]}_${yearRange[1]}_${resolution}`;
-    }
-  }
-
   private renderChart(): void {
     if (!this.chartCanvas?.nativeElement) {
       console.warn('Canvas not available for rendering chart');
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Dict
+from typing import Iterable
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+from climatemaps.contour_config import ContourPlotConfig
+from climatemaps.cube import MONTHS
+from climatemaps.cube import DifferenceMonthCube
+from climatemaps.cube import MonthCube
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.datasets import ClimateVarKey
+from climatemaps.geogrid import GeoGrid
+
+# variables with an amount per month, which add up to a total over several months
+SUMMED_VARIABLES = {ClimateVarKey.PRECIPITATION, ClimateVarKey.WET_DAYS, ClimateVarKey.FROST_DAYS}
+
+
+@dataclass(frozen=True)
+class MonthAggregate:
+    name: str
+    months: Tuple[int, ...]
+
+    @classmethod
+    def from_months(cls, months: Iterable[int]) -> "MonthAggregate":
+        months = tuple(sorted(set(months)))
+        if not months or any(month not in MONTHS for month in months):
+            raise ValueError(f"Invalid months: {months}. Must be between 1 and 12")
+        for aggregate in AGGREGATES.values():
+            if aggregate.months == months:
+                return aggregate
+        return cls(name=",".join(str(month) for month in months), months=months)
+
+    @classmethod
+    def parse(cls, name: str) -> "MonthAggregate":
+        aggregate = AGGREGATES.get(name.lower())
+        if aggregate is not None:
+            return aggregate
+        try:
+            months = [int(month) for month in name.split(",")]
+        except ValueError:
+            raise ValueError(
+                f"Invalid month aggregate: {name}. Must be one of {', '.join(AGGREGATES)} or comma separated months"
+            )
+        return cls.from_months(months)
+
+    @property
+    def month_mask(self) -> npt.NDArray[np.bool_]:
+        return np.isin(np.arange(1, len(MONTHS) + 1), self.months)
+
+    def reduce(self, values: npt.NDArray[np.floating], summed: bool) -> npt.NDArray[np.floating]:
+        # a cell without data in any of the months has no data
+        total = np.sum(values, axis=0, dtype=np.float64, where=self.month_mask[:, None, None])
+        if summed:
+            return total
+        return total / len(self.months)
+
+    def reduce_cube(self, cube: Union[MonthCube, DifferenceMonthCube], summed: bool) -> GeoGrid:
+        if isinstance(cube, DifferenceMonthCube):
+            # sum and mean are linear, the aggregate of the difference is the difference of aggregates
+            values = self.reduce(cube.future.values, summed) - self.reduce(
+                cube.historical.values, summed
+            )
+            lon_range, lat_range = cube.future.lon_range, cube.future.lat_range
+        else:
+            values = self.reduce(cube.values, summed)
+            lon_range, lat_range = cube.lon_range, cube.lat_range
+        return GeoGrid(lon_range=lon_range, lat_range=lat_range, values=values)
+
+
+AGGREGATES: Dict[str, MonthAggregate] = {
+    "annual": MonthAggregate(name="annual", months=tuple(MONTHS)),
+    "djf": MonthAggregate(name="djf", months=(1, 2, 12)),
+    "mam": MonthAggregate(name="mam", months=(3, 4, 5)),
+    "jja": MonthAggregate(name="jja", months=(6, 7, 8)),
+    "son": MonthAggregate(name="son", months=(9, 10, 11)),
+}
+
+
+def is_summed(data_config: ClimateDataConfig) -> bool:
+    return data_config.variable_type in SUMMED_VARIABLES
+
+
+def get_aggregate_unit(data_config: ClimateDataConfig) -> str:
+    unit = data_config.variable.unit
+    if is_summed(data_config):
+        return unit.removesuffix("/month")
+    return unit
+
+
+def get_aggregate_contour_config(
+    data_config: ClimateDataConfig, aggregate: MonthAggregate
+) -> ContourPlotConfig:
+    contour_config = data_config.contour_config
+    if not is_summed(data_config):
+        return contour_config
+    n_months = len(aggregate.months)
+    return contour_config.model_copy(
+        update={
+            "level_lower": contour_config.level_lower * n_months,
+            "level_upper": contour_config.level_upper * n_months,
+            "linthresh": contour_config.linthresh * n_months,
+            "unit": contour_config.unit.removesuffix("/month"),
+        }
+    )
@@ -1,6 +1,7 @@
 import gc
 import os
 import subprocess
+from typing import Union
 
 import numpy as np
 from matplotlib.figure import Figure
@@ -39,7 +40,7 @@ class ContourTileBuilder:
         self,
         data_dir_out: str,
         name: str,
-        month: int,
+        month: Union[int, str],
         figure_dpi: int = 700,
         zoom_factor: float = 2.0,
     ):
@@ -1,5 +1,6 @@
 from typing import Any
 from typing import Dict
+from typing import Tuple
 import numpy as np
 from pydantic import BaseModel
 from pydantic import Field
@@ -93,3 +94,12 @@ class ContourPlotConfig(BaseModel):
             "level_upper": float(self.level_upper),
             "log_scale": self.log_scale,
         }
+
+    def get_rgba_lut(self) -> Tuple[np.ndarray, np.ndarray]:
+        # matches the fill colors of contourf with levels_image, norm and colormap
+        levels = self.levels_image
+        # contourf colors a band by the normalized value halfway between its levels
+        layers = 0.5 * (levels[:-1] + levels[1:])
+        normalized = np.clip(np.ma.getdata(self.norm(layers)), 0.0, 1.0)
+        colors = self.colormap(normalized, bytes=True)
+        return levels, np.asarray(colors, dtype=np.uint8)
@@ -0,0 +1,96 @@
+from functools import cached_property
+from typing import Iterable
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import model_validator
+
+from climatemaps.geogrid import DifferenceGeoGrid
+from climatemaps.geogrid import GeoGrid
+from climatemaps.lookup import GridLookup
+
+MONTHS = range(1, 13)
+
+
+class MonthCube(BaseModel):
+    lon_range: npt.NDArray[np.floating]
+    lat_range: npt.NDArray[np.floating]
+    values: npt.NDArray[np.floating]
+
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
+
+    @model_validator(mode="after")
+    def check_array_sizes(self) -> "MonthCube":
+        expected_shape = (len(MONTHS), self.lat_range.size, self.lon_range.size)
+        if self.values.shape != expected_shape:
+            raise ValueError(
+                f"shape of values {self.values.shape} does not match expected {expected_shape}"
+            )
+        return self
+
+    @classmethod
+    def from_geo_grids(cls, geo_grids: Iterable[GeoGrid]) -> "MonthCube":
+        values = None
+        lon_range = lat_range = None
+        n_months = 0
+        for i, geo_grid in enumerate(geo_grids):
+            if i >= len(MONTHS):
+                raise ValueError(f"Expected {len(MONTHS)} monthly grids, got more")
+            if values is None:
+                lon_range, lat_range = geo_grid.lon_range, geo_grid.lat_range
+                values = np.empty((len(MONTHS),) + geo_grid.values.shape, dtype=float)
+            elif not np.allclose(geo_grid.lon_range, lon_range) or not np.allclose(
+                geo_grid.lat_range, lat_range
+            ):
+                raise ValueError(f"Coordinate arrays of month {i + 1} don't match month 1")
+            values[i] = geo_grid.values
+            n_months += 1
+        if n_months != len(MONTHS):
+            raise ValueError(f"Expected {len(MONTHS)} monthly grids, got {n_months}")
+        return cls(lon_range=lon_range, lat_range=lat_range, values=values)
+
+    @cached_property
+    def lookup(self) -> GridLookup:
+        return GridLookup(self.lon_range, self.lat_range)
+
+    @cached_property
+    def geo_grids(self) -> List[GeoGrid]:
+        return [
+            GeoGrid(lon_range=self.lon_range, lat_range=self.lat_range, values=month_values)
+            for month_values in self.values
+        ]
+
+    def month(self, month: int) -> GeoGrid:
+        return self.geo_grids[month - 1]
+
+    def get_values_at_coordinate(self, lon: float, lat: float) -> npt.NDArray[np.floating]:
+        self.month(1).check_coordinate(lon, lat)
+        return self.lookup.cell_weights([lon], [lat]).interpolate(self.values)[:, 0]
+
+
+class DifferenceMonthCube(BaseModel):
+    future: MonthCube
+    historical: MonthCube
+
+    model_config = ConfigDict(frozen=True)
+
+    @cached_property
+    def geo_grids(self) -> List[DifferenceGeoGrid]:
+        return [
+            DifferenceGeoGrid(future=future, historical=historical)
+            for future, historical in zip(self.future.geo_grids, self.historical.geo_grids)
+        ]
+
+    def month(self, month: int) -> DifferenceGeoGrid:
+        return self.geo_grids[month - 1]
+
+    def get_values_at_coordinate(self, lon: float, lat: float) -> npt.NDArray[np.floating]:
+        self.month(1).check_coordinate(lon, lat)
+        cell_weights = self.future.lookup.cell_weights([lon], [lat])
+        return (
+            cell_weights.interpolate(self.future.values)
+            - cell_weights.interpolate(self.historical.values)
+        )[:, 0]
@@ -1,46 +1,78 @@
-import numpy
+from typing import Optional
 
+from climatemaps.aggregate import MonthAggregate
+from climatemaps.aggregate import is_summed
 from climatemaps.datasets import (
     ClimateDataConfig,
+    ClimateDifferenceDataConfig,
     ClimateModel,
     DataFormat,
     FutureClimateDataConfig,
 )
+from climatemaps.cube import MONTHS
+from climatemaps.cube import MonthCube
 from climatemaps.download import ensure_data_available
+from climatemaps.geotiff import Point
 from climatemaps.geotiff import read_geotiff_future, read_geotiff_history, read_geotiff_cru_ts
+from climatemaps.geogrid import DifferenceGeoGrid
 from climatemaps.geogrid import GeoGrid
 from climatemaps.logger import logger
+from climatemaps.timing import timed_phase
 
 
 def load_climate_data(data_config: ClimateDataConfig, month: int) -> GeoGrid:
     try:
+        return _read_climate_data(data_config, month)
+    except FileNotFoundError as e:
+        logger.exception(
+            f"Failed to load climate data for {data_config.data_type_slug}, month {month}, file: {data_config.filepath}: {e}"
+        )
+        raise
+    except Exception as e:
+        logger.exception(
+            f"Unexpected error loading climate data for {data_config.data_type_slug}, month {month}, file: {data_config.filepath}: {e}"
+        )
+        raise
+
+
+def load_climate_data_at_point(
+    data_config: ClimateDataConfig, month: int, lon: float, lat: float
+) -> GeoGrid:
+    # the 2x2 cells around the point give the same interpolated value as the full grid
+    if isinstance(data_config, ClimateDifferenceDataConfig):
+        future_grid = _read_climate_data(data_config.future_config, month, (lon, lat))
+        if data_config.future_config.climate_model == ClimateModel.ENSEMBLE_STD_DEV:
+            return future_grid
+        historical_grid = _read_climate_data(data_config.historical_config, month, (lon, lat))
+        return DifferenceGeoGrid(future=future_grid, historical=historical_grid).materialize()
+    return _read_climate_data(data_config, month, (lon, lat))
+
+
+def _read_climate_data(
+    data_config: ClimateDataConfig, month: int, point: Optional[Point] = None
+) -> GeoGrid:
+    with timed_phase("ensure_data"):
         ensure_data_available(data_config)
 
+    # windowed reads around a point are timed separately from full grid reads
+    suffix = "" if point is None else "_window"
+    with timed_phase(f"decode{suffix}"):
         if data_config.format == DataFormat.CRU_TS:
-            lon_range, lat_range, values = read_geotiff_cru_ts(data_config.filepath, month)
+            lon_range, lat_range, values = read_geotiff_cru_ts(data_config.filepath, month, point)
         elif data_config.format == DataFormat.GEOTIFF_WORLDCLIM_CMIP6:
-            lon_range, lat_range, values = read_geotiff_future(data_config.filepath, month)
+            lon_range, lat_range, values = read_geotiff_future(data_config.filepath, month, point)
         elif data_config.format == DataFormat.GEOTIFF_WORLDCLIM_HISTORY:
-            lon_range, lat_range, values = read_geotiff_history(data_config.filepath, month)
+            lon_range, lat_range, values = read_geotiff_history(data_config.filepath, month, point)
         else:
             raise ValueError(f"Unsupported data format: {data_config.format}")
 
+    with timed_phase(f"conversion{suffix}"):
         values = values * data_config.conversion_factor
 
         if data_config.conversion_function is not None:
             values = data_config.conversion_function(values, month)
 
-        return GeoGrid(lon_range=lon_range, lat_range=lat_range, values=values)
-    except FileNotFoundError as e:
-        logger.exception(
-            f"Failed to load climate data for {data_config.data_type_slug}, month {month}, file: {data_config.filepath}: {e}"
-        )
-        raise
-    except Exception as e:
-        logger.exception(
-            f"Unexpected error loading climate data for {data_config.data_type_slug}, month {month}, file: {data_config.filepath}: {e}"
-        )
-        raise
+    return GeoGrid(lon_range=lon_range, lat_range=lat_range, values=values)
 
 
 def load_climate_data_for_difference(
@@ -53,9 +85,24 @@ def load_climate_data_for_difference(
 
     historical_grid = load_climate_data(historical_config, month)
 
-    if not numpy.allclose(historical_grid.lon_range, future_grid.lon_range) or not numpy.allclose(
-        historical_grid.lat_range, future_grid.lat_range
-    ):
-        raise ValueError("Coordinate arrays don't match between historical and future data")
+    return DifferenceGeoGrid(future=future_grid, historical=historical_grid).materialize()
+
+
+def load_climate_data_for_config(data_config: ClimateDataConfig, month: int) -> GeoGrid:
+    if isinstance(data_config, ClimateDifferenceDataConfig):
+        return load_climate_data_for_difference(
+            data_config.historical_config, data_config.future_config, month
+        )
+    return load_climate_data(data_config, month)
+
+
+def load_climate_data_cube(data_config: ClimateDataConfig) -> MonthCube:
+    return MonthCube.from_geo_grids(
+        load_climate_data_for_config(data_config, month) for month in MONTHS
+    )
 
-    return future_grid.difference(historical_grid)
+
+def load_climate_data_aggregate(
+    data_config: ClimateDataConfig, aggregate: MonthAggregate
+) -> GeoGrid:
+    return aggregate.reduce_cube(load_climate_data_cube(data_config), is_summed(data_config))
@@ -1,4 +1,7 @@
 import logging
+import math
+from functools import cached_property
+from typing import Tuple
 
 import numpy as np
 import numpy.typing as npt
@@ -8,8 +11,36 @@ from pydantic import ConfigDict
 from pydantic import field_validator
 from pydantic import model_validator
 
+from climatemaps.lookup import GridLookup
+
 logger = logging.getLogger(__name__)
 
+GridLayout = Tuple[int, int, float, float, float, float]
+
+
+def get_grid_layout(
+    lon_range: npt.NDArray[np.floating], lat_range: npt.NDArray[np.floating]
+) -> GridLayout:
+    return (
+        lon_range.size,
+        lat_range.size,
+        float(lon_range[0]),
+        float(lon_range[-1]),
+        float(lat_range[0]),
+        float(lat_range[-1]),
+    )
+
+
+def check_coordinate_in_range(
+    lon_range: npt.NDArray[np.floating], lat_range: npt.NDArray[np.floating], lon: float, lat: float
+) -> None:
+    lon_min, lon_max = lon_range[0], lon_range[-1]
+    lat_min, lat_max = lat_range[-1], lat_range[0]
+    if lon < lon_min or lon > lon_max:
+        raise ValueError(f"Longitude {lon} is out of range [{lon_min}, {lon_max}]")
+    if lat < lat_min or lat > lat_max:
+        raise ValueError(f"Latitude {lat} is out of range [{lat_min}, {lat_max}]")
+
 
 class GeoGrid(BaseModel):
     lon_range: npt.NDArray[np.floating]
@@ -40,6 +71,14 @@ class GeoGrid(BaseModel):
             raise ValueError("shape of values does not match the lon size")
         return self
 
+    @classmethod
+    def from_global_values(cls, values: npt.NDArray[np.floating]) -> "GeoGrid":
+        # cells of equal size covering the world, from the north-west corner
+        height, width = values.shape
+        lon_range = np.linspace(-180, 180, width, endpoint=False) + 180 / width
+        lat_range = np.linspace(90, -90, height, endpoint=False) - 90 / height
+        return cls(lon_range=lon_range, lat_range=lat_range, values=values)
+
     def clipped_values(self, lower: float, upper: float) -> npt.NDArray[np.floating]:
         return np.clip(self.values.astype(float), lower, upper)
 
@@ -115,25 +154,98 @@ class GeoGrid(BaseModel):
         """upper right corner latitude"""
         return self.lat_max + self.bin_width / 2
 
+    @cached_property
+    def lookup(self) -> GridLookup:
+        return GridLookup(self.lon_range, self.lat_range)
+
+    def check_coordinate(self, lon: float, lat: float) -> None:
+        check_coordinate_in_range(self.lon_range, self.lat_range, lon, lat)
+
     def get_value_at_coordinate(self, lon: float, lat: float) -> float:
-        if lon < self.lon_min or lon > self.lon_max:
-            raise ValueError(f"Longitude {lon} is out of range [{self.lon_min}, {self.lon_max}]")
-        if lat < self.lat_min or lat > self.lat_max:
-            raise ValueError(f"Latitude {lat} is out of range [{self.lat_min}, {self.lat_max}]")
-
-        from scipy.interpolate import RegularGridInterpolator
-
-        interpolator = RegularGridInterpolator(
-            (self.lat_range, self.lon_range),
-            self.values,
-            method="linear",
-            bounds_error=False,
-            fill_value=np.nan,
+        self.check_coordinate(lon, lat)
+
+        value = self.lookup.interpolate(self.values, lon, lat)
+
+        if math.isnan(value):
+            raise ValueError(f"No data available at coordinates (lat={lat}, lon={lon})")
+
+        return value
+
+    def get_values_at_coordinates(
+        self, lons: npt.ArrayLike, lats: npt.ArrayLike
+    ) -> npt.NDArray[np.floating]:
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        values = self.lookup.cell_weights(lons, lats).interpolate(self.values)
+        return np.where(self.in_range(lons, lats), values, np.nan)
+
+    def in_range(
+        self, lons: npt.NDArray[np.floating], lats: npt.NDArray[np.floating]
+    ) -> npt.NDArray[np.bool_]:
+        return (
+            (lons >= self.lon_min)
+            & (lons <= self.lon_max)
+            & (lats >= self.lat_min)
+            & (lats <= self.lat_max)
         )
 
-        value = float(interpolator([lat, lon])[0])
 
-        if np.isnan(value):
+# the difference array is only computed when values or materialize() are used
+class DifferenceGeoGrid(BaseModel):
+    future: GeoGrid
+    historical: GeoGrid
+
+    model_config = ConfigDict(frozen=True)
+
+    @model_validator(mode="after")
+    def check_axes(self) -> "DifferenceGeoGrid":
+        if not np.allclose(self.future.lon_range, self.historical.lon_range) or not np.allclose(
+            self.future.lat_range, self.historical.lat_range
+        ):
+            raise ValueError("Coordinate arrays don't match between historical and future data")
+        return self
+
+    @property
+    def lon_range(self) -> npt.NDArray[np.floating]:
+        return self.future.lon_range
+
+    @property
+    def lat_range(self) -> npt.NDArray[np.floating]:
+        return self.future.lat_range
+
+    @property
+    def lookup(self) -> GridLookup:
+        return self.future.lookup
+
+    @cached_property
+    def values(self) -> npt.NDArray[np.floating]:
+        return self.future.values - self.historical.values
+
+    def materialize(self) -> GeoGrid:
+        return GeoGrid(lon_range=self.lon_range, lat_range=self.lat_range, values=self.values)
+
+    def check_coordinate(self, lon: float, lat: float) -> None:
+        self.future.check_coordinate(lon, lat)
+
+    def get_value_at_coordinate(self, lon: float, lat: float) -> float:
+        self.check_coordinate(lon, lat)
+
+        value = self.lookup.interpolate(self.future.values, lon, lat) - self.lookup.interpolate(
+            self.historical.values, lon, lat
+        )
+
+        if math.isnan(value):
             raise ValueError(f"No data available at coordinates (lat={lat}, lon={lon})")
 
         return value
+
+    def get_values_at_coordinates(
+        self, lons: npt.ArrayLike, lats: npt.ArrayLike
+    ) -> npt.NDArray[np.floating]:
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        cell_weights = self.lookup.cell_weights(lons, lats)
+        values = cell_weights.interpolate(self.future.values) - cell_weights.interpolate(
+            self.historical.values
+        )
+        return np.where(self.future.in_range(lons, lats), values, np.nan)
@@ -1,8 +1,17 @@
 import os
+from typing import Callable
+from typing import Optional
 from typing import Tuple
 
 import numpy as np
 import rasterio
+from rasterio.windows import Window
+
+from climatemaps.geogrid import check_coordinate_in_range
+from climatemaps.lookup import GridLookup
+
+# (lon, lat) of a point to read only the 2x2 cells around, instead of the whole band
+Point = Tuple[float, float]
 
 
 def _process_coordinate_arrays(transform, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
@@ -17,42 +26,69 @@ def _process_coordinate_arrays(transform, width: int, height: int) -> Tuple[np.n
     return lon_array, lat_array
 
 
-def read_geotiff_future(filepath: str, month: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    assert month > 0 and month <= 12, f"Month must be between 1 and 12, got {month}"
+def _get_point_window(lon_array: np.ndarray, lat_array: np.ndarray, point: Point) -> Window:
+    lon, lat = point
+    check_coordinate_in_range(lon_array, lat_array, lon, lat)
+    cell_weights = GridLookup(lon_array, lat_array).cell_weights([lon], [lat])
+    return Window(
+        col_off=int(cell_weights.cols[0]), row_off=int(cell_weights.rows[0]), width=2, height=2
+    )
 
-    with rasterio.open(filepath) as src:
-        array = src.read(month).astype(float)
 
+def _read_band(
+    filepath: str,
+    band: int,
+    point: Optional[Point] = None,
+    mask: Optional[Callable[[np.ndarray], None]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    with rasterio.open(filepath) as src:
         lon_array, lat_array = _process_coordinate_arrays(src.transform, src.width, src.height)
 
+        if point is None:
+            array = src.read(band).astype(float)
+        else:
+            window = _get_point_window(lon_array, lat_array, point)
+            array = src.read(band, window=window).astype(float)
+            lon_array = lon_array[window.col_off : window.col_off + window.width]
+            lat_array = lat_array[window.row_off : window.row_off + window.height]
+
+    if mask is not None:
+        mask(array)
+
     return lon_array, lat_array, array
 
 
-def read_geotiff_history(filepath: str, month: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    data_type = filepath.split("/")[-1]
-    filepath = os.path.join(filepath, f"{data_type}_{month:02d}.tif")
+def _mask_history(array: np.ndarray) -> None:
+    array[array == -32768] = np.nan  # Sea
+    array[array <= -300] = np.nan  # Sea
 
-    with rasterio.open(filepath) as src:
-        array = src.read(1).astype(float)
 
-        array[array == -32768] = np.nan  # Sea
-        array[array <= -300] = np.nan  # Sea
+def _mask_cru_ts(array: np.ndarray) -> None:
+    array[array == 254] = np.nan  # NoData value
+    array[array <= -9000] = np.nan  # Invalid values
 
-        lon_array, lat_array = _process_coordinate_arrays(src.transform, src.width, src.height)
 
-    return lon_array, lat_array, array
+def read_geotiff_future(
+    filepath: str, month: int, point: Optional[Point] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    assert month > 0 and month <= 12, f"Month must be between 1 and 12, got {month}"
 
+    return _read_band(filepath, month, point)
 
-def read_geotiff_cru_ts(filepath: str, month: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+def read_geotiff_history(
+    filepath: str, month: int, point: Optional[Point] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     data_type = filepath.split("/")[-1]
     filepath = os.path.join(filepath, f"{data_type}_{month:02d}.tif")
 
-    with rasterio.open(filepath) as src:
-        array = src.read(1).astype(float)
+    return _read_band(filepath, 1, point, mask=_mask_history)
 
-        array[array == 254] = np.nan  # NoData value
-        array[array <= -9000] = np.nan  # Invalid values
 
-        lon_array, lat_array = _process_coordinate_arrays(src.transform, src.width, src.height)
+def read_geotiff_cru_ts(
+    filepath: str, month: int, point: Optional[Point] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    data_type = filepath.split("/")[-1]
+    filepath = os.path.join(filepath, f"{data_type}_{month:02d}.tif")
 
-    return lon_array, lat_array, array
+    return _read_band(filepath, 1, point, mask=_mask_cru_ts)
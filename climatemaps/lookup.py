@@ -0,0 +1,101 @@
+import math
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+
+# like RegularGridInterpolator, a point on a grid line belongs to the cell above it, except on the
+# last grid line
+class _Axis:
+    def __init__(self, coords: npt.NDArray[np.floating]):
+        self.coords = np.ascontiguousarray(coords, dtype=float)
+        self.size = self.coords.size
+        self.start = float(self.coords[0])
+        self.step = float(self.coords[-1] - self.coords[0]) / (self.size - 1)
+        self.is_regular = bool(np.allclose(np.diff(self.coords), self.step, rtol=1e-6, atol=0))
+        self._coords_list = self.coords.tolist()
+
+    def index(self, x: float) -> Tuple[int, float]:
+        coords = self._coords_list
+        last = self.size - 2
+        if self.is_regular:
+            i = min(max(int(math.floor((x - self.start) / self.step)), 0), last)
+            # correct for floating point rounding on grid lines
+            if x < coords[i] and i > 0:
+                i -= 1
+            elif i < last and x >= coords[i + 1]:
+                i += 1
+        else:
+            i = min(max(int(np.searchsorted(self.coords, x, side="right")) - 1, 0), last)
+        lower = coords[i]
+        return i, (x - lower) / (coords[i + 1] - lower)
+
+    def indices(
+        self, x: npt.NDArray[np.floating]
+    ) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.floating]]:
+        last = self.size - 2
+        if self.is_regular:
+            i = np.floor((x - self.start) / self.step)
+            i = np.clip(np.nan_to_num(i), 0, last).astype(np.intp)
+            i -= (x < self.coords[i]) & (i > 0)
+            i += (i < last) & (x >= self.coords[i + 1])
+        else:
+            i = np.clip(np.searchsorted(self.coords, x, side="right") - 1, 0, last)
+        lower = self.coords[i]
+        return i, (x - lower) / (self.coords[i + 1] - lower)
+
+
+@dataclass(frozen=True)
+class CellWeights:
+    rows: npt.NDArray[np.intp]
+    cols: npt.NDArray[np.intp]
+    weight_north: npt.NDArray[np.floating]
+    weight_east: npt.NDArray[np.floating]
+
+    def interpolate(self, values: npt.NDArray[np.floating]) -> npt.NDArray[np.floating]:
+        rows, cols = self.rows, self.cols
+        north, east = self.weight_north, self.weight_east
+        top = values[..., rows, cols] * (1 - east) + values[..., rows, cols + 1] * east
+        bottom = values[..., rows + 1, cols] * (1 - east) + values[..., rows + 1, cols + 1] * east
+        return top * north + bottom * (1 - north)
+
+
+class GridLookup:
+    def __init__(self, lon_range: npt.NDArray[np.floating], lat_range: npt.NDArray[np.floating]):
+        self._lon_axis = _Axis(lon_range)
+        self._lat_axis = _Axis(np.asarray(lat_range)[::-1])
+        self._lat_last = self._lat_axis.size - 1
+
+    def interpolate(self, values: npt.NDArray[np.floating], lon: float, lat: float) -> float:
+        col, east = self._lon_axis.index(lon)
+        k, north = self._lat_axis.index(lat)
+        row = self._lat_last - 1 - k
+        item = values.item
+        top = item(row, col) * (1 - east) + item(row, col + 1) * east
+        bottom = item(row + 1, col) * (1 - east) + item(row + 1, col + 1) * east
+        return top * north + bottom * (1 - north)
+
+    def interpolate_grid(
+        self, values: npt.NDArray[np.floating], lons: npt.ArrayLike, lats: npt.ArrayLike
+    ) -> npt.NDArray[np.floating]:
+        cols, east = self._lon_axis.indices(np.asarray(lons, dtype=float).ravel())
+        k, north = self._lat_axis.indices(np.asarray(lats, dtype=float).ravel())
+        rows = self._lat_last - 1 - k
+        east = east[np.newaxis, :]
+        north = north[:, np.newaxis]
+        top = values[np.ix_(rows, cols)] * (1 - east) + values[np.ix_(rows, cols + 1)] * east
+        bottom = (
+            values[np.ix_(rows + 1, cols)] * (1 - east) + values[np.ix_(rows + 1, cols + 1)] * east
+        )
+        return top * north + bottom * (1 - north)
+
+    def cell_weights(self, lons: npt.ArrayLike, lats: npt.ArrayLike) -> CellWeights:
+        lons = np.asarray(lons, dtype=float).ravel()
+        lats = np.asarray(lats, dtype=float).ravel()
+        cols, east = self._lon_axis.indices(lons)
+        k, north = self._lat_axis.indices(lats)
+        return CellWeights(
+            rows=self._lat_last - 1 - k, cols=cols, weight_north=north, weight_east=east
+        )
@@ -0,0 +1,247 @@
+import math
+from dataclasses import dataclass
+from typing import Any
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from affine import Affine
+from rasterio import features
+
+CellRange = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class RegionStats:
+    n_cells: int
+    mean: Optional[float]
+    area_weighted_mean: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+
+    @classmethod
+    def from_sums(
+        cls,
+        n_cells: float,
+        sum_values: float,
+        sum_weighted_values: float,
+        sum_weights: float,
+        value_min: float,
+        value_max: float,
+    ) -> "RegionStats":
+        n_cells = int(round(n_cells))
+        if n_cells == 0:
+            return cls(n_cells=0, mean=None, area_weighted_mean=None, min=None, max=None)
+        return cls(
+            n_cells=n_cells,
+            mean=float(sum_values / n_cells),
+            area_weighted_mean=float(sum_weighted_values / sum_weights),
+            min=float(value_min),
+            max=float(value_max),
+        )
+
+
+def get_area_weights(lat_range: npt.NDArray[np.floating]) -> npt.NDArray[np.floating]:
+    return np.cos(np.radians(np.asarray(lat_range, dtype=float)))
+
+
+def get_cell_range(
+    lon_range: npt.NDArray[np.floating],
+    lat_range: npt.NDArray[np.floating],
+    lon_min: float,
+    lat_min: float,
+    lon_max: float,
+    lat_max: float,
+) -> CellRange:
+    col_start = int(np.searchsorted(lon_range, lon_min, side="left"))
+    col_stop = int(np.searchsorted(lon_range, lon_max, side="right"))
+    descending_lats = -np.asarray(lat_range)
+    row_start = int(np.searchsorted(descending_lats, -lat_max, side="left"))
+    row_stop = int(np.searchsorted(descending_lats, -lat_min, side="right"))
+    return row_start, max(row_start, row_stop), col_start, max(col_start, col_stop)
+
+
+def _add_padded_cumsum(values: npt.NDArray[np.floating]) -> npt.NDArray[np.float64]:
+    table = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(values, axis=0, dtype=np.float64, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+# minimum and maximum use a pyramid of block minima and maxima, a query only scans the box edges
+class SummedAreaTables:
+    BLOCK_SIZE = 32
+
+    def __init__(
+        self,
+        lon_range: npt.NDArray[np.floating],
+        lat_range: npt.NDArray[np.floating],
+        values: npt.NDArray[np.floating],
+    ):
+        self.lon_range = np.asarray(lon_range)
+        self.lat_range = np.asarray(lat_range)
+        self.values = values
+        has_data = ~np.isnan(values)
+        data = np.where(has_data, values, 0.0)
+        weights = get_area_weights(self.lat_range)[:, np.newaxis] * has_data
+        self._count = _add_padded_cumsum(has_data)
+        self._sum = _add_padded_cumsum(data)
+        self._weighted_sum = _add_padded_cumsum(data * weights)
+        self._weights = _add_padded_cumsum(weights)
+        self._block_min, self._block_max = self._create_blocks(values)
+
+    @classmethod
+    def _create_blocks(
+        cls, values: npt.NDArray[np.floating]
+    ) -> Tuple[npt.NDArray[np.floating], npt.NDArray[np.floating]]:
+        block = cls.BLOCK_SIZE
+        n_rows, n_cols = math.ceil(values.shape[0] / block), math.ceil(values.shape[1] / block)
+        padded = np.full((n_rows * block, n_cols * block), np.nan)
+        padded[: values.shape[0], : values.shape[1]] = values
+        blocks = padded.reshape(n_rows, block, n_cols, block)
+        has_data = ~np.isnan(blocks)
+        block_min = np.where(has_data, blocks, np.inf).min(axis=(1, 3))
+        block_max = np.where(has_data, blocks, -np.inf).max(axis=(1, 3))
+        return block_min, block_max
+
+    @property
+    def nbytes(self) -> int:
+        tables = (self._count, self._sum, self._weighted_sum, self._weights)
+        values_bytes = 0 if isinstance(self.values, np.memmap) else self.values.nbytes
+        return sum(table.nbytes for table in tables) + 2 * self._block_min.nbytes + values_bytes
+
+    def bbox_stats(
+        self, lon_min: float, lat_min: float, lon_max: float, lat_max: float
+    ) -> RegionStats:
+        # a box with lon_min larger than lon_max crosses the antimeridian
+        if lon_min > lon_max:
+            cell_ranges = [
+                get_cell_range(self.lon_range, self.lat_range, lon_min, lat_min, 180.0, lat_max),
+                get_cell_range(self.lon_range, self.lat_range, -180.0, lat_min, lon_max, lat_max),
+            ]
+        else:
+            cell_ranges = [
+                get_cell_range(self.lon_range, self.lat_range, lon_min, lat_min, lon_max, lat_max)
+            ]
+
+        sums = np.sum([self._get_sums(cell_range) for cell_range in cell_ranges], axis=0)
+        min_max = [self._get_min_max(cell_range) for cell_range in cell_ranges]
+        return RegionStats.from_sums(
+            *sums, min(low for low, _ in min_max), max(high for _, high in min_max)
+        )
+
+    def _get_sums(self, cell_range: CellRange) -> List[float]:
+        r0, r1, c0, c1 = cell_range
+        return [
+            float(table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0])
+            for table in (self._count, self._sum, self._weighted_sum, self._weights)
+        ]
+
+    def _get_min_max(self, cell_range: CellRange) -> Tuple[float, float]:
+        r0, r1, c0, c1 = cell_range
+        if r0 >= r1 or c0 >= c1:
+            return math.inf, -math.inf
+
+        block = self.BLOCK_SIZE
+        # blocks entirely inside the range
+        br0, br1 = -(-r0 // block), r1 // block
+        bc0, bc1 = -(-c0 // block), c1 // block
+        if br0 >= br1 or bc0 >= bc1:
+            return _nan_min_max(self.values[r0:r1, c0:c1])
+
+        lows = [self._block_min[br0:br1, bc0:bc1].min()]
+        highs = [self._block_max[br0:br1, bc0:bc1].max()]
+        edges = [
+            self.values[r0 : br0 * block, c0:c1],
+            self.values[br1 * block : r1, c0:c1],
+            self.values[br0 * block : br1 * block, c0 : bc0 * block],
+            self.values[br0 * block : br1 * block, bc1 * block : c1],
+        ]
+        for edge in edges:
+            low, high = _nan_min_max(edge)
+            lows.append(low)
+            highs.append(high)
+        return float(min(lows)), float(max(highs))
+
+
+def _nan_min_max(values: npt.NDArray[np.floating]) -> Tuple[float, float]:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return math.inf, -math.inf
+    return float(values.min()), float(values.max())
+
+
+@dataclass(frozen=True)
+class CellMask:
+    cell_range: CellRange
+    mask: npt.NDArray[np.bool_]
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.nbytes
+
+    def stats(
+        self, values: npt.NDArray[np.floating], lat_range: npt.NDArray[np.floating]
+    ) -> RegionStats:
+        r0, r1, c0, c1 = self.cell_range
+        region = values[r0:r1, c0:c1]
+        mask = self.mask & ~np.isnan(region)
+        selected = region[mask]
+        if selected.size == 0:
+            return RegionStats.from_sums(0, 0, 0, 0, math.nan, math.nan)
+        weights = np.broadcast_to(get_area_weights(lat_range[r0:r1])[:, np.newaxis], mask.shape)[
+            mask
+        ]
+        return RegionStats.from_sums(
+            selected.size,
+            selected.sum(),
+            (selected * weights).sum(),
+            weights.sum(),
+            selected.min(),
+            selected.max(),
+        )
+
+
+def get_grid_transform(
+    lon_range: npt.NDArray[np.floating], lat_range: npt.NDArray[np.floating]
+) -> Affine:
+    lon_step = (lon_range[-1] - lon_range[0]) / (len(lon_range) - 1)
+    lat_step = (lat_range[0] - lat_range[-1]) / (len(lat_range) - 1)
+    return Affine(
+        float(lon_step),
+        0.0,
+        float(lon_range[0] - lon_step / 2),
+        0.0,
+        -float(lat_step),
+        float(lat_range[0] + lat_step / 2),
+    )
+
+
+def rasterize_polygon(
+    geometry: Mapping[str, Any],
+    lon_range: npt.NDArray[np.floating],
+    lat_range: npt.NDArray[np.floating],
+) -> CellMask:
+    # a polygon containing no cell center gets the cells it touches
+    if geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        raise ValueError(f"Unsupported geometry type: {geometry.get('type')}")
+    if not features.is_valid_geom(geometry):
+        raise ValueError("Invalid geometry")
+
+    out_shape = (len(lat_range), len(lon_range))
+    transform = get_grid_transform(lon_range, lat_range)
+    mask = features.geometry_mask([geometry], out_shape, transform, invert=True)
+    if not mask.any():
+        mask = features.geometry_mask(
+            [geometry], out_shape, transform, invert=True, all_touched=True
+        )
+
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return CellMask(cell_range=(0, 0, 0, 0), mask=np.zeros((0, 0), dtype=bool))
+    r0, r1, c0, c1 = int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+    return CellMask(cell_range=(r0, r1, c0, c1), mask=mask[r0:r1, c0:c1].copy())
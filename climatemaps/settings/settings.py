@@ -8,6 +8,80 @@ TILE_SERVER_URL = "http://localhost:8080/data"
 API_BASE_URL = "http://localhost:8000/v1"
 ZOOM_MAX_RASTER = 4
 
+MONTH_CUBE_DIR = "data/cubes"
+TILES_DIR = "data/tiles"
+# Colorbars only change on deploy, clients revalidate with the ETag after this many seconds
+COLORBAR_CACHE_MAX_AGE = 24 * 3600
+CATALOG_CACHE_MAX_AGE = 3600
+
+# Region statistics: memory budget for summed-area tables per data type and month (about 5x the
+# size of the grid) and cell masks of polygons (up to 1 byte per grid cell)
+REGION_STATS_CACHE_MAX_BYTES = 1024**3
+# Country statistics: Natural Earth admin 0 boundaries ("10m", "50m" or "110m"), downloaded by
+# cartopy on first use, and the number of data type and month results to cache
+COUNTRY_BOUNDARIES_RESOLUTION = "50m"
+COUNTRY_STATS_CACHE_SIZE = 512
+
+# Raster tiles rendered on demand at GET /tiles/{data_type}/{month}/{z}/{x}/{y}.png
+TILE_CACHE_MAX_BYTES = 256 * 1024**2
+TILE_CACHE_MAX_AGE = 24 * 3600
+TILE_MAX_ZOOM = 12
+# Pre-built mbtiles served at GET /data/{data_type}_{raster|vector}_{month}/{z}/{x}/{y}.{png|pbf}
+MBTILES_MAX_OPEN_FILES = 256
+# read-only SQLite connections per open mbtiles file
+MBTILES_POOL_SIZE = 4
+
+# Directory where each API worker writes a snapshot of its metrics, for GET /metrics to aggregate
+# them over all workers, for example "/dev/shm/climatemaps-metrics". None serves the metrics of
+# the worker that handles the request only.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+
+# Log API requests that take longer than this many seconds, with the duration of their phases as
+# also sent in the Server-Timing header. None disables the log.
+SLOW_REQUEST_LOG_THRESHOLD = 1.0
+
+# Serialize the responses of hot endpoints (value and nearest city lookups) directly to JSON bytes,
+# skipping response model validation of the already trusted content
+FAST_JSON_RESPONSES = True
+
+# Part of the ETag of snapped value lookups (GET /value?snap=true) and of the names of shared
+# cache segments, change it when datasets change
+DATASET_VERSION = "1"
+VALUE_CELL_CACHE_MAX_AGE = 7 * 24 * 3600
+# 1 snaps to the center of a dataset grid cell, 2 or more to the centers of smaller sub-cells
+VALUE_CELL_SUBDIVISIONS = 1
+
+# Memory budget per API worker for decoded grids (a 5m grid is about 75 MB)
+GEO_GRID_CACHE_MAX_BYTES = 4 * 1024**3
+# "memory" for a cache per worker process, or "shared" for one cache in shared memory that all
+# workers on the host use (Linux only)
+GEO_GRID_CACHE_BACKEND = "memory"
+GEO_GRID_SHARED_CACHE_DIR = "/dev/shm/climatemaps"
+# Seconds a request waits for a grid that is being loaded by a concurrent request
+GEO_GRID_LOAD_TIMEOUT = 60
+# Answer single point lookups on a cold cache by reading only the raster cells around the point,
+# while the full grid loads in the background
+WINDOWED_COLD_READS = True
+
+# Cache warm-up at API startup: "none", "historic", "most_requested" or "all"
+WARMUP_STRATEGY = "none"
+WARMUP_MONTHS = list(range(1, 13))
+WARMUP_MOST_REQUESTED_N = 100
+ACCESS_STATS_PATH = "data/access_stats.json"
+
+VALUE_BATCH_MAX_POINTS = 10000
+# data type and month combinations in a POST /values batch, each may load a full grid
+VALUE_BATCH_MAX_LAYERS = 24
+CLIMOGRAPH_MAX_DATA_TYPES = 10
+# data sets in a point time series across scenarios, year ranges and models, each a windowed
+# read of a few cells if its grid isn't loaded (3 variables x 4 year ranges x 4 scenarios)
+TIMESERIES_MAX_DATA_TYPES = 48
+
+# geocoding results are cached per normalized query for GEOCODE_CACHE_TTL seconds
+GEOCODE_CACHE_SIZE = 4096
+GEOCODE_CACHE_TTL = 24 * 3600
+
 DATA_SETS_API = HISTORIC_DATA_SETS + FUTURE_DATA_SETS + DIFFERENCE_DATA_SETS
 
 TIPPECANOE_DIR = "/usr/local/bin/"
@@ -0,0 +1,109 @@
+import json
+import os
+from typing import Optional
+from typing import Set
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from climatemaps.cube import MONTHS
+from climatemaps.cube import MonthCube
+from climatemaps.data import load_climate_data_for_config
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.geogrid import GeoGrid
+from climatemaps.logger import logger
+
+
+# cubes written by another process after creation are used after a restart
+class MonthCubeStore:
+    # version 1 stored float32, cubes are stored in the dtype of grids decoded from the source
+    FORMAT_VERSION = 2
+    DTYPE = np.float64
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._stored = self._list_stored()
+
+    def _list_stored(self) -> Set[str]:
+        if not os.path.isdir(self.directory):
+            return set()
+        filenames = set(os.listdir(self.directory))
+        return {
+            filename[: -len(".npy")]
+            for filename in filenames
+            if filename.endswith(".npy") and f"{filename[: -len('.npy')]}.json" in filenames
+        }
+
+    def _values_path(self, data_type_slug: str) -> str:
+        return os.path.join(self.directory, f"{data_type_slug}.npy")
+
+    def _meta_path(self, data_type_slug: str) -> str:
+        return os.path.join(self.directory, f"{data_type_slug}.json")
+
+    def exists(self, data_type_slug: str) -> bool:
+        return data_type_slug in self._stored
+
+    def load(self, data_type_slug: str) -> Optional[MonthCube]:
+        if not self.exists(data_type_slug):
+            return None
+
+        with open(self._meta_path(data_type_slug)) as f:
+            meta = json.load(f)
+        if meta.get("version") != self.FORMAT_VERSION:
+            logger.warning(f"Ignoring month cube for {data_type_slug} with outdated format")
+            return None
+
+        values = np.load(self._values_path(data_type_slug), mmap_mode="r")
+        return MonthCube(
+            lon_range=np.array(meta["lon_range"]),
+            lat_range=np.array(meta["lat_range"]),
+            values=values,
+        )
+
+    def write(self, data_config: ClimateDataConfig) -> None:
+        data_type_slug = data_config.data_type_slug
+        values_path = self._values_path(data_type_slug)
+        meta_path = self._meta_path(data_type_slug)
+        values_temp_path = f"{values_path}.tmp.npy"
+        logger.info(f"BEGIN: writing month cube {values_path}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        values = None
+        geo_grid_first: Optional[GeoGrid] = None
+        try:
+            for month in MONTHS:
+                geo_grid = load_climate_data_for_config(data_config, month)
+                if values is None:
+                    geo_grid_first = geo_grid
+                    values = open_memmap(
+                        values_temp_path,
+                        mode="w+",
+                        dtype=self.DTYPE,
+                        shape=(len(MONTHS),) + geo_grid.values.shape,
+                    )
+                elif not np.allclose(
+                    geo_grid.lon_range, geo_grid_first.lon_range
+                ) or not np.allclose(geo_grid.lat_range, geo_grid_first.lat_range):
+                    raise ValueError(f"Coordinate arrays of month {month} don't match month 1")
+                values[month - 1] = geo_grid.values
+            values.flush()
+            del values
+
+            os.replace(values_temp_path, values_path)
+        finally:
+            if os.path.exists(values_temp_path):
+                logger.info(f"Removing incomplete temp file: {values_temp_path}")
+                os.remove(values_temp_path)
+
+        meta = {
+            "version": self.FORMAT_VERSION,
+            "data_type": data_type_slug,
+            "lon_range": geo_grid_first.lon_range.tolist(),
+            "lat_range": geo_grid_first.lat_range.tolist(),
+        }
+        meta_temp_path = f"{meta_path}.tmp"
+        with open(meta_temp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_temp_path, meta_path)
+        self._stored.add(data_type_slug)
+        logger.info(f"END: writing month cube {values_path}")
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from climatemaps.aggregate import AGGREGATES
+from climatemaps.aggregate import MonthAggregate
+from climatemaps.aggregate import get_aggregate_contour_config
+from climatemaps.aggregate import get_aggregate_unit
+from climatemaps.aggregate import is_summed
+from climatemaps.cube import DifferenceMonthCube
+from climatemaps.cube import MonthCube
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.datasets import ClimateVarKey
+from climatemaps.datasets import DataFormat
+from climatemaps.datasets import SpatialResolution
+
+
+def create_cube(offset: float = 0.0) -> MonthCube:
+    lon_range = np.array([-1.5, -0.5, 0.5, 1.5])
+    lat_range = np.array([1.0, 0.0, -1.0])
+    values = np.arange(1, 13, dtype=float)[:, None, None] + np.zeros((12, 3, 4)) + offset
+    values[:, 0, 0] = np.nan
+    values[6, 0, 1] = np.nan
+    return MonthCube(lon_range=lon_range, lat_range=lat_range, values=values)
+
+
+def create_data_config(variable_type: ClimateVarKey) -> ClimateDataConfig:
+    return ClimateDataConfig(
+        variable_type=variable_type,
+        filepath="",
+        format=DataFormat.GEOTIFF_WORLDCLIM_HISTORY,
+        resolution=SpatialResolution.MIN10,
+        year_range=(1970, 2000),
+    )
+
+
+class TestMonthAggregate:
+
+    def test_parse(self):
+        assert MonthAggregate.parse("annual") is AGGREGATES["annual"]
+        assert MonthAggregate.parse("DJF").months == (1, 2, 12)
+        assert MonthAggregate.parse("12,1,2") is AGGREGATES["djf"]
+        custom = MonthAggregate.parse("8,5,7,5")
+        assert custom.name == "5,7,8"
+        assert custom.months == (5, 7, 8)
+        with pytest.raises(ValueError):
+            MonthAggregate.parse("winter")
+        with pytest.raises(ValueError):
+            MonthAggregate.parse("0,1")
+
+    def test_reduce_cube(self):
+        cube = create_cube()
+        mean = AGGREGATES["djf"].reduce_cube(cube, summed=False)
+        assert mean.values[1, 1] == pytest.approx(5.0)
+        assert np.isnan(mean.values[0, 0])
+        assert mean.values[0, 1] == pytest.approx(5.0)
+
+        total = AGGREGATES["annual"].reduce_cube(cube, summed=True)
+        assert total.values[1, 1] == pytest.approx(78.0)
+        # a month without data has no total
+        assert np.isnan(total.values[0, 1])
+        np.testing.assert_array_equal(total.lon_range, cube.lon_range)
+
+    def test_reduce_difference_cube(self):
+        cube = DifferenceMonthCube(future=create_cube(offset=2.0), historical=create_cube())
+        difference = AGGREGATES["jja"].reduce_cube(cube, summed=True)
+        assert difference.values[2, 3] == pytest.approx(6.0)
+        assert np.isnan(difference.values[0, 1])
+
+    def test_summed_variables(self):
+        precipitation = create_data_config(ClimateVarKey.PRECIPITATION)
+        temperature = create_data_config(ClimateVarKey.T_MAX)
+        assert is_summed(precipitation)
+        assert not is_summed(temperature)
+        assert get_aggregate_unit(precipitation) == "mm"
+        assert get_aggregate_unit(temperature) == "°C"
+
+        contour_config = get_aggregate_contour_config(precipitation, AGGREGATES["annual"])
+        assert contour_config.level_lower == precipitation.contour_config.level_lower * 12
+        assert contour_config.level_upper == precipitation.contour_config.level_upper * 12
+        assert contour_config.unit == "mm"
+        assert (
+            get_aggregate_contour_config(temperature, AGGREGATES["annual"])
+            is temperature.contour_config
+        )
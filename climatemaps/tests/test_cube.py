@@ -0,0 +1,64 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from climatemaps.cube import DifferenceMonthCube
+from climatemaps.cube import MonthCube
+from climatemaps.geogrid import GeoGrid
+
+
+class TestMonthCube:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.lon_range = np.array([-135, -45, 45, 135])
+        self.lat_range = np.array([45, -45])
+        values = np.array([[10.0, 20.0, 30.0, 40.0], [50.0, 60.0, 70.0, 80.0]])
+        self.geo_grids = [
+            GeoGrid(lon_range=self.lon_range, lat_range=self.lat_range, values=values + month)
+            for month in range(12)
+        ]
+        self.cube = MonthCube.from_geo_grids(self.geo_grids)
+
+    def test_shape(self):
+        assert self.cube.values.shape == (12, 2, 4)
+
+    def test_month(self):
+        npt.assert_array_equal(self.cube.month(3).values, self.geo_grids[2].values)
+
+    def test_get_values_at_coordinate(self):
+        values = self.cube.get_values_at_coordinate(lon=-90, lat=0)
+        expected = [geo_grid.get_value_at_coordinate(lon=-90, lat=0) for geo_grid in self.geo_grids]
+        npt.assert_array_almost_equal(values, expected, decimal=6)
+
+    def test_get_values_out_of_bounds(self):
+        with pytest.raises(ValueError, match="Longitude .* is out of range"):
+            self.cube.get_values_at_coordinate(lon=200, lat=0)
+
+    def test_from_geo_grids_missing_months(self):
+        with pytest.raises(ValueError, match="Expected 12 monthly grids"):
+            MonthCube.from_geo_grids(self.geo_grids[:11])
+        with pytest.raises(ValueError, match="Expected 12 monthly grids"):
+            MonthCube.from_geo_grids([])
+        with pytest.raises(ValueError, match="Expected 12 monthly grids"):
+            MonthCube.from_geo_grids(self.geo_grids + self.geo_grids[:1])
+
+    def test_from_geo_grids_mismatching_axes(self):
+        other = GeoGrid(
+            lon_range=self.lon_range + 1, lat_range=self.lat_range, values=self.geo_grids[0].values
+        )
+        with pytest.raises(ValueError, match="Coordinate arrays"):
+            MonthCube.from_geo_grids(self.geo_grids[:11] + [other])
+
+    def test_difference_get_values_at_coordinate(self):
+        historical = MonthCube(
+            lon_range=self.lon_range, lat_range=self.lat_range, values=self.cube.values / 2
+        )
+        difference = DifferenceMonthCube(future=self.cube, historical=historical)
+        npt.assert_allclose(
+            difference.get_values_at_coordinate(lon=-90, lat=0),
+            self.cube.get_values_at_coordinate(lon=-90, lat=0) / 2,
+        )
+        assert difference.month(3).get_value_at_coordinate(lon=-90, lat=0) == pytest.approx(
+            self.geo_grids[2].get_value_at_coordinate(lon=-90, lat=0) / 2
+        )
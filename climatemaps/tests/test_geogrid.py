@@ -2,6 +2,7 @@ import numpy as np
 import numpy.testing as npt
 import pytest
 
+from climatemaps.geogrid import DifferenceGeoGrid
 from climatemaps.geogrid import GeoGrid
 
 
@@ -88,6 +89,56 @@ class TestGeoGridDifference:
         npt.assert_array_almost_equal(geo_grid_diff.values, 0, decimal=6)
 
 
+class TestDifferenceGeoGrid:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        lon_range = np.array([-135.0, -45.0, 45.0, 135.0])
+        lat_range = np.array([45.0, -45.0])
+        self.future = GeoGrid(
+            lon_range=lon_range,
+            lat_range=lat_range,
+            values=np.array([[10.0, 20.0, 30.0, 40.0], [50.0, 60.0, np.nan, 80.0]]),
+        )
+        self.historical = GeoGrid(
+            lon_range=lon_range,
+            lat_range=lat_range,
+            values=np.array([[1.0, 4.0, 9.0, 16.0], [25.0, 36.0, 49.0, 64.0]]),
+        )
+        self.difference = DifferenceGeoGrid(future=self.future, historical=self.historical)
+        self.expected = self.future.difference(self.historical)
+
+    def test_get_value_at_coordinate(self):
+        for lon, lat in [(-135, 45), (-90, 0), (-100, 10)]:
+            assert self.difference.get_value_at_coordinate(lon, lat) == pytest.approx(
+                self.expected.get_value_at_coordinate(lon, lat)
+            )
+
+    def test_get_value_nan(self):
+        with pytest.raises(ValueError, match="No data available"):
+            self.difference.get_value_at_coordinate(45, -45)
+
+    def test_get_values_at_coordinates(self):
+        lons = np.array([-90.0, 0.0, 45.0, 200.0])
+        lats = np.array([0.0, 10.0, -45.0, 0.0])
+        npt.assert_allclose(
+            self.difference.get_values_at_coordinates(lons, lats),
+            self.expected.get_values_at_coordinates(lons, lats),
+        )
+
+    def test_materialize(self):
+        npt.assert_array_equal(self.difference.materialize().values, self.expected.values)
+
+    def test_mismatching_axes(self):
+        other = GeoGrid(
+            lon_range=self.future.lon_range + 1,
+            lat_range=self.future.lat_range,
+            values=self.future.values,
+        )
+        with pytest.raises(ValueError, match="Coordinate arrays"):
+            DifferenceGeoGrid(future=other, historical=self.historical)
+
+
 class TestGeoGridGetValueAtCoordinate:
 
     @pytest.fixture(autouse=True)
@@ -128,3 +179,10 @@ class TestGeoGridGetValueAtCoordinate:
         )
         with pytest.raises(ValueError, match="No data available at coordinates"):
             geo_grid_nan.get_value_at_coordinate(lon=45, lat=45)
+
+    def test_get_values_at_coordinates(self):
+        values = self.geo_grid.get_values_at_coordinates(
+            lons=[-135, -90, 200, -135], lats=[45, 0, 0, 100]
+        )
+        npt.assert_array_almost_equal(values[:2], [10.0, 35.0], decimal=6)
+        assert np.isnan(values[2:]).all()
@@ -2,7 +2,13 @@ import numpy as np
 import pytest
 from unittest.mock import Mock
 
+import rasterio
+from affine import Affine
+
+from climatemaps.geogrid import GeoGrid
 from climatemaps.geotiff import _process_coordinate_arrays
+from climatemaps.geotiff import read_geotiff_future
+from climatemaps.geotiff import read_geotiff_history
 
 
 class TestProcessCoordinateArrays:
@@ -86,3 +92,56 @@ class TestProcessCoordinateArrays:
 
         np.testing.assert_array_almost_equal(lon_diffs, expected_lon_spacing, decimal=6)
         np.testing.assert_array_almost_equal(lat_diffs, expected_lat_spacing, decimal=6)
+
+
+class TestWindowedRead:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path) -> None:
+        width = 36
+        height = 18
+        rng = np.random.default_rng(0)
+        self.bands = rng.uniform(-20, 30, size=(12, height, width)).astype(np.float32)
+        self.bands[:, 5, 7] = -32768
+        self.future_path = str(tmp_path / "future.tif")
+        self.history_dir = tmp_path / "wc2.1_10m_tavg"
+        self.history_dir.mkdir()
+
+        profile = dict(
+            driver="GTiff",
+            width=width,
+            height=height,
+            dtype="float32",
+            crs="EPSG:4326",
+            transform=Affine(10.0, 0.0, -180.0, 0.0, -10.0, 90.0),
+        )
+        with rasterio.open(self.future_path, "w", count=12, **profile) as dst:
+            dst.write(self.bands)
+        for month in range(1, 13):
+            filepath = self.history_dir / f"wc2.1_10m_tavg_{month:02d}.tif"
+            with rasterio.open(filepath, "w", count=1, **profile) as dst:
+                dst.write(self.bands[month - 1], 1)
+
+    def _assert_point_value_matches(self, read, filepath: str, month: int, lon, lat) -> None:
+        lon_range, lat_range, values = read(filepath, month)
+        full = GeoGrid(lon_range=lon_range, lat_range=lat_range, values=values)
+        lon_range, lat_range, values = read(filepath, month, (lon, lat))
+        window = GeoGrid(lon_range=lon_range, lat_range=lat_range, values=values)
+        assert values.shape == (2, 2)
+        expected = full.get_values_at_coordinates([lon], [lat])
+        actual = window.get_values_at_coordinates([lon], [lat])
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual[~np.isnan(actual)], expected[~np.isnan(expected)])
+
+    def test_future_point_matches_full_grid(self) -> None:
+        for lon, lat in [(0.0, 0.0), (-175.0, 85.0), (175.0, -85.0), (12.3, -45.6), (-5.0, 5.0)]:
+            self._assert_point_value_matches(read_geotiff_future, self.future_path, 3, lon, lat)
+
+    def test_history_point_matches_full_grid_with_nodata(self) -> None:
+        filepath = str(self.history_dir)
+        for lon, lat in [(-105.0, 35.0), (-110.0, 40.0), (100.0, 20.0)]:
+            self._assert_point_value_matches(read_geotiff_history, filepath, 5, lon, lat)
+
+    def test_point_out_of_range(self) -> None:
+        with pytest.raises(ValueError, match="Latitude"):
+            read_geotiff_future(self.future_path, 1, (0.0, 89.0))
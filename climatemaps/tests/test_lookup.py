@@ -0,0 +1,74 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from scipy.interpolate import RegularGridInterpolator
+
+from climatemaps.lookup import GridLookup
+
+
+class TestGridLookup:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        width, height = 72, 36
+        self.lon_range = np.linspace(-180, 180, width, endpoint=False) + 180 / width
+        self.lat_range = np.linspace(90, -90, height, endpoint=False) - 90 / height
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(size=(height, width))
+        self.values[rng.random((height, width)) < 0.1] = np.nan
+        self.lookup = GridLookup(self.lon_range, self.lat_range)
+        interpolator = RegularGridInterpolator(
+            (self.lat_range, self.lon_range),
+            self.values,
+            method="linear",
+            bounds_error=False,
+            fill_value=np.nan,
+        )
+        self.lons = np.concatenate(
+            [
+                rng.uniform(self.lon_range[0], self.lon_range[-1], 500),
+                rng.choice(self.lon_range, 100),
+            ]
+        )
+        self.lats = np.concatenate(
+            [
+                rng.uniform(self.lat_range[-1], self.lat_range[0], 500),
+                rng.choice(self.lat_range, 100),
+            ]
+        )
+        self.expected = interpolator(np.column_stack([self.lats, self.lons]))
+
+    def test_interpolate_matches_regular_grid_interpolator(self):
+        values = np.array(
+            [
+                self.lookup.interpolate(self.values, lon, lat)
+                for lon, lat in zip(self.lons, self.lats)
+            ]
+        )
+        npt.assert_array_almost_equal(values, self.expected, decimal=12)
+
+    def test_cell_weights_match_regular_grid_interpolator(self):
+        values = self.lookup.cell_weights(self.lons, self.lats).interpolate(self.values)
+        npt.assert_array_almost_equal(values, self.expected, decimal=12)
+
+    def test_cell_weights_stacked_values(self):
+        stacked = np.stack([self.values, self.values * 2])
+        values = self.lookup.cell_weights(self.lons, self.lats).interpolate(stacked)
+        assert values.shape == (2, self.lons.size)
+        npt.assert_array_almost_equal(values[1], self.expected * 2, decimal=12)
+
+    def test_interpolate_grid(self):
+        lons, lats = self.lons[:40], self.lats[:30]
+        values = self.lookup.interpolate_grid(self.values, lons, lats)
+        assert values.shape == (30, 40)
+        lon_grid, lat_grid = np.meshgrid(lons, lats)
+        expected = self.lookup.cell_weights(lon_grid, lat_grid).interpolate(self.values)
+        npt.assert_array_almost_equal(values.ravel(), expected, decimal=12)
+
+    def test_irregular_axis(self):
+        lon_range = np.array([-135.0, -100.0, 45.0, 135.0])
+        lat_range = np.array([45.0, -45.0])
+        values = np.array([[10.0, 20.0, 30.0, 40.0], [50.0, 60.0, 70.0, 80.0]])
+        lookup = GridLookup(lon_range, lat_range)
+        npt.assert_almost_equal(lookup.interpolate(values, -100.0, 0.0), 40.0)
+        npt.assert_almost_equal(lookup.interpolate(values, 0.0, 45.0), 20.0 + 10.0 * (100 / 145))
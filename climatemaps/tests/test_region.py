@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from climatemaps.region import SummedAreaTables
+from climatemaps.region import get_area_weights
+from climatemaps.region import rasterize_polygon
+
+
+def brute_force_stats(lon_range, lat_range, values, lon_min, lat_min, lon_max, lat_max):
+    if lon_min > lon_max:
+        in_lon = (lon_range >= lon_min) | (lon_range <= lon_max)
+    else:
+        in_lon = (lon_range >= lon_min) & (lon_range <= lon_max)
+    in_lat = (lat_range >= lat_min) & (lat_range <= lat_max)
+    region = values[np.ix_(in_lat, in_lon)]
+    weights = np.broadcast_to(get_area_weights(lat_range[in_lat])[:, np.newaxis], region.shape)
+    has_data = ~np.isnan(region)
+    selected = region[has_data]
+    if selected.size == 0:
+        return None
+    return (
+        selected.size,
+        selected.mean(),
+        np.average(selected, weights=weights[has_data]),
+        selected.min(),
+        selected.max(),
+    )
+
+
+class TestSummedAreaTables:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        width, height = 360, 180
+        self.lon_range = np.linspace(-180, 180, width, endpoint=False) + 180 / width
+        self.lat_range = np.linspace(90, -90, height, endpoint=False) - 90 / height
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(15, 10, size=(height, width))
+        self.values[rng.random((height, width)) < 0.2] = np.nan
+        self.values[:20] = np.nan
+        self.tables = SummedAreaTables(self.lon_range, self.lat_range, self.values)
+
+    def test_nbytes_includes_values(self):
+        table_bytes = (self.values.shape[0] + 1) * (self.values.shape[1] + 1) * 8
+        assert self.tables.nbytes > 4 * table_bytes + self.values.nbytes
+
+    @pytest.mark.parametrize(
+        "bbox",
+        [
+            (-180, -90, 180, 90),
+            (-10.2, 35.5, 30.7, 71.1),
+            (0.5, 0.5, 0.5, 0.5),
+            (-3, -3, 97, 3),
+            (-179.6, -89.6, -120, -40),
+            (170, -20, -170, 20),
+            (100, 82, 120, 89),
+        ],
+    )
+    def test_matches_brute_force(self, bbox):
+        stats = self.tables.bbox_stats(*bbox)
+        expected = brute_force_stats(self.lon_range, self.lat_range, self.values, *bbox)
+        if expected is None:
+            assert stats.n_cells == 0
+            assert stats.mean is None and stats.min is None
+            return
+        n_cells, mean, weighted_mean, value_min, value_max = expected
+        assert stats.n_cells == n_cells
+        assert stats.mean == pytest.approx(mean)
+        assert stats.area_weighted_mean == pytest.approx(weighted_mean)
+        assert stats.min == value_min
+        assert stats.max == value_max
+
+    def test_random_boxes(self):
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            lon_min, lon_max = np.sort(rng.uniform(-180, 180, 2))
+            lat_min, lat_max = np.sort(rng.uniform(-90, 90, 2))
+            stats = self.tables.bbox_stats(lon_min, lat_min, lon_max, lat_max)
+            expected = brute_force_stats(
+                self.lon_range, self.lat_range, self.values, lon_min, lat_min, lon_max, lat_max
+            )
+            assert stats.n_cells == (0 if expected is None else expected[0])
+            if expected is not None:
+                assert stats.area_weighted_mean == pytest.approx(expected[2])
+                assert (stats.min, stats.max) == (expected[3], expected[4])
+
+
+class TestRasterizePolygon:
+
+    def setup_method(self):
+        width, height = 360, 180
+        self.lon_range = np.linspace(-180, 180, width, endpoint=False) + 180 / width
+        self.lat_range = np.linspace(90, -90, height, endpoint=False) - 90 / height
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(15, 10, size=(height, width))
+
+    def test_rectangle_matches_bbox(self):
+        geometry = {
+            "type": "Polygon",
+            "coordinates": [[[-10, 40], [10, 40], [10, 60], [-10, 60], [-10, 40]]],
+        }
+        cell_mask = rasterize_polygon(geometry, self.lon_range, self.lat_range)
+        assert cell_mask.cell_range == (30, 50, 170, 190)
+        assert cell_mask.mask.all()
+
+        stats = cell_mask.stats(self.values, self.lat_range)
+        expected = SummedAreaTables(self.lon_range, self.lat_range, self.values).bbox_stats(
+            -10, 40, 10, 60
+        )
+        assert stats.n_cells == expected.n_cells == 400
+        assert stats.area_weighted_mean == pytest.approx(expected.area_weighted_mean)
+        assert stats.min == expected.min
+
+    def test_triangle_and_small_polygon(self):
+        triangle = {"type": "Polygon", "coordinates": [[[0, 0], [20, 0], [0, 20], [0, 0]]]}
+        cell_mask = rasterize_polygon(triangle, self.lon_range, self.lat_range)
+        assert 180 <= cell_mask.mask.sum() <= 220
+
+        small = {
+            "type": "MultiPolygon",
+            "coordinates": [[[[0.1, 0.1], [0.2, 0.1], [0.2, 0.2], [0.1, 0.1]]]],
+        }
+        cell_mask = rasterize_polygon(small, self.lon_range, self.lat_range)
+        assert cell_mask.mask.sum() == 1
+        assert cell_mask.stats(self.values, self.lat_range).mean == self.values[89, 180]
+
+    def test_invalid_geometry(self):
+        with pytest.raises(ValueError):
+            rasterize_polygon(
+                {"type": "Point", "coordinates": [0, 0]}, self.lon_range, self.lat_range
+            )
+        with pytest.raises(ValueError):
+            rasterize_polygon({"type": "Polygon"}, self.lon_range, self.lat_range)
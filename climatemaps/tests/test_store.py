@@ -0,0 +1,52 @@
+import tempfile
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from climatemaps import store
+from climatemaps.datasets import HISTORIC_DATA_SETS
+from climatemaps.geogrid import GeoGrid
+from climatemaps.store import MonthCubeStore
+
+
+class TestMonthCubeStore:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.data_config = HISTORIC_DATA_SETS[0]
+        self.lon_range = np.array([-135.0, -45.0, 45.0, 135.0])
+        self.lat_range = np.array([45.0, -45.0])
+
+        def load_geo_grid(data_config, month):
+            values = np.array([[10.1, 20.1, np.nan, 40.1], [50.1, 60.1, 70.1, 80.1]]) + month
+            return GeoGrid(lon_range=self.lon_range, lat_range=self.lat_range, values=values)
+
+        monkeypatch.setattr(store, "load_climate_data_for_config", load_geo_grid)
+
+    def test_write_and_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            month_cube_store = MonthCubeStore(tmpdir)
+            assert month_cube_store.load(self.data_config.data_type_slug) is None
+
+            month_cube_store.write(self.data_config)
+            cube = month_cube_store.load(self.data_config.data_type_slug)
+
+            assert isinstance(cube.values, np.memmap)
+            assert cube.values.dtype == np.float64
+            assert not cube.values.flags.writeable
+            assert cube.values.shape == (12, 2, 4)
+            npt.assert_array_equal(cube.lon_range, self.lon_range)
+            npt.assert_array_equal(cube.lat_range, self.lat_range)
+            assert cube.month(3).get_value_at_coordinate(lon=-90, lat=0) == pytest.approx(38.1)
+            source = store.load_climate_data_for_config(self.data_config, 5)
+            npt.assert_array_equal(cube.month(5).values, source.values)
+            with pytest.raises(ValueError, match="No data available at coordinates"):
+                cube.month(3).get_value_at_coordinate(lon=45, lat=45)
+
+    def test_stored_cubes_listed_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            month_cube_store = MonthCubeStore(tmpdir)
+            MonthCubeStore(tmpdir).write(self.data_config)
+            assert month_cube_store.load(self.data_config.data_type_slug) is None
+            assert MonthCubeStore(tmpdir).load(self.data_config.data_type_slug) is not None
@@ -0,0 +1,40 @@
+import pytest
+
+from climatemaps.timing import add_phase_listener
+from climatemaps.timing import record_phases
+from climatemaps.timing import remove_phase_listener
+from climatemaps.timing import timed_phase
+
+
+class TestTimedPhase:
+
+    def test_reports_to_listeners(self):
+        phases = []
+
+        def listener(name: str, duration: float) -> None:
+            phases.append((name, duration))
+
+        add_phase_listener(listener)
+        try:
+            with timed_phase("decode"):
+                pass
+            with pytest.raises(ValueError):
+                with timed_phase("conversion"):
+                    raise ValueError()
+        finally:
+            remove_phase_listener(listener)
+
+        with timed_phase("decode"):
+            pass
+
+        assert [name for name, _ in phases] == ["decode", "conversion"]
+        assert all(duration >= 0 for _, duration in phases)
+
+    def test_record_phases(self):
+        with record_phases() as phases:
+            with timed_phase("decode"):
+                with timed_phase("read"):
+                    pass
+        with timed_phase("conversion"):
+            pass
+        assert [name for name, _ in phases] == ["read", "decode"]
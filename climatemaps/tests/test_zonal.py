@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pytest
+
+from climatemaps.region import rasterize_polygon
+from climatemaps.zonal import Country
+from climatemaps.zonal import CountryRaster
+
+
+def create_ranges(width: int = 72, height: int = 36):
+    lon_range = np.linspace(-180, 180, width, endpoint=False) + 180 / width
+    lat_range = np.linspace(90, -90, height, endpoint=False) - 90 / height
+    return lon_range, lat_range
+
+
+def create_box(lon_min: float, lat_min: float, lon_max: float, lat_max: float):
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [lon_min, lat_min],
+                [lon_max, lat_min],
+                [lon_max, lat_max],
+                [lon_min, lat_max],
+                [lon_min, lat_min],
+            ]
+        ],
+    }
+
+
+COUNTRIES = [
+    (Country(code="AA", name="Alpha"), create_box(-10, 40, 10, 60)),
+    (Country(code="BB", name="Beta"), create_box(100, -30, 140, 0)),
+    (Country(code="CC", name="Gamma"), create_box(0.5, 0.5, 1.5, 1.5)),
+    (Country(code="DD", name="Delta"), create_box(-60, -20, -40, 0)),
+]
+
+
+class TestCountryRaster:
+
+    def test_stats_match_polygon_masks(self):
+        lon_range, lat_range = create_ranges()
+        rng = np.random.default_rng(1)
+        values = rng.normal(size=(len(lat_range), len(lon_range)))
+        values[rng.random(values.shape) < 0.1] = np.nan
+        values[18:22, 24:28] = np.nan
+
+        raster = CountryRaster.rasterize(COUNTRIES, lon_range, lat_range)
+        stats = {
+            country_stats.country.code: country_stats.stats
+            for country_stats in raster.stats(values)
+        }
+
+        # Gamma contains no cell center
+        assert set(stats) == {"AA", "BB", "DD"}
+        for country, geometry in COUNTRIES[:2]:
+            expected = rasterize_polygon(geometry, lon_range, lat_range).stats(values, lat_range)
+            assert stats[country.code].n_cells == expected.n_cells
+            assert stats[country.code].mean == pytest.approx(expected.mean)
+            assert stats[country.code].area_weighted_mean == pytest.approx(
+                expected.area_weighted_mean
+            )
+            assert stats[country.code].min == expected.min
+            assert stats[country.code].max == expected.max
+        assert stats["DD"].n_cells == 0
+        assert stats["DD"].mean is None
+
+    def test_area_weights(self):
+        lon_range, lat_range = create_ranges()
+        values = np.zeros((len(lat_range), len(lon_range)))
+        values[lat_range > 50] = 1.0
+        raster = CountryRaster.rasterize(COUNTRIES[:1], lon_range, lat_range)
+        stats = raster.stats(values)[0].stats
+        assert stats.mean == 0.5
+        weights = np.cos(np.radians([42.5, 47.5, 52.5, 57.5]))
+        assert stats.area_weighted_mean == pytest.approx(weights[2:].sum() / weights.sum())
+        assert stats.area_weighted_mean < 0.5
+
+    def test_shape_mismatch(self):
+        lon_range, lat_range = create_ranges()
+        raster = CountryRaster.rasterize(COUNTRIES, lon_range, lat_range)
+        with pytest.raises(ValueError):
+            raster.stats(np.zeros((10, 10)))
+
+    def test_no_countries(self):
+        lon_range, lat_range = create_ranges()
+        raster = CountryRaster.rasterize(COUNTRIES[2:3], lon_range, lat_range)
+        assert raster.stats(np.full((len(lat_range), len(lon_range)), math.nan)) == []
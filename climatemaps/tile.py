@@ -1,11 +1,12 @@
 import os
+from typing import Union
 
 from climatemaps.config import ClimateMapsConfig
 from climatemaps.datasets import ClimateDataConfig, ClimateDifferenceDataConfig
 
 
 def tile_files_exist(
-    data_set_config: ClimateDataConfig, month: int, maps_config: ClimateMapsConfig
+    data_set_config: ClimateDataConfig, month: Union[int, str], maps_config: ClimateMapsConfig
 ) -> bool:
     files_to_check = [
         f"{month}_raster.mbtiles",
@@ -18,7 +19,9 @@ def tile_files_exist(
 
 
 def difference_tile_files_exist(
-    data_set_config: ClimateDifferenceDataConfig, month: int, maps_config: ClimateMapsConfig
+    data_set_config: ClimateDifferenceDataConfig,
+    month: Union[int, str],
+    maps_config: ClimateMapsConfig,
 ) -> bool:
     """
     Check if difference map tile files exist
@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+PhaseListener = Callable[[str, float], None]
+Phases = List[Tuple[str, float]]
+
+_listeners: List[PhaseListener] = []
+
+_recorded_phases: ContextVar[Optional[Phases]] = ContextVar("recorded_phases", default=None)
+
+
+def add_phase_listener(listener: PhaseListener) -> None:
+    _listeners.append(listener)
+
+
+def remove_phase_listener(listener: PhaseListener) -> None:
+    _listeners.remove(listener)
+
+
+@contextmanager
+def record_phases() -> Iterator[Phases]:
+    # threads started with a copy of the context, like the threadpool of sync endpoints, record to
+    # the same list
+    phases: Phases = []
+    token = _recorded_phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _recorded_phases.reset(token)
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    # without listeners or recorded phases, this does not read the clock
+    recorded_phases = _recorded_phases.get()
+    if not _listeners and recorded_phases is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if recorded_phases is not None:
+            recorded_phases.append((name, duration))
+        for listener in list(_listeners):
+            listener(name, duration)
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Any
+from typing import List
+from typing import Mapping
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from rasterio import features
+
+from climatemaps.logger import logger
+from climatemaps.region import RegionStats
+from climatemaps.region import get_area_weights
+from climatemaps.region import get_grid_transform
+
+
+@dataclass(frozen=True)
+class Country:
+    code: str
+    name: str
+
+
+@dataclass(frozen=True)
+class CountryStats:
+    country: Country
+    stats: RegionStats
+
+
+def load_natural_earth_countries(
+    resolution: str = "50m",
+) -> List[Tuple[Country, Mapping[str, Any]]]:
+    from cartopy.io import shapereader
+
+    path = shapereader.natural_earth(
+        resolution=resolution, category="cultural", name="admin_0_countries"
+    )
+    countries = []
+    for record in shapereader.Reader(path).records():
+        attributes = record.attributes
+        code = attributes.get("ISO_A2_EH") or attributes.get("ISO_A2") or "-99"
+        if code == "-99":
+            code = attributes["ADM0_A3"]
+        name = attributes.get("NAME_EN") or attributes["NAME"]
+        countries.append((Country(code=code, name=name), record.geometry.__geo_interface__))
+    return countries
+
+
+# cells are sorted by country, so the statistics of all countries take one gather
+class CountryRaster:
+    def __init__(
+        self,
+        countries: Sequence[Country],
+        country_ids: npt.NDArray[np.integer],
+        lat_range: npt.NDArray[np.floating],
+    ):
+        # country_ids has the index in countries plus one of each cell, 0 for cells in no country
+        self.countries = list(countries)
+        self.shape = country_ids.shape
+        flat_ids = country_ids.ravel()
+        order = np.argsort(flat_ids, kind="stable")
+        n_outside = int(np.count_nonzero(flat_ids == 0))
+        self._cells = order[n_outside:]
+        sorted_ids = flat_ids[self._cells]
+        counts = np.bincount(sorted_ids, minlength=len(self.countries) + 1)[1:]
+        # only countries with cells, reduceat needs non-empty segments
+        self._country_indices = np.flatnonzero(counts)
+        self._starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[self._country_indices]
+        rows = self._cells // self.shape[1]
+        self._weights = get_area_weights(lat_range)[rows]
+
+    @classmethod
+    def rasterize(
+        cls,
+        countries: Sequence[Tuple[Country, Mapping[str, Any]]],
+        lon_range: npt.NDArray[np.floating],
+        lat_range: npt.NDArray[np.floating],
+    ) -> "CountryRaster":
+        shapes = [(geometry, i + 1) for i, (_, geometry) in enumerate(countries)]
+        country_ids = features.rasterize(
+            shapes,
+            out_shape=(len(lat_range), len(lon_range)),
+            transform=get_grid_transform(lon_range, lat_range),
+            fill=0,
+            dtype="int32",
+        )
+        logger.info(
+            f"Rasterized {len(countries)} countries on a {len(lon_range)}x{len(lat_range)} grid"
+        )
+        return cls([country for country, _ in countries], country_ids, lat_range)
+
+    @property
+    def nbytes(self) -> int:
+        return self._cells.nbytes + self._weights.nbytes
+
+    def stats(self, values: npt.NDArray[np.floating]) -> List[CountryStats]:
+        if values.shape != self.shape:
+            raise ValueError(f"Values shape {values.shape} does not match the raster {self.shape}")
+        if self._starts.size == 0:
+            return []
+
+        cell_values = values.ravel()[self._cells]
+        has_data = ~np.isnan(cell_values)
+        data = np.where(has_data, cell_values, 0.0)
+        weights = self._weights * has_data
+        starts = self._starts
+        n_cells = np.add.reduceat(has_data.astype(np.int64), starts)
+        sums = np.add.reduceat(data, starts)
+        weighted_sums = np.add.reduceat(data * weights, starts)
+        weight_sums = np.add.reduceat(weights, starts)
+        # fmin and fmax ignore NaN, a country without data gets NaN
+        mins = np.fmin.reduceat(cell_values, starts)
+        maxs = np.fmax.reduceat(cell_values, starts)
+
+        return [
+            CountryStats(
+                country=self.countries[country_index],
+                stats=RegionStats.from_sums(
+                    n_cells[i], sums[i], weighted_sums[i], weight_sums[i], mins[i], maxs[i]
+                ),
+            )
+            for i, country_index in enumerate(self._country_indices)
+        ]
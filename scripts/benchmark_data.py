@@ -0,0 +1,8 @@
+import numpy as np
+
+from climatemaps.geogrid import GeoGrid
+
+
+def create_random_geo_grid(width: int, height: int) -> GeoGrid:
+    values = np.random.default_rng(0).normal(15, 10, size=(height, width))
+    return GeoGrid.from_global_values(values)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+
+module_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if module_dir not in sys.path:
+    sys.path.insert(0, module_dir)
+
+from benchmark_data import create_random_geo_grid
+from climatemaps.geogrid import GeoGrid
+from climatemaps.logger import logger
+
+# 5 arc-minute global grid
+WIDTH_5M = 4320
+HEIGHT_5M = 2160
+
+
+def get_value_interpolator(geo_grid: GeoGrid, lon: float, lat: float) -> float:
+    interpolator = RegularGridInterpolator(
+        (geo_grid.lat_range, geo_grid.lon_range),
+        geo_grid.values,
+        method="linear",
+        bounds_error=False,
+        fill_value=np.nan,
+    )
+    return float(interpolator([lat, lon])[0])
+
+
+def main(n_lookups: int) -> None:
+    geo_grid = create_random_geo_grid(WIDTH_5M, HEIGHT_5M)
+    rng = np.random.default_rng(1)
+    points = list(zip(rng.uniform(-179, 179, n_lookups), rng.uniform(-89, 89, n_lookups)))
+
+    for lon, lat in points[:100]:
+        expected = get_value_interpolator(geo_grid, lon, lat)
+        assert np.isclose(geo_grid.get_value_at_coordinate(lon, lat), expected)
+
+    def run_interpolator() -> None:
+        for lon, lat in points:
+            get_value_interpolator(geo_grid, lon, lat)
+
+    def run_lookup() -> None:
+        for lon, lat in points:
+            geo_grid.get_value_at_coordinate(lon, lat)
+
+    geo_grid.lookup  # exclude the one-off lookup construction
+    time_interpolator = min(timeit.repeat(run_interpolator, number=1, repeat=3)) / n_lookups
+    time_lookup = min(timeit.repeat(run_lookup, number=1, repeat=3)) / n_lookups
+
+    logger.info(f"grid: {HEIGHT_5M}x{WIDTH_5M} (5m), lookups: {n_lookups}")
+    logger.info(f"RegularGridInterpolator per lookup: {time_interpolator * 1e6:.1f} us")
+    logger.info(f"GridLookup per lookup: {time_lookup * 1e6:.1f} us")
+    logger.info(f"speedup: {time_interpolator / time_lookup:.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark GeoGrid point lookups against a per-call RegularGridInterpolator."
+    )
+    parser.add_argument(
+        "--lookups",
+        type=int,
+        default=2000,
+        help="Number of random point lookups per run. Defaults to 2000.",
+    )
+    args = parser.parse_args()
+    main(n_lookups=args.lookups)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+module_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if module_dir not in sys.path:
+    sys.path.insert(0, module_dir)
+
+from api.middleware import RateLimitMiddleware
+from climatemaps.logger import logger
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def run_requests(app, n_requests: int, n_clients: int) -> float:
+    scopes = [
+        {"type": "http", "method": "GET", "path": "/", "client": (f"10.0.{i // 256}.{i % 256}", 0)}
+        for i in range(n_clients)
+    ]
+    start = time.perf_counter()
+    for i in range(n_requests):
+        await app(scopes[i % n_clients], receive, send)
+    return time.perf_counter() - start
+
+
+def main(n_requests: int, n_clients: int, calls_per_minute: int) -> None:
+    rate_limited = RateLimitMiddleware(endpoint, calls_per_minute=calls_per_minute)
+    time_plain = min(asyncio.run(run_requests(endpoint, n_requests, n_clients)) for _ in range(3))
+    time_limited = min(
+        asyncio.run(run_requests(rate_limited, n_requests, n_clients)) for _ in range(3)
+    )
+
+    logger.info(f"{n_requests} requests from {n_clients} clients, {calls_per_minute} calls/minute")
+    logger.info(f"without rate limit: {n_requests / time_plain:.0f} requests/s")
+    logger.info(f"with rate limit:    {n_requests / time_limited:.0f} requests/s")
+    logger.info(
+        f"overhead per request: {(time_limited - time_plain) / n_requests * 1e6:.2f} µs, {rate_limited.n_clients} clients tracked"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the per-request overhead of the rate limit middleware"
+    )
+    parser.add_argument("--requests", type=int, default=200000, help="Number of requests")
+    parser.add_argument("--clients", type=int, default=50000, help="Number of distinct client IPs")
+    parser.add_argument("--calls-per-minute", type=int, default=1000, help="Rate limit per client")
+    args = parser.parse_args()
+    main(args.requests, args.clients, args.calls_per_minute)
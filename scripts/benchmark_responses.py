@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+module_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if module_dir not in sys.path:
+    sys.path.insert(0, module_dir)
+
+from api import main as api_main
+from benchmark_data import create_random_geo_grid
+from climatemaps.logger import logger
+from climatemaps.settings import settings
+
+N_CLIENTS = 10000
+
+
+def create_scopes(path: str, n_requests: int) -> List[dict]:
+    rng = np.random.default_rng(1)
+    scopes = []
+    for i in range(n_requests):
+        lon, lat = rng.uniform(-179, 179), rng.uniform(-60, 60)
+        scopes.append(
+            {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "root_path": "",
+                "query_string": f"lat={lat:.4f}&lon={lon:.4f}".encode(),
+                "headers": [(b"host", b"localhost")],
+                "client": (f"10.0.{i % N_CLIENTS // 256}.{i % N_CLIENTS % 256}", 0),
+                "server": ("localhost", 80),
+            }
+        )
+    return scopes
+
+
+async def run_requests(scopes: List[dict]) -> float:
+    statuses = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    start = time.perf_counter()
+    for scope in scopes:
+        await api_main.api(scope, receive, send)
+    duration = time.perf_counter() - start
+    assert all(status == 200 for status in statuses), set(statuses)
+    return duration
+
+
+def main(n_requests: int) -> None:
+    data_type = next(iter(api_main.data_config_map))
+    api_main.geo_grid_cache.set(data_type, 1, create_random_geo_grid(720, 360))
+
+    endpoints = {
+        "value": f"/value/{data_type}/1",
+        "nearest-city": "/nearest-city",
+    }
+    for name, path in endpoints.items():
+        scopes = create_scopes(path, n_requests)
+        for fast in (False, True):
+            settings.FAST_JSON_RESPONSES = fast
+            asyncio.run(run_requests(scopes[:100]))
+            duration = min(asyncio.run(run_requests(scopes)) for _ in range(3))
+            label = "fast" if fast else "response_model"
+            logger.info(f"{name:<13} {label:<15} {n_requests / duration:.0f} requests/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare requests per second of hot endpoints with and without fast JSON responses"
+    )
+    parser.add_argument("--requests", type=int, default=5000, help="Number of requests per run")
+    args = parser.parse_args()
+    main(args.requests)
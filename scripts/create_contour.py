@@ -6,6 +6,8 @@ import sys
 import concurrent.futures
 from datetime import datetime
 from typing import List
+from typing import Sequence
+from typing import Union
 
 import numpy as np
 
@@ -14,11 +16,14 @@ module_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if module_dir not in sys.path:
     sys.path.insert(0, module_dir)
 
+from climatemaps.aggregate import MonthAggregate
+from climatemaps.aggregate import get_aggregate_contour_config
 from climatemaps.config import ClimateMapsConfig
 from climatemaps.config import get_config
 from climatemaps.contour import ContourTileBuilder
 from climatemaps.data import (
     load_climate_data,
+    load_climate_data_aggregate,
     load_climate_data_for_difference,
 )
 from climatemaps.datasets import ClimateModel
@@ -93,11 +98,11 @@ def _create_tasks_for_datasets(
     force_recreate: bool,
     name: str,
     if_older_than: datetime | None = None,
+    aggregates: Sequence[str] = (),
 ) -> List[tuple]:
+    months: List[Union[int, str]] = [*range(1, month_upper + 1), *aggregates]
     tasks = [
-        (config, month, force_recreate, if_older_than)
-        for config in data_sets
-        for month in range(1, month_upper + 1)
+        (config, month, force_recreate, if_older_than) for config in data_sets for month in months
     ]
     logger.info(f"Added {len(tasks)} {name} tasks")
     return tasks
@@ -148,7 +153,7 @@ def _pre_ensure_all_data_available(data_sets: List[ClimateDataConfig]) -> None:
 
 
 def _mbtiles_are_older_than_date(
-    config: ClimateDataConfig, month: int, threshold_date: datetime
+    config: ClimateDataConfig, month: Union[int, str], threshold_date: datetime
 ) -> bool:
     directory = os.path.join(maps_config.data_dir_out, config.data_type_slug)
 
@@ -174,6 +179,7 @@ def main(
     climate_model: ClimateModel | None = None,
     if_older_than: datetime | None = None,
     processes: int = 1,
+    aggregates: Sequence[str] = (),
 ) -> None:
     month_upper = 1 if limited_test_set else 12
     all_tasks = []
@@ -199,7 +205,9 @@ def main(
                 datasets = [ds for ds in datasets if ds.climate_model == climate_model]
         all_datasets.extend(datasets)
         all_tasks.extend(
-            _create_tasks_for_datasets(datasets, month_upper, force_recreate, name, if_older_than)
+            _create_tasks_for_datasets(
+                datasets, month_upper, force_recreate, name, if_older_than, aggregates
+            )
         )
 
     logger.info("Pre-ensuring all data files exist before multiprocessing")
@@ -263,7 +271,9 @@ def terminate_process_pool_children() -> None:
     logger.info("All child processes terminated.")
 
 
-def process(config, month: int, force_recreate: bool, if_older_than: datetime | None = None) -> str:
+def process(
+    config, month: Union[int, str], force_recreate: bool, if_older_than: datetime | None = None
+) -> str:
     logger.info(f'Creating image and tiles for "{config.data_type_slug}" and month {month}')
 
     try:
@@ -292,8 +302,13 @@ def process(config, month: int, force_recreate: bool, if_older_than: datetime |
         raise
 
 
-def _create_contour(data_set_config, month: int) -> None:
-    if isinstance(data_set_config, ClimateDifferenceDataConfig):
+def _create_contour(data_set_config, month: Union[int, str]) -> None:
+    contour_config = data_set_config.contour_config
+    if isinstance(month, str):
+        aggregate = MonthAggregate.parse(month)
+        geo_grid = load_climate_data_aggregate(data_set_config, aggregate)
+        contour_config = get_aggregate_contour_config(data_set_config, aggregate)
+    elif isinstance(data_set_config, ClimateDifferenceDataConfig):
         geo_grid = load_climate_data_for_difference(
             data_set_config.historical_config, data_set_config.future_config, month
         )
@@ -301,7 +316,7 @@ def _create_contour(data_set_config, month: int) -> None:
         geo_grid = load_climate_data(data_set_config, month)
 
     contour_map = ContourTileBuilder(
-        data_set_config.contour_config,
+        contour_config,
         geo_grid=geo_grid,
         zoom_min=maps_config.zoom_min,
         zoom_max=maps_config.zoom_max,
@@ -351,8 +366,22 @@ if __name__ == "__main__":
         default=1,
         help="Number of parallel processes to use for tile creation. Defaults to 1.",
     )
+    parser.add_argument(
+        "--aggregates",
+        nargs="+",
+        default=[],
+        metavar="AGGREGATE",
+        help="Also create tiles for month aggregates: annual, djf, mam, jja, son or comma separated months like 6,7,8.",
+    )
     args = parser.parse_args()
 
+    aggregates = []
+    for aggregate_name in args.aggregates:
+        try:
+            aggregates.append(MonthAggregate.parse(aggregate_name).name)
+        except ValueError as e:
+            parser.error(str(e))
+
     climate_model = None
     if args.climate_model:
         climate_model = ClimateModel(args.climate_model)
@@ -370,4 +399,5 @@ if __name__ == "__main__":
         climate_model=climate_model,
         if_older_than=if_older_than,
         processes=args.processes,
+        aggregates=aggregates,
     )
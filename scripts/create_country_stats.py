@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import os
+import sys
+from typing import Dict
+from typing import List
+
+
+module_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if module_dir not in sys.path:
+    sys.path.insert(0, module_dir)
+
+from climatemaps.data import load_climate_data_for_config
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.geogrid import GridLayout
+from climatemaps.geogrid import get_grid_layout
+from climatemaps.settings import settings
+from climatemaps.zonal import CountryRaster
+from climatemaps.zonal import load_natural_earth_countries
+from climatemaps.logger import logger
+
+COLUMNS = [
+    "data_type",
+    "month",
+    "country_code",
+    "country_name",
+    "n_cells",
+    "mean",
+    "area_weighted_mean",
+    "min",
+    "max",
+]
+
+
+def main(
+    data_configs: List[ClimateDataConfig],
+    months: List[int],
+    output_path: str,
+    resolution: str = "50m",
+) -> None:
+    countries = load_natural_earth_countries(resolution)
+    rasters: Dict[GridLayout, CountryRaster] = {}
+    failed = []
+    with open(output_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(COLUMNS)
+        for counter, data_config in enumerate(data_configs):
+            data_type_slug = data_config.data_type_slug
+            for month in months:
+                try:
+                    geo_grid = load_climate_data_for_config(data_config, month)
+                except Exception as e:
+                    logger.error(f"Failed to load {data_type_slug} month {month}: {e}")
+                    failed.append(f"{data_type_slug} month {month}")
+                    continue
+                lon_range, lat_range = geo_grid.lon_range, geo_grid.lat_range
+                grid_layout = get_grid_layout(lon_range, lat_range)
+                if grid_layout not in rasters:
+                    rasters[grid_layout] = CountryRaster.rasterize(countries, lon_range, lat_range)
+                for country_stats in rasters[grid_layout].stats(geo_grid.values):
+                    stats = country_stats.stats
+                    writer.writerow(
+                        [
+                            data_type_slug,
+                            month,
+                            country_stats.country.code,
+                            country_stats.country.name,
+                            stats.n_cells,
+                            stats.mean,
+                            stats.area_weighted_mean,
+                            stats.min,
+                            stats.max,
+                        ]
+                    )
+            logger.info(f"Progress: {int(((counter + 1) / len(data_configs)) * 100)}%")
+
+    if failed:
+        logger.error(f"Failed to compute country stats for {len(failed)}: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write a CSV table of per-country statistics for all API data sets and months."
+    )
+    parser.add_argument("--output", default="data/country_stats.csv", help="Output CSV file path.")
+    parser.add_argument(
+        "--months",
+        type=int,
+        nargs="+",
+        default=list(range(1, 13)),
+        help="Months to include. Defaults to all months.",
+    )
+    parser.add_argument(
+        "--data-type",
+        default=None,
+        help="Only include data types containing this text, for example a scenario like ssp370.",
+    )
+    args = parser.parse_args()
+    data_configs = [
+        config
+        for config in settings.DATA_SETS_API
+        if args.data_type is None or args.data_type in config.data_type_slug
+    ]
+    main(data_configs, args.months, args.output, settings.COUNTRY_BOUNDARIES_RESOLUTION)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+from typing import List
+
+
+module_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if module_dir not in sys.path:
+    sys.path.insert(0, module_dir)
+
+from climatemaps.datasets import ClimateDataConfig
+from climatemaps.settings import settings
+from climatemaps.store import MonthCubeStore
+from climatemaps.logger import logger
+
+
+def main(data_configs: List[ClimateDataConfig], force_recreate: bool = False) -> None:
+    store = MonthCubeStore(settings.MONTH_CUBE_DIR)
+    failed = []
+    for counter, data_config in enumerate(data_configs):
+        data_type_slug = data_config.data_type_slug
+        if store.exists(data_type_slug) and not force_recreate:
+            logger.info(f'Skip creation of "{data_type_slug}" (already exists)')
+            continue
+        try:
+            store.write(data_config)
+        except Exception as e:
+            logger.error(f"Failed to create month cube for {data_type_slug}: {e}")
+            failed.append(data_type_slug)
+        logger.info(f"Progress: {int(((counter + 1) / len(data_configs)) * 100)}%")
+
+    if failed:
+        logger.error(f"Failed to create {len(failed)} month cube(s): {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Create preconverted, memory-mappable month cubes for all API data sets."
+    )
+    parser.add_argument(
+        "--force-recreate",
+        action="store_true",
+        default=False,
+        help="Force recreation of existing month cubes. Defaults to False.",
+    )
+    args = parser.parse_args()
+    main(settings.DATA_SETS_API, force_recreate=args.force_recreate)